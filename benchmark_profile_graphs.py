@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the MMPI-2 graph engine.
+
+For every scale family this measures the per-graph time of a cold render, which
+builds, lays out and draws a whole new figure as the generators used to, and of
+a warm render, which draws only the data layer over the family's cached
+template, as well as the matplotlib-free SVG backend. It then times every chart
+style of the graph engine in each output format, the engine with and without a
+warm graph cache, every PNG quality tier and, with --workers, the wall-clock time of the whole graph
+stage of a report rendered in turn and by the graph render pool.
+
+With --threads it also checks that graphs render correctly from several threads
+at once: every chart is rendered in turn and then concurrently by a thread
+pool, the PNGs must be byte for byte identical and matplotlib's global settings
+must be unchanged afterwards; the script exits with status 1 otherwise. Usage:
+
+    python benchmark_profile_graphs.py [--iterations N] [--workers N] [--threads N]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.constants.graph_constants import (
+    GRAPH_FAMILIES, GRAPH_FAMILY_SPECS, GRAPH_QUALITY_TIERS, family_t_scores, graph_title
+)
+from src.reporting.profile_graph_renderer import (
+    GraphTemplate, get_graph_template, get_graph_render_pool, shutdown_graph_render_pools
+)
+from src.reporting.profile_graph_generator import ProfileGraphGenerator
+from src.reporting.profile_graph_cache import GraphCache
+from src.reporting.graph_engine import (
+    CHART_STYLES, GraphEngine, chart_spec, profile_chart_spec, render_chart_bytes
+)
+from src.reporting.profile_graph_svg import render_family_svg
+
+# Sample client used for every benchmark graph
+SAMPLE_CLIENT = {'name': 'Benchmark Client', 'sex': 'female'}
+
+
+def sample_t_scores(family, iteration):
+    """
+    Build a varying T-score profile for a family.
+
+    Args:
+        family (str): Scale family
+        iteration (int): Iteration number, used to vary the scores
+
+    Returns:
+        list: T-scores in plotting order
+    """
+    scores = family_t_scores(family, {})
+    return [40 + (index * 7 + iteration * 3) % 70 for index in range(len(scores))]
+
+
+def time_renders(family, iterations, cold):
+    """
+    Time PNG renders of a family.
+
+    Args:
+        family (str): Scale family
+        iterations (int): Number of graphs to render
+        cold (bool): Build a new template for every graph
+
+    Returns:
+        tuple: (mean seconds per graph, PNG size in bytes of the last graph)
+    """
+    title = graph_title(family, SAMPLE_CLIENT)
+    size = 0
+    started_at = time.perf_counter()
+    for iteration in range(iterations):
+        template = GraphTemplate(family) if cold else get_graph_template(family)
+        buffer = io.BytesIO()
+        template.render(sample_t_scores(family, iteration), title, buffer)
+        size = buffer.tell()
+    return (time.perf_counter() - started_at) / iterations, size
+
+
+def time_svg_renders(family, iterations):
+    """
+    Time SVG renders of a family.
+
+    Args:
+        family (str): Scale family
+        iterations (int): Number of graphs to render
+
+    Returns:
+        tuple: (mean seconds per graph, SVG size in bytes of the last graph)
+    """
+    scales = GRAPH_FAMILY_SPECS[family]['scales']
+    svg = ''
+    started_at = time.perf_counter()
+    for iteration in range(iterations):
+        svg = render_family_svg(family, dict(zip(scales, sample_t_scores(family, iteration))), SAMPLE_CLIENT)
+    return (time.perf_counter() - started_at) / iterations, len(svg.encode('utf-8'))
+
+
+def sample_scores(iteration):
+    """
+    Build the scores of a whole sample report.
+
+    Args:
+        iteration (int): Iteration number, used to vary the scores
+
+    Returns:
+        dict: Family key (as in report scores) -> scale code -> T-score
+    """
+    scores = {}
+    for family in GRAPH_FAMILIES:
+        scales = GRAPH_FAMILY_SPECS[family]['scales']
+        key = 'clinical_scales' if family == 'traditional' else family
+        scores[key] = dict(zip(scales, sample_t_scores(family, iteration)))
+    return scores
+
+
+def time_graph_stage(iterations, graph_workers):
+    """
+    Time the PNG graph stage of a report, including the combined PDF.
+
+    Args:
+        iterations (int): Number of reports to render
+        graph_workers (int): Graph render processes; 0 renders in turn
+
+    Returns:
+        float: Mean seconds per report
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = ProfileGraphGenerator(output_dir, graph_workers=graph_workers)
+        started_at = time.perf_counter()
+        for iteration in range(iterations):
+            generator.generate_all_graphs(sample_scores(iteration), SAMPLE_CLIENT)
+        return (time.perf_counter() - started_at) / iterations
+
+
+def time_engine_renders(spec, iterations, graph_format, engine=None):
+    """
+    Time graph engine renders of a chart spec.
+
+    Args:
+        spec (dict): Chart spec
+        iterations (int): Number of charts to render
+        graph_format (str): Output format
+        engine (GraphEngine, optional): Engine to render with; a new engine
+            without a graph cache by default
+
+    Returns:
+        tuple: (mean seconds per chart, size in bytes of the last chart)
+    """
+    engine = engine or GraphEngine()
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, f"chart.{graph_format}")
+        started_at = time.perf_counter()
+        for iteration in range(iterations):
+            engine.render(spec, dict(zip(spec['scales'], sample_t_scores('traditional', iteration))),
+                          output_path, graph_format)
+        elapsed = time.perf_counter() - started_at
+        return elapsed / iterations, os.path.getsize(output_path)
+
+
+def run_engine_benchmark(iterations):
+    """
+    Time every chart style of the graph engine in each output format, and the
+    engine with and without a warm graph cache.
+
+    Args:
+        iterations (int): Number of charts rendered per style and format
+    """
+    graph_formats = ('png', 'pdf', 'svg')
+    print(f"{'Chart style':<22}" + ''.join(f"{f'{fmt.upper()} ms/chart':>15}" for fmt in graph_formats))
+    for style in CHART_STYLES:
+        spec = chart_spec('traditional', style)
+        times = [time_engine_renders(spec, iterations, fmt)[0] for fmt in graph_formats]
+        print(f"{style:<22}" + ''.join(f"{seconds * 1000:>15.1f}" for seconds in times))
+
+    # The same profiles again through a graph cache: the first pass fills it,
+    # the second only reads it back
+    print()
+    print(f"{'Graph cache':<22}{'Uncached ms':>15}{'Cached ms':>15}{'Speedup':>10}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = GraphEngine(graph_cache=GraphCache(cache_dir))
+        for name, spec in (('line_profile', chart_spec('traditional', 'line_profile')),
+                           ('profile', profile_chart_spec('traditional', SAMPLE_CLIENT))):
+            uncached, _ = time_engine_renders(spec, iterations, 'png', engine)
+            cached, _ = time_engine_renders(spec, iterations, 'png', engine)
+            print(f"{name:<22}{uncached * 1000:>15.1f}{cached * 1000:>15.3f}{uncached / cached:>9.0f}x")
+
+
+def run_quality_benchmark(iterations):
+    """
+    Time warm PNG renders of the traditional profile in every quality tier.
+
+    Args:
+        iterations (int): Number of graphs rendered per tier
+    """
+    print(f"{'Quality tier':<22}{'DPI':>15}{'ms/graph':>15}{'PNG bytes':>12}")
+    for quality, tier in GRAPH_QUALITY_TIERS.items():
+        spec = profile_chart_spec('traditional', SAMPLE_CLIENT, quality=quality)
+        engine = GraphEngine()
+        # The first render builds the tier's template
+        time_engine_renders(spec, 1, 'png', engine)
+        seconds, size = time_engine_renders(spec, iterations, 'png', engine)
+        print(f"{quality:<22}{tier['dpi']:>15}{seconds * 1000:>15.1f}{size:>12}")
+
+
+def concurrency_charts(iterations):
+    """
+    Build the charts of the concurrency check: every chart style and every
+    profile family with varying scores.
+
+    Args:
+        iterations (int): Number of score variations per chart
+
+    Returns:
+        list: (spec, scores, "png") tuples
+    """
+    charts = []
+    for iteration in range(iterations):
+        scores = dict(zip(GRAPH_FAMILY_SPECS['traditional']['scales'], sample_t_scores('traditional', iteration)))
+        charts.extend((chart_spec('traditional', style), scores, 'png') for style in CHART_STYLES)
+        for family in GRAPH_FAMILIES:
+            scales = GRAPH_FAMILY_SPECS[family]['scales']
+            charts.append((profile_chart_spec(family, SAMPLE_CLIENT),
+                           dict(zip(scales, sample_t_scores(family, iteration))), 'png'))
+    return charts
+
+
+def run_concurrency_check(iterations, threads):
+    """
+    Render charts in turn and from a thread pool and compare the results.
+
+    Args:
+        iterations (int): Number of score variations per chart
+        threads (int): Number of rendering threads
+
+    Returns:
+        bool: True if every chart rendered identically and no global
+            matplotlib setting changed
+    """
+    import matplotlib
+
+    settings = dict(matplotlib.rcParams)
+    charts = concurrency_charts(iterations)
+
+    started_at = time.perf_counter()
+    expected = [render_chart_bytes(*chart) for chart in charts]
+    serial = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        rendered = list(pool.map(lambda chart: render_chart_bytes(*chart), charts))
+    threaded = time.perf_counter() - started_at
+
+    mismatches = sum(1 for a, b in zip(expected, rendered) if a != b)
+    changed = sorted(key for key, value in dict(matplotlib.rcParams).items() if settings.get(key) != value)
+    print(f"{'Thread check':<22}{'In turn ms':>15}{f'{threads} threads ms':>15}{'Charts':>10}{'Mismatches':>12}")
+    print(f"{'all charts':<22}{serial * 1000:>15.1f}{threaded * 1000:>15.1f}{len(charts):>10}{mismatches:>12}")
+    if changed:
+        print(f"Global matplotlib settings changed: {', '.join(changed)}")
+    return not mismatches and not changed
+
+
+def run_graph_stage_benchmark(iterations, graph_workers):
+    """
+    Compare the graph stage rendered in turn and by the graph render pool.
+
+    Args:
+        iterations (int): Number of reports rendered per mode
+        graph_workers (int): Graph render processes
+    """
+    # Start the pool and let every child warm its templates before timing
+    pool = get_graph_render_pool(graph_workers)
+    for future in [pool.submit(sum, []) for _ in range(graph_workers)]:
+        future.result()
+    time_graph_stage(1, graph_workers)
+
+    try:
+        serial = time_graph_stage(iterations, 0)
+        parallel = time_graph_stage(iterations, graph_workers)
+    finally:
+        shutdown_graph_render_pools()
+    print(f"{'Graph stage':<22}{'In turn ms':>15}{f'{graph_workers} workers ms':>15}{'Speedup':>10}")
+    print(f"{'per report':<22}{serial * 1000:>15.1f}{parallel * 1000:>15.1f}{serial / parallel:>9.1f}x")
+
+
+def run_benchmark(iterations):
+    """
+    Run the benchmark for every family and print the per-graph times.
+
+    Args:
+        iterations (int): Number of graphs rendered per family and mode
+    """
+    # Build the templates up front, as warm-up does in report workers
+    for family in GRAPH_FAMILIES:
+        get_graph_template(family)
+
+    print(f"{'Family':<22}{'Cold ms/graph':>15}{'Warm ms/graph':>15}{'Speedup':>10}{'PNG bytes':>12}"
+          f"{'SVG ms/graph':>14}{'SVG bytes':>12}")
+    total_cold = total_warm = total_svg = 0.0
+    for family in GRAPH_FAMILIES:
+        cold, _ = time_renders(family, iterations, cold=True)
+        warm, size = time_renders(family, iterations, cold=False)
+        svg, svg_size = time_svg_renders(family, iterations * 10)
+        total_cold += cold
+        total_warm += warm
+        total_svg += svg
+        print(f"{family:<22}{cold * 1000:>15.1f}{warm * 1000:>15.1f}{cold / warm:>9.1f}x{size:>12}"
+              f"{svg * 1000:>14.3f}{svg_size:>12}")
+    print(f"{'all families':<22}{total_cold * 1000:>15.1f}{total_warm * 1000:>15.1f}"
+          f"{total_cold / total_warm:>9.1f}x{'':>12}{total_svg * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MMPI-2 graph rendering")
+    parser.add_argument('--iterations', type=int, default=20, help="Graphs rendered per family and mode")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Also time the graph stage with this many graph render processes")
+    parser.add_argument('--threads', type=int, default=0,
+                        help="Also check concurrent rendering from this many threads")
+    args = parser.parse_args()
+    run_benchmark(args.iterations)
+    print()
+    run_engine_benchmark(args.iterations)
+    print()
+    run_quality_benchmark(args.iterations)
+    if args.workers:
+        print()
+        run_graph_stage_benchmark(args.iterations, args.workers)
+    if args.threads:
+        print()
+        if not run_concurrency_check(args.iterations, args.threads):
+            sys.exit(1)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for MMPI-2 scale interpretation lookups.
+
+Looks up every scale of every interpretation family at every T-score from 0 to
+120, once through the compiled index of scale_interpretations and once through
+a reference implementation of the former lookup (family membership tests, the
+clinical number chain and a scan of the ranges). It checks that both give the
+same interpretation for every lookup and prints the time per lookup.
+
+It then interprets a batch of random profiles of every compiled family with
+interpret_profiles and checks each cell against lookup_narrative, printing the
+time per cell of both. The script exits with status 1 if any lookup differs.
+Usage:
+
+    python benchmark_scale_interpretations.py [--iterations N] [--respondents N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.interpretation.scale_interpretations import (
+    SCALE_FAMILY_CODES, CLINICAL_SCALE_NUMBERS, DEFAULT_FAMILY, family_interpretations, get_scale_interpretation
+)
+from src.interpretation.interpretation_tables import (
+    TABLE_FAMILIES, compile_all_tables, interpret_profiles, lookup_narrative
+)
+
+# T-scores looked up for every scale
+T_SCORES = range(0, 121)
+
+
+def linear_scale_interpretation(scale_name, t_score, scale_type=None):
+    """
+    Look an interpretation up the way get_scale_interpretation did before the
+    index: test each family in turn, then scan the scale's ranges.
+
+    Args:
+        scale_name (str): The name of the scale
+        t_score (float): The T-score
+        scale_type (str, optional): The type of scale
+
+    Returns:
+        The interpretation, or the message for a missing scale or range
+    """
+    family = DEFAULT_FAMILY
+    for candidate, codes in SCALE_FAMILY_CODES.items():
+        if scale_type == candidate or scale_name in codes:
+            family = candidate
+            break
+    if family == "CLINICAL":
+        for number, code in CLINICAL_SCALE_NUMBERS.items():
+            if scale_name == number:
+                scale_name = code
+                break
+
+    interpretation_dict = family_interpretations(family)
+    if scale_name not in interpretation_dict:
+        return f"Interpretation not found for scale: {scale_name} in type {scale_type if scale_type else 'UNKNOWN'}"
+    scale_dict = interpretation_dict[scale_name]
+    if "ranges" not in scale_dict:
+        return scale_dict
+    for range_dict in scale_dict["ranges"]:
+        min_val, max_val = range_dict["range"]
+        if min_val <= t_score <= max_val:
+            return range_dict["interpretation"]
+    return f"No interpretation found for T-score {t_score} in scale {scale_name}"
+
+
+def lookups():
+    """
+    List every lookup of the benchmark.
+
+    Returns:
+        list: (scale code, T-score, scale type) tuples, with each scale looked
+            up both by its family and by its code alone
+    """
+    return [(code, float(t_score), scale_type)
+            for family, codes in SCALE_FAMILY_CODES.items()
+            for code in codes
+            for scale_type in (family, None)
+            for t_score in T_SCORES]
+
+
+def time_lookups(lookup, cases, iterations):
+    """
+    Time a lookup function over every case.
+
+    Args:
+        lookup (callable): Function of (scale code, T-score, scale type)
+        cases (list): Lookups to make
+        iterations (int): Number of passes over the cases
+
+    Returns:
+        float: Mean seconds per lookup
+    """
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        for scale_name, t_score, scale_type in cases:
+            lookup(scale_name, t_score, scale_type)
+    return (time.perf_counter() - started_at) / (iterations * len(cases))
+
+
+def run_benchmark(iterations):
+    """
+    Compare the compiled and the linear lookup and print the timings.
+
+    Args:
+        iterations (int): Number of passes over every scale and T-score
+
+    Returns:
+        bool: True if both lookups agree everywhere
+    """
+    cases = lookups()
+    mismatches = [case for case in cases
+                  if get_scale_interpretation(*case) != linear_scale_interpretation(*case)]
+
+    linear = time_lookups(linear_scale_interpretation, cases, iterations)
+    compiled = time_lookups(get_scale_interpretation, cases, iterations)
+    print(f"{'Lookup':<22}{'ns/lookup':>12}{'Lookups':>10}{'Mismatches':>12}")
+    print(f"{'linear':<22}{linear * 1e9:>12.0f}{len(cases):>10}{'':>12}")
+    print(f"{'compiled index':<22}{compiled * 1e9:>12.0f}{len(cases):>10}{len(mismatches):>12}")
+    print(f"Speedup: {linear / compiled:.1f}x")
+    for scale_name, t_score, scale_type in mismatches[:10]:
+        print(f"Mismatch: {scale_name} at T={t_score:g} ({scale_type or 'no type'})")
+    return not mismatches
+
+
+def batch_profiles(family, respondents, seed=0):
+    """
+    Build random profiles over every compiled scale of a family.
+
+    Args:
+        family (str): Interpretation family
+        respondents (int): Number of rows
+        seed (int): Random seed
+
+    Returns:
+        tuple: (scale codes, T-score matrix, genders), with a few fractional
+            and missing T-scores mixed in
+    """
+    scales = sorted({scale for table_family, _, scale in compile_all_tables() if table_family == family})
+    rng = np.random.default_rng(seed)
+    matrix = rng.integers(20, 121, size=(respondents, len(scales))).astype(float)
+    matrix[rng.random(matrix.shape) < 0.01] += 0.5
+    matrix[rng.random(matrix.shape) < 0.01] = np.nan
+    genders = rng.choice(['female', 'male'], size=respondents)
+    return scales, matrix, genders
+
+
+def run_batch_benchmark(respondents):
+    """
+    Compare interpret_profiles with cell-by-cell lookups and print the timings.
+
+    Args:
+        respondents (int): Number of random profiles per family
+
+    Returns:
+        bool: True if both agree on every cell
+    """
+    print(f"{'Family':<22}{'Cells':>10}{'ns/cell (cells)':>18}{'ns/cell (batch)':>18}{'Mismatches':>12}")
+    all_agree = True
+    for family in sorted(TABLE_FAMILIES):
+        scales, matrix, genders = batch_profiles(family, respondents)
+        cells = matrix.size
+        if not cells:
+            continue
+
+        started_at = time.perf_counter()
+        expected = [[None if np.isnan(t_score) else lookup_narrative(family, scale, t_score, gender)
+                     for scale, t_score in zip(scales, row)]
+                    for row, gender in zip(matrix, genders)]
+        per_cell = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        _, narratives = interpret_profiles(matrix, scales, family, genders)
+        batch = time.perf_counter() - started_at
+
+        mismatches = sum(narratives[row, column] != expected[row][column]
+                         for row in range(len(matrix)) for column in range(len(scales)))
+        all_agree = all_agree and not mismatches
+        print(f"{family:<22}{cells:>10}{per_cell / cells * 1e9:>18.0f}{batch / cells * 1e9:>18.0f}{mismatches:>12}")
+    return all_agree
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MMPI-2 scale interpretation lookups")
+    parser.add_argument('--iterations', type=int, default=20, help="Passes over every scale and T-score")
+    parser.add_argument('--respondents', type=int, default=10000, help="Random profiles per family in the batch check")
+    args = parser.parse_args()
+    agree = run_benchmark(args.iterations)
+    print()
+    if not run_batch_benchmark(args.respondents) or not agree:
+        sys.exit(1)
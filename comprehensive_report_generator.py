@@ -10,9 +10,6 @@ and DSM-5-TR aligned diagnostic impressions.
 import os
 import sys
 import json
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_pdf import PdfPages
 from datetime import datetime
 
 # Add the project root to the Python path
@@ -20,7 +17,8 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # Import necessary modules
 from src.interpretation.scale_interpretations import get_scale_interpretation
-from src.interpretation.dsm5tr_decision_trees import get_diagnostic_impressions, get_treatment_recommendations
+from src.interpretation.dsm5tr_decision_trees import get_dsm5tr_diagnostic_impressions
+from src.reporting.graph_engine import GraphEngine, chart_spec
 
 # Create output directory if it doesn't exist
 output_dir = os.path.join(os.path.dirname(__file__), "comprehensive_report_output")
@@ -226,55 +224,8 @@ def generate_traditional_profile_graph(profile_data, output_dir):
     # Create a PDF to hold the traditional profile graph
     pdf_path = os.path.join(output_dir, "traditional_profile_graph.pdf")
     
-    with PdfPages(pdf_path) as pdf:
-        # Set up the figure
-        plt.figure(figsize=(11, 8.5))  # US Letter size
-        
-        # Define the scales and their T-scores
-        validity_scales = ["L", "F", "K"]
-        validity_scores = [profile_data["scale_scores"].get(scale, 0) for scale in validity_scales]
-        
-        clinical_scales = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-        clinical_scores = [profile_data["scale_scores"].get(scale, 0) for scale in clinical_scales]
-        
-        # Combine all scales for the x-axis
-        all_scales = validity_scales + clinical_scales
-        all_scores = validity_scores + clinical_scores
-        
-        # Create the plot
-        plt.plot(range(len(all_scales)), all_scores, 'o-', color='blue', markersize=8)
-        
-        # Add a horizontal line at T=65 (clinical significance)
-        plt.axhline(y=65, color='r', linestyle='--', alpha=0.7)
-        
-        # Set the y-axis limits and ticks
-        plt.ylim(30, 120)
-        plt.yticks(range(30, 121, 10))
-        
-        # Set the x-axis ticks and labels
-        plt.xticks(range(len(all_scales)), all_scales)
-        
-        # Add grid lines
-        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
-        
-        # Add labels and title
-        plt.xlabel('MMPI-2 Scales', fontsize=12)
-        plt.ylabel('T-Score', fontsize=12)
-        plt.title('MMPI-2 Traditional Profile', fontsize=16)
-        
-        # Add T-score values above each point
-        for i, score in enumerate(all_scores):
-            plt.text(i, score + 3, str(score), ha='center', fontsize=10)
-        
-        # Add a legend
-        plt.legend(['Profile', 'Clinical Significance (T=65)'], loc='upper right')
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save the figure to the PDF
-        pdf.savefig()
-        plt.close()
+    spec = chart_spec('traditional', 'line_profile')
+    GraphEngine().render_pages([(spec, profile_data["scale_scores"])], pdf_path)
     
     return pdf_path
 
@@ -292,145 +243,18 @@ def generate_scale_family_graphs(profile_data, output_dir):
     # Create a PDF to hold all graphs
     pdf_path = os.path.join(output_dir, "scale_family_graphs.pdf")
     
-    with PdfPages(pdf_path) as pdf:
-        # Validity Scales Graph
-        validity_scales = ["?", "VRIN", "TRIN", "F", "Fb", "Fp", "FBS", "L", "K"]
-        validity_scores = [profile_data["scale_scores"].get(scale, 0) for scale in validity_scales]
-        
-        plt.figure(figsize=(12, 6))
-        plt.bar(validity_scales, validity_scores, color='skyblue')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Validity Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(validity_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Clinical Scales Graph
-        clinical_scales = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-        clinical_names = ["Hs", "D", "Hy", "Pd", "Mf", "Pa", "Pt", "Sc", "Ma", "Si"]
-        clinical_scores = [profile_data["scale_scores"].get(scale, 0) for scale in clinical_scales]
-        
-        plt.figure(figsize=(12, 6))
-        bars = plt.bar(clinical_names, clinical_scores, color='lightgreen')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Clinical Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        # Highlight the highest scales for two-point code
-        sorted_indices = np.argsort(clinical_scores)
-        highest_indices = sorted_indices[-2:]
-        for i in highest_indices:
-            bars[i].set_color('darkgreen')
-            
-        for i, score in enumerate(clinical_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Depression
-        d_subscales = ["D1", "D2", "D3", "D4", "D5"]
-        d_scores = [profile_data["scale_scores"].get(scale, 0) for scale in d_subscales]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(d_subscales, d_scores, color='salmon')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Depression (Scale 2) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(d_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Hysteria
-        hy_subscales = ["Hy1", "Hy2", "Hy3", "Hy4", "Hy5"]
-        hy_scores = [profile_data["scale_scores"].get(scale, 0) for scale in hy_subscales]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(hy_subscales, hy_scores, color='khaki')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Hysteria (Scale 3) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(hy_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Psychopathic Deviate
-        pd_subscales = ["Pd1", "Pd2", "Pd3", "Pd4", "Pd5"]
-        pd_scores = [profile_data["scale_scores"].get(scale, 0) for scale in pd_subscales]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(pd_subscales, pd_scores, color='lightcoral')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Psychopathic Deviate (Scale 4) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(pd_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Paranoia
-        pa_subscales = ["Pa1", "Pa2", "Pa3"]
-        pa_scores = [profile_data["scale_scores"].get(scale, 0) for scale in pa_subscales]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(pa_subscales, pa_scores, color='palegreen')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Paranoia (Scale 6) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(pa_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Schizophrenia
-        sc_subscales = ["Sc1", "Sc2", "Sc3", "Sc4", "Sc5", "Sc6"]
-        sc_scores = [profile_data["scale_scores"].get(scale, 0) for scale in sc_subscales]
-        
-        plt.figure(figsize=(12, 6))
-        plt.bar(sc_subscales, sc_scores, color='mediumpurple')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Schizophrenia (Scale 8) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-
-        for i, score in enumerate(sc_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-
-        pdf.savefig()
-        plt.close()
+    # Validity, clinical and Harris-Lingoes graphs, one per page; the clinical
+    # graph highlights the highest scales for the two-point code
+    specs = [
+        chart_spec('validity_scales', 'threshold_bars', title='Validity Scales T-Scores'),
+        chart_spec('clinical_scales', 'threshold_bars', title='Clinical Scales T-Scores', color='lightgreen',
+                   highlight_top=2, highlight_color='darkgreen'),
+        chart_spec('harris_lingoes_d', 'threshold_bars', color='salmon', fig_size=(10, 6)),
+        chart_spec('harris_lingoes_hy', 'threshold_bars', color='khaki', fig_size=(10, 6)),
+        chart_spec('harris_lingoes_pd', 'threshold_bars', color='lightcoral', fig_size=(10, 6)),
+        chart_spec('harris_lingoes_pa', 'threshold_bars', color='palegreen', fig_size=(10, 6)),
+        chart_spec('harris_lingoes_sc', 'threshold_bars', color='mediumpurple')
+    ]
+    GraphEngine().render_pages([(spec, profile_data["scale_scores"]) for spec in specs], pdf_path)
 
     return pdf_path
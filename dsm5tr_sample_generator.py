@@ -10,9 +10,6 @@ impressions based on the decision tree algorithms.
 import os
 import sys
 import json
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_pdf import PdfPages
 from datetime import datetime
 
 # Add the project root to the Python path
@@ -20,6 +17,7 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # Import necessary modules
 from src.interpretation.dsm5tr_decision_trees import get_diagnostic_impressions, get_treatment_recommendations
+from src.reporting.graph_engine import GraphEngine, chart_spec
 
 # Create output directory if it doesn't exist
 output_dir = os.path.join(os.path.dirname(__file__), "dsm5tr_sample_output")
@@ -216,127 +214,22 @@ def create_profile_graphs(profile_data, output_dir):
     """
     scale_scores = profile_data["scale_scores"]
     
-    # Create traditional profile graph (Validity and Clinical Scales)
-    with PdfPages(os.path.join(output_dir, "traditional_profile_graph.pdf")) as pdf:
-        plt.figure(figsize=(12, 8))
-        
-        # Validity Scales
-        validity_scales = ["L", "F", "K", "Fb", "Fp", "FBS"]
-        validity_scores = [scale_scores.get(scale, 50) for scale in validity_scales]
-        
-        # Clinical Scales
-        clinical_scales = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-        clinical_scores = [scale_scores.get(scale, 50) for scale in clinical_scales]
-        
-        # Combined scales for x-axis
-        all_scales = validity_scales + clinical_scales
-        all_scores = validity_scores + clinical_scores
-        
-        # Create x-axis positions
-        x_pos = np.arange(len(all_scales))
-        
-        # Create the bar chart
-        plt.bar(x_pos, all_scores, color=['blue' if i < len(validity_scales) else 'red' for i in range(len(all_scales))])
-        
-        # Add horizontal lines for clinical significance
-        plt.axhline(y=65, color='orange', linestyle='--', alpha=0.7)
-        plt.axhline(y=70, color='red', linestyle='--', alpha=0.7)
-        
-        # Add labels and title
-        plt.xlabel('MMPI-2 Scales')
-        plt.ylabel('T-Scores')
-        plt.title('MMPI-2 Validity and Clinical Scales Profile')
-        plt.xticks(x_pos, all_scales, rotation=45)
-        
-        # Add grid
-        plt.grid(axis='y', alpha=0.3)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(all_scores):
-            plt.text(i, v + 2, str(v), ha='center')
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save to PDF
-        pdf.savefig()
-        plt.close()
-        
-        # Create separate graphs for each scale family
-        # RC Scales
-        plt.figure(figsize=(12, 8))
-        rc_scales = ["RCd", "RC1", "RC2", "RC3", "RC4", "RC6", "RC7", "RC8", "RC9"]
-        rc_scores = [scale_scores.get(scale, 50) for scale in rc_scales]
-        
-        x_pos = np.arange(len(rc_scales))
-        plt.bar(x_pos, rc_scores, color='green')
-        
-        plt.axhline(y=65, color='orange', linestyle='--', alpha=0.7)
-        plt.axhline(y=70, color='red', linestyle='--', alpha=0.7)
-        
-        plt.xlabel('RC Scales')
-        plt.ylabel('T-Scores')
-        plt.title('MMPI-2 Restructured Clinical Scales Profile')
-        plt.xticks(x_pos, rc_scales, rotation=45)
-        
-        plt.grid(axis='y', alpha=0.3)
-        
-        for i, v in enumerate(rc_scores):
-            plt.text(i, v + 2, str(v), ha='center')
-        
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # Content Scales
-        plt.figure(figsize=(14, 8))
-        content_scales = ["ANX", "FRS", "OBS", "DEP", "HEA", "BIZ", "ANG", "CYN", "ASP", "TPA", "LSE", "SOD", "FAM", "WRK", "TRT"]
-        content_scores = [scale_scores.get(scale, 50) for scale in content_scales]
-        
-        x_pos = np.arange(len(content_scales))
-        plt.bar(x_pos, content_scores, color='purple')
-        
-        plt.axhline(y=65, color='orange', linestyle='--', alpha=0.7)
-        plt.axhline(y=70, color='red', linestyle='--', alpha=0.7)
-        
-        plt.xlabel('Content Scales')
-        plt.ylabel('T-Scores')
-        plt.title('MMPI-2 Content Scales Profile')
-        plt.xticks(x_pos, content_scales, rotation=45)
-        
-        plt.grid(axis='y', alpha=0.3)
-        
-        for i, v in enumerate(content_scores):
-            plt.text(i, v + 2, str(v), ha='center')
-        
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # PSY-5 Scales
-        plt.figure(figsize=(10, 8))
-        psy5_scales = ["AGGR", "PSYC", "DISC", "NEGE", "INTR"]
-        psy5_scores = [scale_scores.get(scale, 50) for scale in psy5_scales]
-        
-        x_pos = np.arange(len(psy5_scales))
-        plt.bar(x_pos, psy5_scores, color='brown')
-        
-        plt.axhline(y=65, color='orange', linestyle='--', alpha=0.7)
-        plt.axhline(y=70, color='red', linestyle='--', alpha=0.7)
-        
-        plt.xlabel('PSY-5 Scales')
-        plt.ylabel('T-Scores')
-        plt.title('MMPI-2 PSY-5 Scales Profile')
-        plt.xticks(x_pos, psy5_scales, rotation=45)
-        
-        plt.grid(axis='y', alpha=0.3)
-        
-        for i, v in enumerate(psy5_scores):
-            plt.text(i, v + 2, str(v), ha='center')
-        
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
+    # Traditional profile graph (validity and clinical scales), then a graph for each scale family
+    charts = [
+        chart_spec(style='cutoff_bars', title='MMPI-2 Validity and Clinical Scales Profile',
+                   xlabel='MMPI-2 Scales', group_gap=0, groups=[
+                       {'scales': ["L", "F", "K", "Fb", "Fp", "FBS"], 'color': 'blue'},
+                       {'scales': ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"], 'color': 'red'}
+                   ]),
+        chart_spec('rc_scales', 'cutoff_bars', title='MMPI-2 Restructured Clinical Scales Profile',
+                   xlabel='RC Scales', color='green'),
+        chart_spec('content_scales', 'cutoff_bars', title='MMPI-2 Content Scales Profile',
+                   xlabel='Content Scales', color='purple', fig_size=(14, 8)),
+        chart_spec('psy5_scales', 'cutoff_bars', title='MMPI-2 PSY-5 Scales Profile',
+                   xlabel='PSY-5 Scales', color='brown', fig_size=(10, 8))
+    ]
+    GraphEngine().render_pages([(spec, scale_scores) for spec in charts],
+                               os.path.join(output_dir, "traditional_profile_graph.pdf"))
 
 def save_report(report, output_dir):
     """Save the generated report to the output directory."""
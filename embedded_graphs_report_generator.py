@@ -8,11 +8,6 @@ within the report narrative.
 import os
 import sys
 import json
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-from matplotlib.backends.backend_pdf import PdfPages
 from datetime import datetime
 import base64
 from weasyprint import HTML, CSS
@@ -24,6 +19,7 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 # Import interpretation modules
 from src.interpretation.scale_interpretations import get_scale_interpretation
 from src.interpretation.dsm5tr_decision_trees import get_dsm5tr_diagnostic_impressions
+from src.reporting.graph_engine import GraphEngine, chart_spec
 
 # Output directory
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "embedded_graphs_report_output")
@@ -150,183 +146,80 @@ def create_clinical_profile():
     }
     return profile_data
 
-def generate_traditional_profile_graph(profile_data, output_path):
-    """Generate a traditional MMPI-2 profile graph with validity and clinical scales."""
-    # Extract scores
-    validity_scales = ["L", "F", "K"]
-    clinical_scales = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-    
-    validity_scores = [profile_data["scale_scores"][scale] for scale in validity_scales]
-    clinical_scores = [profile_data["scale_scores"][scale] for scale in clinical_scales]
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # X-axis positions
-    x_validity = np.arange(len(validity_scales))
-    x_clinical = np.arange(len(clinical_scales)) + len(validity_scales) + 1
-    
-    # Plot bars
-    validity_bars = ax.bar(x_validity, validity_scores, color='lightblue', width=0.7)
-    clinical_bars = ax.bar(x_clinical, clinical_scores, color='lightgreen', width=0.7)
-    
-    # Highlight clinically significant elevations (T >= 65)
-    for i, score in enumerate(validity_scores):
-        if score >= 65:
-            validity_bars[i].set_color('salmon')
-    
-    for i, score in enumerate(clinical_scores):
-        if score >= 65:
-            clinical_bars[i].set_color('salmon')
-    
-    # Add T-score reference lines
-    ax.axhline(y=50, color='black', linestyle='-', alpha=0.3)
-    ax.axhline(y=65, color='red', linestyle='--', alpha=0.5)
-    ax.axhline(y=80, color='red', linestyle='-', alpha=0.5)
-    
-    # Set axis labels and title
-    ax.set_ylabel('T-Score')
-    ax.set_title('MMPI-2 Profile: Validity and Clinical Scales')
-    
-    # Set x-tick labels
-    all_labels = validity_scales + [""] + clinical_scales
-    all_positions = list(x_validity) + [len(validity_scales)] + list(x_clinical)
-    ax.set_xticks(all_positions)
-    ax.set_xticklabels(all_labels)
-    
-    # Add T-score values above bars
-    for i, score in enumerate(validity_scores):
-        ax.text(x_validity[i], score + 1, str(score), ha='center')
-    
-    for i, score in enumerate(clinical_scores):
-        ax.text(x_clinical[i], score + 1, str(score), ha='center')
-    
-    # Set y-axis limits
-    ax.set_ylim(0, max(max(validity_scores), max(clinical_scores)) + 10)
-    
-    # Add legend
-    ax.legend([validity_bars[0], clinical_bars[0]], ['Validity Scales', 'Clinical Scales'])
-    
-    # Adjust layout and save
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
-    
-    return output_path
+def traditional_profile_spec():
+    """Build the chart spec of the traditional profile graph with validity and clinical scales."""
+    return chart_spec(
+        style='elevation_bars',
+        title='MMPI-2 Profile: Validity and Clinical Scales',
+        fig_size=(10, 6),
+        groups=[
+            {'scales': ["L", "F", "K"], 'color': 'lightblue', 'label': 'Validity Scales'},
+            {'scales': ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"], 'color': 'lightgreen',
+             'label': 'Clinical Scales'}
+        ],
+        legend=True
+    )
 
-def generate_scale_family_graph(profile_data, scale_family, output_path):
-    """Generate a graph for a specific scale family."""
+def scale_family_spec(scale_family):
+    """Build the chart spec of the graph of a specific scale family."""
     scale_family_mapping = {
-        "validity": {
-            "scales": ["?", "VRIN", "TRIN", "F", "Fb", "Fp", "FBS", "L", "K"],
-            "title": "Validity Scales",
-            "color": "lightblue"
-        },
-        "clinical": {
-            "scales": ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"],
-            "title": "Clinical Scales",
-            "color": "lightgreen"
-        },
-        "harris_lingoes": {
-            "scales": ["D1", "D2", "D3", "D4", "D5", "Hy1", "Hy2", "Hy3", "Hy4", "Hy5", 
-                      "Pd1", "Pd2", "Pd3", "Pd4", "Pd5", "Pa1", "Pa2", "Pa3", 
-                      "Sc1", "Sc2", "Sc3", "Sc4", "Sc5", "Sc6", "Ma1", "Ma2", "Ma3", "Ma4"],
-            "title": "Harris-Lingoes Subscales",
-            "color": "lightyellow"
-        },
-        "content": {
-            "scales": ["ANX", "FRS", "OBS", "DEP", "HEA", "BIZ", "ANG", "CYN", "ASP", "TPA", "LSE", "SOD", "FAM", "WRK", "TRT"],
-            "title": "Content Scales",
-            "color": "lightcoral"
-        },
-        "rc": {
-            "scales": ["RCd", "RC1", "RC2", "RC3", "RC4", "RC6", "RC7", "RC8", "RC9"],
-            "title": "Restructured Clinical (RC) Scales",
-            "color": "lightgreen"
-        },
-        "psy5": {
-            "scales": ["AGGR", "PSYC", "DISC", "NEGE", "INTR"],
-            "title": "PSY-5 Scales",
-            "color": "lightpink"
-        },
-        "supplementary": {
-            "scales": ["A", "R", "Es", "Do", "Re", "Mt", "GM", "GF", "PK", "PS", "MDS", "APS", "AAS", "MAC-R", "O-H"],
-            "title": "Supplementary Scales",
-            "color": "lightgrey"
-        }
+        "validity": chart_spec('validity_scales', 'elevation_bars', color="lightblue"),
+        "clinical": chart_spec('clinical_scales', 'elevation_bars', color="lightgreen", labels=None),
+        "harris_lingoes": chart_spec('harris_lingoes_subscales', 'elevation_bars', color="lightyellow"),
+        "content": chart_spec('content_scales', 'elevation_bars', color="lightcoral"),
+        "rc": chart_spec('rc_scales', 'elevation_bars', color="lightgreen"),
+        "psy5": chart_spec('psy5_scales', 'elevation_bars', color="lightpink"),
+        "supplementary": chart_spec('supplementary_scales', 'elevation_bars', color="lightgrey",
+                                    scales=["A", "R", "Es", "Do", "Re", "Mt", "GM", "GF", "PK", "PS",
+                                            "MDS", "APS", "AAS", "MAC-R", "O-H"])
     }
     
     if scale_family not in scale_family_mapping:
         raise ValueError(f"Unknown scale family: {scale_family}")
     
-    scales = scale_family_mapping[scale_family]["scales"]
-    title = scale_family_mapping[scale_family]["title"]
-    color = scale_family_mapping[scale_family]["color"]
-    
-    # Extract scores
-    scores = []
-    for scale in scales:
-        if scale in profile_data["scale_scores"]:
-            scores.append(profile_data["scale_scores"][scale])
-        else:
-            scores.append(0)  # Default if scale not found
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # X-axis positions
-    x_pos = np.arange(len(scales))
-    
-    # Plot bars
-    bars = ax.bar(x_pos, scores, color=color, width=0.7)
-    
-    # Highlight clinically significant elevations (T >= 65)
-    for i, score in enumerate(scores):
-        if score >= 65:
-            bars[i].set_color('salmon')
-    
-    # Add T-score reference lines
-    ax.axhline(y=50, color='black', linestyle='-', alpha=0.3)
-    ax.axhline(y=65, color='red', linestyle='--', alpha=0.5)
-    ax.axhline(y=80, color='red', linestyle='-', alpha=0.5)
-    
-    # Set axis labels and title
-    ax.set_ylabel('T-Score')
-    ax.set_title(f'MMPI-2 {title}')
-    
-    # Set x-tick labels
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(scales, rotation=45 if len(scales) > 10 else 0)
-    
-    # Add T-score values above bars
-    for i, score in enumerate(scores):
-        ax.text(x_pos[i], score + 1, str(score), ha='center')
-    
-    # Set y-axis limits
-    ax.set_ylim(0, max(scores) + 10)
-    
-    # Adjust layout and save
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
-    
-    return output_path
+    spec = scale_family_mapping[scale_family]
+    spec['title'] = f"MMPI-2 {spec['title']}"
+    return spec
 
-def generate_all_graphs(profile_data):
-    """Generate all graphs for the report."""
-    graph_paths = {}
-    
-    # Traditional profile graph
-    traditional_graph_path = os.path.join(OUTPUT_DIR, "traditional_profile_graph.png")
-    graph_paths["traditional"] = generate_traditional_profile_graph(profile_data, traditional_graph_path)
-    
-    # Scale family graphs
+def render_graph(spec, profile_data, output_path=None):
+    """Render a graph to output_path, or in memory as a base64 PNG data URI when no path is given."""
+    if output_path is None:
+        return GraphEngine().render_data_uris([(spec, profile_data["scale_scores"], 'png')])[0]
+    return GraphEngine().render(spec, profile_data["scale_scores"], output_path)
+
+def generate_traditional_profile_graph(profile_data, output_path=None):
+    """Generate a traditional MMPI-2 profile graph with validity and clinical scales."""
+    return render_graph(traditional_profile_spec(), profile_data, output_path)
+
+def generate_scale_family_graph(profile_data, scale_family, output_path=None):
+    """Generate a graph for a specific scale family."""
+    return render_graph(scale_family_spec(scale_family), profile_data, output_path)
+
+def generate_all_graphs(profile_data, in_memory=False):
+    """
+    Generate all graphs for the report.
+    
+    In memory, every graph is rendered into a buffer and returned as a base64
+    PNG data URI that goes straight into the template context as an <img> src,
+    so nothing is written to OUTPUT_DIR and concurrent runs cannot collide.
+    Otherwise the graphs are written to OUTPUT_DIR and their paths returned.
+    """
+    # Traditional profile graph, then the scale family graphs
     scale_families = ["validity", "clinical", "harris_lingoes", "content", "rc", "psy5", "supplementary"]
-    for family in scale_families:
-        output_path = os.path.join(OUTPUT_DIR, f"{family}_scales_graph.png")
-        graph_paths[family] = generate_scale_family_graph(profile_data, family, output_path)
-    
-    return graph_paths
+    names = ["traditional"] + scale_families
+    specs = [traditional_profile_spec()] + [scale_family_spec(family) for family in scale_families]
+    
+    graph_engine = GraphEngine()
+    if in_memory:
+        graphs = graph_engine.render_data_uris([(spec, profile_data["scale_scores"], 'png') for spec in specs])
+    else:
+        output_paths = [os.path.join(OUTPUT_DIR, "traditional_profile_graph.png")]
+        output_paths += [os.path.join(OUTPUT_DIR, f"{family}_scales_graph.png") for family in scale_families]
+        graphs = graph_engine.render_charts(
+            [(spec, profile_data["scale_scores"], path) for spec, path in zip(specs, output_paths)]
+        )
+    
+    return dict(zip(names, graphs))
 
 def get_two_point_code(profile_data):
     """Determine the two-point code from clinical scales."""
@@ -13,10 +13,6 @@ This script integrates all improvements including:
 import os
 import sys
 import json
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
-from matplotlib.backends.backend_pdf import PdfPages
-import numpy as np
 from datetime import datetime
 
 # Add the project root to the Python path
@@ -33,6 +29,8 @@ from src.interpretation.psy5_scales import get_psy5_scale_interpretation
 from src.interpretation.supplementary_scales import get_supplementary_scale_interpretation
 from src.interpretation.dsm5tr_decision_trees import get_dsm5tr_diagnostic_impressions
 from src.interpretation.component_scales import get_component_scale_interpretation, get_component_scale_integration, get_component_scale_diagnostic_considerations
+from src.constants.graph_constants import CHART_FAMILY_SPECS
+from src.reporting.graph_engine import GraphEngine, chart_spec
 
 # Create output directory if it doesn't exist
 output_dir = "final_comprehensive_output"
@@ -247,62 +245,24 @@ def create_traditional_profile_graph(profile_data, output_file):
     validity_scales = profile_data["scale_families"]["validity_scales"]
     clinical_scales = profile_data["scale_families"]["clinical_scales"]
     
-    # Set up the figure
-    fig = plt.figure(figsize=(12, 8))
-    fig.suptitle("MMPI-2 Profile: Validity and Clinical Scales", fontsize=16)
-    
-    # Create grid for subplots
-    gs = gridspec.GridSpec(2, 1, height_ratios=[1, 2])
-    
-    # Validity scales subplot
-    ax1 = plt.subplot(gs[0])
-    validity_labels = ["VRIN", "TRIN", "F", "Fb", "Fp", "L", "K", "S"]
-    validity_values = [validity_scales[scale] for scale in validity_labels]
-    
-    ax1.bar(validity_labels, validity_values, color='lightblue', edgecolor='black')
-    ax1.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-    ax1.set_ylabel('T-Score')
-    ax1.set_title('Validity Scales')
-    ax1.set_ylim(0, 120)
-    ax1.grid(axis='y', linestyle='--', alpha=0.7)
-    
-    # Add T-score values above bars
-    for i, v in enumerate(validity_values):
-        ax1.text(i, v + 3, str(v), ha='center')
-    
-    # Clinical scales subplot
-    ax2 = plt.subplot(gs[1])
-    clinical_labels = ["1 (Hs)", "2 (D)", "3 (Hy)", "4 (Pd)", "5 (Mf)", "6 (Pa)", "7 (Pt)", "8 (Sc)", "9 (Ma)", "0 (Si)"]
-    clinical_values = [clinical_scales[scale] for scale in "1234567890"]
-    
-    # Highlight the two-point code (highest scales)
-    colors = ['lightblue'] * 10
-    sorted_indices = sorted(range(len(clinical_values)), key=lambda i: clinical_values[i], reverse=True)
-    for i in sorted_indices[:2]:
-        colors[i] = 'salmon'
-    
-    ax2.bar(clinical_labels, clinical_values, color=colors, edgecolor='black')
-    ax2.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-    ax2.set_ylabel('T-Score')
-    ax2.set_title('Clinical Scales')
-    ax2.set_ylim(0, 120)
-    ax2.grid(axis='y', linestyle='--', alpha=0.7)
-    
-    # Add T-score values above bars
-    for i, v in enumerate(clinical_values):
-        ax2.text(i, v + 3, str(v), ha='center')
-    
-    # Add legend
-    ax2.legend()
-    
-    # Adjust layout
-    plt.tight_layout()
-    
-    # Save the figure
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    return output_file
+    # Validity scales above the clinical scales, with the two-point code (highest scales) highlighted
+    spec = chart_spec(
+        style='outlined_bars',
+        fig_size=(12, 8),
+        suptitle="MMPI-2 Profile: Validity and Clinical Scales",
+        title_fontsize=16,
+        height_ratios=[1, 2],
+        panels=[
+            chart_spec('validity_scales', 'outlined_bars', scales=["VRIN", "TRIN", "F", "Fb", "Fp", "L", "K", "S"],
+                       color='lightblue', legend=None),
+            chart_spec('clinical_scales', 'outlined_bars', color='lightblue', highlight_top=2, highlight_color='salmon',
+                       labels=["1 (Hs)", "2 (D)", "3 (Hy)", "4 (Pd)", "5 (Mf)", "6 (Pa)", "7 (Pt)", "8 (Sc)",
+                               "9 (Ma)", "0 (Si)"])
+        ],
+        save_dpi=300,
+        bbox_inches='tight'
+    )
+    return GraphEngine().render(spec, {**validity_scales, **clinical_scales}, output_file)
 
 def create_scale_family_graphs(profile_data, output_file):
     """
@@ -312,108 +272,19 @@ def create_scale_family_graphs(profile_data, output_file):
     scale_families = profile_data["scale_families"]
     
     # Create a PDF with multiple pages
-    with PdfPages(output_file) as pdf:
-        # 1. RC Scales
-        fig, ax = plt.subplots(figsize=(12, 6))
-        rc_labels = ["RCd", "RC1", "RC2", "RC3", "RC4", "RC6", "RC7", "RC8", "RC9"]
-        rc_values = [scale_families["rc_scales"][scale] for scale in rc_labels]
-        
-        ax.bar(rc_labels, rc_values, color='lightgreen', edgecolor='black')
-        ax.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-        ax.set_ylabel('T-Score')
-        ax.set_title('Restructured Clinical (RC) Scales')
-        ax.set_ylim(0, 120)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(rc_values):
-            ax.text(i, v + 3, str(v), ha='center')
-        
-        ax.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # 2. Content Scales
-        fig, ax = plt.subplots(figsize=(14, 6))
-        content_labels = ["ANX", "FRS", "OBS", "DEP", "HEA", "BIZ", "ANG", "CYN", "ASP", "TPA", "LSE", "SOD", "FAM", "WRK", "TRT"]
-        content_values = [scale_families["content_scales"][scale] for scale in content_labels]
-        
-        ax.bar(content_labels, content_values, color='lightsalmon', edgecolor='black')
-        ax.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-        ax.set_ylabel('T-Score')
-        ax.set_title('Content Scales')
-        ax.set_ylim(0, 120)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(content_values):
-            ax.text(i, v + 3, str(v), ha='center')
-        
-        ax.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # 3. PSY-5 Scales
-        fig, ax = plt.subplots(figsize=(10, 6))
-        psy5_labels = ["AGGR", "PSYC", "DISC", "NEGE", "INTR"]
-        psy5_values = [scale_families["psy5_scales"][scale] for scale in psy5_labels]
-        
-        ax.bar(psy5_labels, psy5_values, color='lightblue', edgecolor='black')
-        ax.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-        ax.set_ylabel('T-Score')
-        ax.set_title('Personality Psychopathology Five (PSY-5) Scales')
-        ax.set_ylim(0, 120)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(psy5_values):
-            ax.text(i, v + 3, str(v), ha='center')
-        
-        ax.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # 4. Supplementary Scales
-        fig, ax = plt.subplots(figsize=(14, 6))
-        supp_labels = ["A", "R", "Es", "Do", "Re", "Mt", "GM", "GF", "PK", "PS", "MDS", "APS", "AAS", "O-H", "MAC-R", "FPTSD"]
-        supp_values = [scale_families["supplementary_scales"][scale] for scale in supp_labels]
-        
-        ax.bar(supp_labels, supp_values, color='plum', edgecolor='black')
-        ax.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-        ax.set_ylabel('T-Score')
-        ax.set_title('Supplementary Scales')
-        ax.set_ylim(0, 120)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(supp_values):
-            ax.text(i, v + 3, str(v), ha='center')
-        
-        ax.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # 5. Harris-Lingoes Subscales
-        fig, ax = plt.subplots(figsize=(16, 8))
-        hl_labels = ["D1", "D2", "D3", "D4", "D5", "Hy1", "Hy2", "Hy3", "Hy4", "Hy5", 
-                     "Pd1", "Pd2", "Pd3", "Pd4", "Pd5", "Pa1", "Pa2", "Pa3", 
-                     "Sc1", "Sc2", "Sc3", "Sc4", "Sc5", "Sc6", 
-                     "Ma1", "Ma2", "Ma3", "Ma4", "Si1", "Si2", "Si3"]
-        hl_values = [scale_families["harris_lingoes_subscales"][scale] for scale in hl_labels]
-        
-        ax.bar(hl_labels, hl_values, color='lightgrey', edgecolor='black')
-        ax.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance (T=65)')
-        ax.set_ylabel('T-Score')
-        ax.set_title('Harris-Lingoes Subscales')
-        ax.set_ylim(0, 120)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        ax.legend()
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
+    charts = [
+        (chart_spec('rc_scales', 'outlined_bars', color='lightgreen'), scale_families["rc_scales"]),
+        (chart_spec('content_scales', 'outlined_bars', color='lightsalmon', fig_size=(14, 6)),
+         scale_families["content_scales"]),
+        (chart_spec('psy5_scales', 'outlined_bars', title='Personality Psychopathology Five (PSY-5) Scales',
+                    color='lightblue', fig_size=(10, 6)), scale_families["psy5_scales"]),
+        (chart_spec('supplementary_scales', 'outlined_bars', color='plum', fig_size=(14, 6),
+                    scales=["A", "R", "Es", "Do", "Re", "Mt", "GM", "GF", "PK", "PS", "MDS", "APS", "AAS", "O-H",
+                            "MAC-R", "FPTSD"]), scale_families["supplementary_scales"]),
+        (chart_spec('harris_lingoes_subscales', 'outlined_bars', color='lightgrey', fig_size=(16, 8),
+                    scales=CHART_FAMILY_SPECS['harris_lingoes_subscales']['scales'] + ["Si1", "Si2", "Si3"],
+                    value_labels=None), scale_families["harris_lingoes_subscales"])
+    ]
+    GraphEngine().render_pages(charts, output_file)
 
     return output_file
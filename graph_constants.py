@@ -0,0 +1,223 @@
+"""
+Profile graph constants for the MMPI-2 platform.
+
+This module defines the scale families that are drawn as profile graphs, their
+plotting order, titles and output file names, and the available graph output
+formats. It has no plotting dependencies so the web process and the SVG
+backend can use it without importing matplotlib.
+"""
+
+# Plotted T-score range and clinical reference lines
+T_SCORE_AXIS = (30, 120)
+REFERENCE_LINES = [65, 50]
+
+# T-score from which an elevation is clinically significant
+CLINICAL_THRESHOLD = 65
+
+# Value plotted for a scale with no score
+DEFAULT_T_SCORE = 50
+
+# Graph output formats; "png" is rendered with matplotlib, "svg" directly from templates
+# and "client" only writes the graph profile, which the report viewer draws in the browser
+GRAPH_FORMATS = ['png', 'svg', 'client']
+DEFAULT_GRAPH_FORMAT = 'png'
+
+# Base name of the file that combines every family graph
+COMBINED_GRAPHS_BASENAME = 'all_profile_graphs'
+
+# Compact JSON profile (scale order, T-scores, thresholds) drawn by static/profile_charts.js
+GRAPH_PROFILE_FILENAME = 'profile_graphs.json'
+
+# Quality tiers of PNG family graphs. Report builds render the small preview
+# tier; the full and print tiers are rendered from the graph profile the first
+# time they are requested. Every tier keeps the 10x8 inch layout and only
+# changes the resolution.
+GRAPH_QUALITY_TIERS = {
+    'preview': {'fig_size': (10, 8), 'dpi': 50},
+    'full': {'fig_size': (10, 8), 'dpi': 100},
+    'print': {'fig_size': (10, 8), 'dpi': 300}
+}
+DEFAULT_GRAPH_QUALITY = 'full'
+EAGER_GRAPH_QUALITIES = ['preview']
+
+# Per-family graph definitions
+GRAPH_FAMILY_SPECS = {
+    'traditional': {
+        'scales': ['L', 'F', 'K', '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
+        'labels': ['L', 'F', 'K', 'Hs', 'D', 'Hy', 'Pd', 'Mf', 'Pa', 'Pt', 'Sc', 'Ma', 'Si'],
+        'title': 'MMPI-2 Clinical Scales Profile',
+        'basename': 'traditional_profile_graph',
+        'display_name': 'Traditional Profile Graph'
+    },
+    'rc_scales': {
+        'scales': ['RCd', 'RC1', 'RC2', 'RC3', 'RC4', 'RC6', 'RC7', 'RC8', 'RC9'],
+        'title': 'MMPI-2 Restructured Clinical (RC) Scales',
+        'basename': 'rc_scales_graph',
+        'display_name': 'RC Scales Graph',
+        'full_names': {
+            'RCd': 'Demoralization',
+            'RC1': 'Somatic Complaints',
+            'RC2': 'Low Positive Emotions',
+            'RC3': 'Cynicism',
+            'RC4': 'Antisocial Behavior',
+            'RC6': 'Ideas of Persecution',
+            'RC7': 'Dysfunctional Negative Emotions',
+            'RC8': 'Aberrant Experiences',
+            'RC9': 'Hypomanic Activation'
+        }
+    },
+    'content_scales': {
+        'scales': ['ANX', 'FRS', 'OBS', 'DEP', 'HEA', 'BIZ', 'ANG', 'CYN',
+                   'ASP', 'TPA', 'LSE', 'SOD', 'FAM', 'WRK', 'TRT'],
+        'title': 'MMPI-2 Content Scales',
+        'basename': 'content_scales_graph',
+        'display_name': 'Content Scales Graph',
+        'label_rotation': 45
+    },
+    'psy5_scales': {
+        'scales': ['AGGR', 'PSYC', 'DISC', 'NEGE', 'INTR'],
+        'title': 'MMPI-2 PSY-5 Scales',
+        'basename': 'psy5_scales_graph',
+        'display_name': 'PSY-5 Scales Graph',
+        'full_names': {
+            'AGGR': 'Aggressiveness',
+            'PSYC': 'Psychoticism',
+            'DISC': 'Disconstraint',
+            'NEGE': 'Negative Emotionality/Neuroticism',
+            'INTR': 'Introversion/Low Positive Emotionality'
+        }
+    },
+    'supplementary_scales': {
+        'scales': ['A', 'R', 'Es', 'Do', 'Re', 'Mt', 'PK', 'MDS', 'Ho', 'O-H', 'MAC-R', 'APS', 'GM', 'GF'],
+        'title': 'MMPI-2 Supplementary Scales',
+        'basename': 'supplementary_scales_graph',
+        'display_name': 'Supplementary Scales Graph',
+        'label_rotation': 45
+    }
+}
+
+# Families in the order they appear in reports
+GRAPH_FAMILIES = list(GRAPH_FAMILY_SPECS)
+
+# Scale families charted by the report generators (bar and line charts); the
+# families shared with the profile graphs take their scales from GRAPH_FAMILY_SPECS
+CHART_FAMILY_SPECS = {
+    'traditional': {
+        'scales': GRAPH_FAMILY_SPECS['traditional']['scales'],
+        'title': 'MMPI-2 Traditional Profile'
+    },
+    'validity_scales': {
+        'scales': ['?', 'VRIN', 'TRIN', 'F', 'Fb', 'Fp', 'FBS', 'L', 'K'],
+        'title': 'Validity Scales'
+    },
+    'clinical_scales': {
+        'scales': ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
+        'labels': ['Hs', 'D', 'Hy', 'Pd', 'Mf', 'Pa', 'Pt', 'Sc', 'Ma', 'Si'],
+        'title': 'Clinical Scales'
+    },
+    'harris_lingoes_subscales': {
+        'scales': ['D1', 'D2', 'D3', 'D4', 'D5', 'Hy1', 'Hy2', 'Hy3', 'Hy4', 'Hy5',
+                   'Pd1', 'Pd2', 'Pd3', 'Pd4', 'Pd5', 'Pa1', 'Pa2', 'Pa3',
+                   'Sc1', 'Sc2', 'Sc3', 'Sc4', 'Sc5', 'Sc6', 'Ma1', 'Ma2', 'Ma3', 'Ma4'],
+        'title': 'Harris-Lingoes Subscales'
+    },
+    'harris_lingoes_d': {
+        'scales': ['D1', 'D2', 'D3', 'D4', 'D5'],
+        'title': 'Depression (Scale 2) Harris-Lingoes Subscales'
+    },
+    'harris_lingoes_hy': {
+        'scales': ['Hy1', 'Hy2', 'Hy3', 'Hy4', 'Hy5'],
+        'title': 'Hysteria (Scale 3) Harris-Lingoes Subscales'
+    },
+    'harris_lingoes_pd': {
+        'scales': ['Pd1', 'Pd2', 'Pd3', 'Pd4', 'Pd5'],
+        'title': 'Psychopathic Deviate (Scale 4) Harris-Lingoes Subscales'
+    },
+    'harris_lingoes_pa': {
+        'scales': ['Pa1', 'Pa2', 'Pa3'],
+        'title': 'Paranoia (Scale 6) Harris-Lingoes Subscales'
+    },
+    'harris_lingoes_sc': {
+        'scales': ['Sc1', 'Sc2', 'Sc3', 'Sc4', 'Sc5', 'Sc6'],
+        'title': 'Schizophrenia (Scale 8) Harris-Lingoes Subscales'
+    },
+    'content_scales': {
+        'scales': GRAPH_FAMILY_SPECS['content_scales']['scales'],
+        'title': 'Content Scales'
+    },
+    'rc_scales': {
+        'scales': GRAPH_FAMILY_SPECS['rc_scales']['scales'],
+        'title': 'Restructured Clinical (RC) Scales'
+    },
+    'psy5_scales': {
+        'scales': GRAPH_FAMILY_SPECS['psy5_scales']['scales'],
+        'title': 'PSY-5 Scales'
+    },
+    'supplementary_scales': {
+        'scales': GRAPH_FAMILY_SPECS['supplementary_scales']['scales'],
+        'title': 'Supplementary Scales'
+    }
+}
+
+
+def family_t_scores(family, family_scores):
+    """
+    Extract the T-scores of a family in plotting order.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        family_scores (dict): Scale code -> T-score
+
+    Returns:
+        list: T-scores, with DEFAULT_T_SCORE for missing scales
+    """
+    return [family_scores.get(scale, DEFAULT_T_SCORE) for scale in GRAPH_FAMILY_SPECS[family]['scales']]
+
+
+def graph_title(family, client_info):
+    """
+    Build the title of a family graph for a client.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        client_info (dict): Dictionary containing client information
+
+    Returns:
+        str: Graph title
+    """
+    name = client_info.get('name', 'Client')
+    sex_label = 'Female' if client_info.get('sex', 'female') == 'female' else 'Male'
+    return f"{GRAPH_FAMILY_SPECS[family]['title']}: {name} ({sex_label})"
+
+
+def graph_filename(family, graph_format=DEFAULT_GRAPH_FORMAT, quality=DEFAULT_GRAPH_QUALITY):
+    """
+    Get the file name of a family graph.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        graph_format (str): One of GRAPH_FORMATS
+        quality (str): Key of GRAPH_QUALITY_TIERS; only PNG graphs have tiers
+            other than the default
+
+    Returns:
+        str: File name, e.g. "rc_scales_graph.svg" or "rc_scales_graph_preview.png"
+    """
+    suffix = f"_{quality}" if graph_format == 'png' and quality != DEFAULT_GRAPH_QUALITY else ''
+    return f"{GRAPH_FAMILY_SPECS[family]['basename']}{suffix}.{graph_format}"
+
+
+def combined_graphs_filename(graph_format=DEFAULT_GRAPH_FORMAT):
+    """
+    Get the file name of the document that combines every family graph.
+
+    PNG and client-side graphs are combined into a PDF; SVG graphs are inlined
+    into one HTML page.
+
+    Args:
+        graph_format (str): One of GRAPH_FORMATS
+
+    Returns:
+        str: File name
+    """
+    return f"{COMBINED_GRAPHS_BASENAME}.{'html' if graph_format == 'svg' else 'pdf'}"
@@ -0,0 +1,861 @@
+"""
+Shared graph engine for MMPI-2 reports.
+
+Every report generator describes its graphs declaratively as chart specs (which
+scales, labels, thresholds, colours and figure size) and renders them through
+this engine, so caching, parallel rendering and the choice of output backend
+are implemented once.
+
+A chart spec is a plain dict built by chart_spec() from three layers: the
+engine defaults, a named style from CHART_STYLES and a scale family from
+CHART_FAMILY_SPECS, followed by per-call overrides. Specs are rendered by a
+backend named in the spec:
+
+- "matplotlib": bar and line charts drawn on a Figure without pyplot, written
+  as PNG, PDF or SVG, or as pages of a multi-page PDF
+- "profile": the clinical profile graphs of GRAPH_FAMILY_SPECS; PNG comes from
+  the cached family templates of profile_graph_renderer, SVG and PDF pages from
+  the vector scenes of profile_graph_scene. The graph cache keeps a profile PNG
+  as a scores layer shared by every client, and the title is added per client
+
+Further backends can be added with register_graph_backend().
+
+Charts are written to files, or rendered in memory as bytes or base64 data URIs
+for reports that embed their graphs, without touching the disk.
+
+The engine is safe to use from several threads. No graph code uses pyplot: each
+chart is drawn on its own Figure and FigureCanvasAgg. The one piece of global
+state left is matplotlib's rcParams, through which the report style is applied,
+so the artists of a figure are built under report_style(), which serializes
+only that step. Every artist takes its style when it is created, so drawing,
+saving, blitted profile PNGs, vector scenes, encoding and the graph cache run
+concurrently, e.g. in gthread web workers or with graph_threads.
+"""
+
+import io
+import os
+import base64
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from src.constants.graph_constants import (
+    CHART_FAMILY_SPECS, CLINICAL_THRESHOLD, DEFAULT_T_SCORE, GRAPH_FAMILY_SPECS, GRAPH_QUALITY_TIERS,
+    DEFAULT_GRAPH_QUALITY, graph_title
+)
+from src.reporting.profile_graph_cache import graph_cache_key
+
+# matplotlib style of every report graph
+REPORT_STYLE = 'ggplot'
+
+# Guards matplotlib's process-wide rcParams; see report_style()
+_STYLE_LOCK = threading.RLock()
+
+# rc settings of REPORT_STYLE, read from the style library on first use
+_REPORT_RC = {}
+
+
+@contextmanager
+def report_style():
+    """
+    Apply the report style while the artists of a figure are built.
+
+    Artists read matplotlib's process-wide rcParams when they are created, so
+    the report style's rc settings are applied, under a lock, only while a
+    figure is built. Drawing and saving read the style from the artists and
+    run outside the lock; call settle_report_style() on the figure before
+    leaving the block.
+    """
+    import matplotlib
+    import matplotlib.style
+
+    if not _REPORT_RC:
+        _REPORT_RC.update(matplotlib.style.library[REPORT_STYLE])
+    with _STYLE_LOCK, matplotlib.rc_context(_REPORT_RC):
+        yield
+
+
+def settle_report_style(figure):
+    """
+    Create the first ticks of every axis of a figure in the report style.
+
+    matplotlib creates ticks lazily, when an axis is first drawn, and later
+    ticks copy the style of the first one. Creating it while the report style
+    is applied keeps the draw from reading rcParams.
+
+    Args:
+        figure (Figure): Figure built under report_style()
+    """
+    for ax in figure.axes:
+        for axis in (ax.xaxis, ax.yaxis):
+            axis.majorTicks[0]
+            axis.minorTicks[0]
+
+# Settings used by every chart unless its style, family or overrides change them
+DEFAULT_CHART = {
+    'backend': 'matplotlib',
+    'kind': 'bar',
+    'scales': [],
+    'title': '',
+    'xlabel': None,
+    'ylabel': 'T-Score',
+    'title_fontsize': None,
+    'label_fontsize': None,
+    'fig_size': (12, 6),
+    'dpi': 100,
+    'save_dpi': None,
+    'bbox_inches': None,
+    'tight_layout': True,
+    'default_score': 0,
+    'color': 'skyblue',
+    'edgecolor': None,
+    'bar_width': 0.8,
+    'group_gap': 1,
+    'line_format': 'o-',
+    'markersize': 8,
+    'color_bands': [],
+    'highlight_top': 0,
+    'highlight_color': None,
+    'reference_lines': [],
+    'ylim': (0, 120),
+    'ytick_step': None,
+    'grid': None,
+    'label_rotation': 0,
+    'value_labels': {'offset': 2},
+    'legend': None,
+    'legend_loc': 'best'
+}
+
+# Named chart styles shared by the report generators
+CHART_STYLES = {
+    # Bars against a fixed 0-120 axis with the T=65 threshold
+    'threshold_bars': {
+        'title_fontsize': 16,
+        'label_fontsize': 14,
+        'tight_layout': False,
+        'reference_lines': [{'y': CLINICAL_THRESHOLD, 'color': 'r', 'linestyle': '-', 'alpha': 0.7,
+                             'label': 'Clinical Significance Threshold'}],
+        'grid': {'axis': 'y', 'linestyle': '--', 'alpha': 0.7},
+        'value_labels': {'offset': 2, 'fontsize': 12},
+        'legend': True
+    },
+    # Outlined bars with the T=65 threshold
+    'outlined_bars': {
+        'edgecolor': 'black',
+        'reference_lines': [{'y': CLINICAL_THRESHOLD, 'color': 'r', 'linestyle': '-', 'alpha': 0.7,
+                             'label': f'Clinical Significance (T={CLINICAL_THRESHOLD})'}],
+        'grid': {'axis': 'y', 'linestyle': '--', 'alpha': 0.7},
+        'value_labels': {'offset': 3},
+        'legend': True
+    },
+    # Bars scaled to the profile, elevations highlighted, T=50/65/80 reference lines
+    'elevation_bars': {
+        'bar_width': 0.7,
+        'color_bands': [(CLINICAL_THRESHOLD, 'salmon')],
+        'reference_lines': [
+            {'y': 50, 'color': 'black', 'linestyle': '-', 'alpha': 0.3},
+            {'y': CLINICAL_THRESHOLD, 'color': 'red', 'linestyle': '--', 'alpha': 0.5},
+            {'y': 80, 'color': 'red', 'linestyle': '-', 'alpha': 0.5}
+        ],
+        'ylim': None,
+        'label_rotation': 'auto',
+        'value_labels': {'offset': 1}
+    },
+    # Bars coloured by elevation band on a 30-100 axis
+    'banded_bars': {
+        'bar_width': 0.6,
+        'color': 'blue',
+        'color_bands': [(CLINICAL_THRESHOLD, 'red'), (55, 'orange')],
+        'reference_lines': [
+            {'y': 50, 'color': 'black', 'linestyle': '-', 'alpha': 0.3},
+            {'y': CLINICAL_THRESHOLD, 'color': 'red', 'linestyle': '--', 'alpha': 0.5},
+            {'y': 80, 'color': 'red', 'linestyle': '-', 'alpha': 0.5}
+        ],
+        'xlabel': 'Scales',
+        'ylim': (30, 100),
+        'label_rotation': 45
+    },
+    # Bars with T=65 and T=70 cut-offs, missing scales plotted at T=50
+    'cutoff_bars': {
+        'default_score': DEFAULT_T_SCORE,
+        'ylabel': 'T-Scores',
+        'fig_size': (12, 8),
+        'reference_lines': [
+            {'y': CLINICAL_THRESHOLD, 'color': 'orange', 'linestyle': '--', 'alpha': 0.7},
+            {'y': 70, 'color': 'red', 'linestyle': '--', 'alpha': 0.7}
+        ],
+        'grid': {'axis': 'y', 'alpha': 0.3},
+        'ylim': None,
+        'label_rotation': 45
+    },
+    # Line profile on the T=30-120 axis
+    'line_profile': {
+        'kind': 'line',
+        'color': 'blue',
+        'fig_size': (11, 8.5),
+        'xlabel': 'MMPI-2 Scales',
+        'label_fontsize': 12,
+        'title_fontsize': 16,
+        'reference_lines': [{'y': CLINICAL_THRESHOLD, 'color': 'r', 'linestyle': '--', 'alpha': 0.7}],
+        'ylim': (30, 120),
+        'ytick_step': 10,
+        'grid': {'axis': 'y', 'linestyle': '--', 'alpha': 0.7},
+        'value_labels': {'offset': 3, 'fontsize': 10},
+        'legend': ['Profile', f'Clinical Significance (T={CLINICAL_THRESHOLD})'],
+        'legend_loc': 'upper right'
+    }
+}
+
+
+def chart_spec(family=None, style=None, **overrides):
+    """
+    Build a chart spec.
+
+    Args:
+        family (str, optional): Key of CHART_FAMILY_SPECS for the scales,
+            labels and title
+        style (str, optional): Key of CHART_STYLES
+        **overrides: Any chart setting, e.g. title, color or fig_size
+
+    Returns:
+        dict: The chart spec
+    """
+    spec = dict(DEFAULT_CHART)
+    if style:
+        spec.update(CHART_STYLES[style])
+    if family:
+        spec.update(CHART_FAMILY_SPECS[family])
+    spec.update(overrides)
+    return spec
+
+
+def profile_chart_spec(family, client_info, fig_size=None, dpi=None, quality=DEFAULT_GRAPH_QUALITY):
+    """
+    Build the spec of a clinical profile graph.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        client_info (dict): Dictionary containing client information
+        fig_size (tuple, optional): Figure size in inches (PNG); the quality
+            tier's size by default
+        dpi (int, optional): Figure resolution (PNG); the quality tier's
+            resolution by default
+        quality (str): Key of GRAPH_QUALITY_TIERS
+
+    Returns:
+        dict: The chart spec
+    """
+    tier = GRAPH_QUALITY_TIERS[quality]
+    fig_size = fig_size or tier['fig_size']
+    dpi = dpi or tier['dpi']
+    return {
+        'backend': 'profile',
+        'family': family,
+        'scales': GRAPH_FAMILY_SPECS[family]['scales'],
+        'title': graph_title(family, client_info),
+        'sex': client_info.get('sex', 'female'),
+        'default_score': DEFAULT_T_SCORE,
+        'fig_size': tuple(fig_size),
+        'dpi': dpi
+    }
+
+
+def chart_values(spec, scores):
+    """
+    Get the values of a chart in plotting order.
+
+    Args:
+        spec (dict): Chart spec
+        scores (dict): Scale code -> T-score; may hold more scales than the chart
+
+    Returns:
+        list: Values, with the spec's default score for missing scales; the
+            values of every panel for a spec with panels
+    """
+    panels = spec.get('panels')
+    if panels:
+        return [value for panel in panels for value in chart_values(panel, scores)]
+    groups = spec.get('groups')
+    scales = [scale for group in groups for scale in group['scales']] if groups else spec['scales']
+    return [scores.get(scale, spec['default_score']) for scale in scales]
+
+
+def _bar_colors(spec, values):
+    """
+    Pick the colour of every bar of a chart.
+
+    Args:
+        spec (dict): Chart spec
+        values (list): Values in plotting order
+
+    Returns:
+        list: Colours
+    """
+    groups = spec.get('groups')
+    if groups:
+        colors = [group['color'] for group in groups for _ in group['scales']]
+    else:
+        colors = [spec['color']] * len(values)
+
+    # Elevation bands, highest threshold first
+    for index, value in enumerate(values):
+        for threshold, color in spec['color_bands']:
+            if value >= threshold:
+                colors[index] = color
+                break
+
+    # The highest scales, e.g. for the two-point code
+    if spec['highlight_top']:
+        ranked = sorted(range(len(values)), key=lambda index: values[index], reverse=True)
+        for index in ranked[:spec['highlight_top']]:
+            colors[index] = spec['highlight_color']
+    return colors
+
+
+def _draw_chart(ax, spec, values):
+    """
+    Draw a bar or line chart onto matplotlib axes.
+
+    Args:
+        ax (Axes): Axes to draw on
+        spec (dict): Chart spec
+        values (list): Values in plotting order
+    """
+    groups = spec.get('groups')
+    if groups:
+        # Groups are separated by a gap of group_gap positions
+        positions = []
+        for group in groups:
+            start = positions[-1] + 1 + spec['group_gap'] if positions else 0
+            positions.extend(range(start, start + len(group['scales'])))
+        labels = [label for group in groups for label in group.get('labels') or group['scales']]
+    else:
+        positions = list(range(len(values)))
+        labels = spec.get('labels') or spec['scales']
+
+    # Data
+    handles = []
+    if spec['kind'] == 'line':
+        ax.plot(positions, values, spec['line_format'], color=spec['color'], markersize=spec['markersize'])
+    else:
+        ax.bar(positions, values, color=_bar_colors(spec, values), width=spec['bar_width'],
+                      edgecolor=spec['edgecolor'])
+        if groups:
+            # Legend entries in the group colours, whatever colour the first bar was given
+            from matplotlib.patches import Patch
+            handles = [(Patch(facecolor=group['color'], edgecolor=spec['edgecolor']), group.get('label'))
+                       for group in groups]
+
+    # Reference lines
+    for line in spec['reference_lines']:
+        ax.axhline(**line)
+
+    # Axes
+    if spec['ylim']:
+        ax.set_ylim(*spec['ylim'])
+    elif values:
+        ax.set_ylim(0, max(values) + 10)
+    if spec['ytick_step']:
+        low, high = ax.get_ylim()
+        ax.set_yticks(range(int(low), int(high) + 1, spec['ytick_step']))
+    rotation = spec['label_rotation']
+    if rotation == 'auto':
+        rotation = 45 if len(values) > 10 else 0
+    ax.set_xticks(positions)
+    ax.set_xticklabels(labels, rotation=rotation)
+    if spec['grid']:
+        ax.grid(True, **spec['grid'])
+    if spec['xlabel']:
+        ax.set_xlabel(spec['xlabel'], fontsize=spec['label_fontsize'])
+    if spec['ylabel']:
+        ax.set_ylabel(spec['ylabel'], fontsize=spec['label_fontsize'])
+    ax.set_title(spec['title'], fontsize=spec['title_fontsize'])
+
+    # T-score labels above the data
+    if spec['value_labels']:
+        offset = spec['value_labels']['offset']
+        fontsize = spec['value_labels'].get('fontsize')
+        for position, value in zip(positions, values):
+            ax.text(position, value + offset, str(value), ha='center', fontsize=fontsize)
+
+    # Legend
+    legend = spec['legend']
+    if handles and legend:
+        ax.legend(*zip(*handles), loc=spec['legend_loc'])
+    elif isinstance(legend, (list, tuple)):
+        ax.legend(legend, loc=spec['legend_loc'])
+    elif legend:
+        ax.legend(loc=spec['legend_loc'])
+
+
+class MatplotlibChartBackend:
+    """
+    Draws chart specs on matplotlib figures, without pyplot.
+
+    Every chart gets its own Figure and FigureCanvasAgg; figures are built in
+    the report style and saved outside the style lock.
+    """
+
+    formats = ('png', 'pdf', 'svg')
+
+    def figure(self, spec, scores):
+        """
+        Draw a chart spec, or a spec with stacked panels, as a figure; call
+        under report_style().
+
+        Args:
+            spec (dict): Chart spec; a spec with "panels" stacks one chart per
+                panel under an optional "suptitle"
+            scores (dict): Scale code -> T-score
+
+        Returns:
+            Figure: The drawn figure
+        """
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        figure = Figure(figsize=spec['fig_size'], dpi=spec['dpi'])
+        FigureCanvasAgg(figure)
+        panels = spec.get('panels')
+        if panels:
+            if spec.get('suptitle'):
+                figure.suptitle(spec['suptitle'], fontsize=spec['title_fontsize'])
+            grid = figure.add_gridspec(len(panels), 1, height_ratios=spec.get('height_ratios'))
+            for index, panel in enumerate(panels):
+                _draw_chart(figure.add_subplot(grid[index]), panel, chart_values(panel, scores))
+        else:
+            _draw_chart(figure.add_subplot(), spec, chart_values(spec, scores))
+        if spec['tight_layout']:
+            figure.tight_layout()
+        settle_report_style(figure)
+        return figure
+
+    def render(self, spec, scores, output, graph_format):
+        """
+        Render a chart.
+
+        Args:
+            spec (dict): Chart spec
+            scores (dict): Scale code -> T-score
+            output: File path or binary file object
+            graph_format (str): "png", "pdf" or "svg"
+        """
+        with report_style():
+            figure = self.figure(spec, scores)
+        figure.savefig(output, format=graph_format, dpi=spec['save_dpi'] or 'figure',
+                       bbox_inches=spec['bbox_inches'])
+
+    def render_pages(self, charts, output_path):
+        """
+        Render charts as the pages of one PDF.
+
+        Args:
+            charts (list): (spec, scores) pairs in page order
+            output_path (str): Path of the PDF file to write
+        """
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        with PdfPages(output_path) as pdf:
+            for spec, scores in charts:
+                with report_style():
+                    figure = self.figure(spec, scores)
+                pdf.savefig(figure, bbox_inches=spec['bbox_inches'])
+
+
+class ProfileGraphBackend:
+    """
+    Renders the clinical profile graphs from family templates and vector scenes.
+    """
+
+    formats = ('png', 'pdf', 'svg')
+
+    # Formats cached as a scores layer shared by every client; the title is
+    # added to the layer by compose()
+    layered_formats = ('png',)
+
+    # Spec settings that belong to the client, not to the scores layer
+    client_fields = ('title', 'sex')
+
+    def render_layer(self, spec, scores, graph_format):
+        """
+        Render the scores layer of a profile graph, without the title.
+
+        Args:
+            spec (dict): Spec built by profile_chart_spec
+            scores (dict): Scale code -> T-score
+            graph_format (str): One of layered_formats
+
+        Returns:
+            bytes: The encoded layer
+        """
+        from src.reporting.profile_graph_renderer import get_graph_template
+        template = get_graph_template(spec['family'], spec['fig_size'], spec['dpi'])
+        return template.render_scores_layer(chart_values(spec, scores))
+
+    def compose(self, spec, layer, graph_format):
+        """
+        Add the title of a spec to a scores layer.
+
+        Args:
+            spec (dict): Spec built by profile_chart_spec
+            layer (bytes): Layer from render_layer()
+            graph_format (str): One of layered_formats
+
+        Returns:
+            bytes: The rendered graph
+        """
+        from src.reporting.profile_graph_renderer import get_graph_template
+        return get_graph_template(spec['family'], spec['fig_size'], spec['dpi']).compose(spec['title'], layer)
+
+    def render(self, spec, scores, output, graph_format):
+        """
+        Render a profile graph.
+
+        Args:
+            spec (dict): Spec built by profile_chart_spec
+            scores (dict): Scale code -> T-score
+            output: File path or binary file object
+            graph_format (str): "png", "pdf" or "svg"
+        """
+        t_scores = chart_values(spec, scores)
+        if graph_format == 'png':
+            from src.reporting.profile_graph_renderer import get_graph_template
+            get_graph_template(spec['family'], spec['fig_size'], spec['dpi']).render(t_scores, spec['title'], output)
+            return
+
+        if graph_format == 'svg':
+            from src.reporting.profile_graph_svg import render_scene_svg
+            data = render_scene_svg(self._scene(spec, t_scores)).encode('utf-8')
+        else:
+            from src.reporting.profile_graph_pdf import render_scenes_pdf
+            data = render_scenes_pdf([self._scene(spec, t_scores)], spec['title'])
+        _write_output(output, data)
+
+    def render_pages(self, charts, output_path, title=None):
+        """
+        Render profile graphs as the vector pages of one PDF.
+
+        Args:
+            charts (list): (spec, scores) pairs in page order
+            output_path (str): Path of the PDF file to write
+            title (str, optional): Document title
+        """
+        from src.reporting.profile_graph_pdf import render_scenes_pdf
+        scenes = [self._scene(spec, chart_values(spec, scores)) for spec, scores in charts]
+        _write_output(output_path, render_scenes_pdf(scenes, title))
+
+    def _scene(self, spec, t_scores):
+        """
+        Lay out the vector scene of a profile graph.
+
+        Args:
+            spec (dict): Spec built by profile_chart_spec
+            t_scores (list): T-scores in plotting order
+
+        Returns:
+            dict: The scene
+        """
+        from src.reporting.profile_graph_scene import build_scene
+        return build_scene(spec['family'], t_scores, spec['title'])
+
+
+def _write_output(output, data):
+    """
+    Write rendered bytes to a file path or binary file object.
+
+    Args:
+        output: File path or binary file object
+        data (bytes): Rendered chart
+    """
+    if hasattr(output, 'write'):
+        output.write(data)
+    else:
+        with open(output, 'wb') as f:
+            f.write(data)
+
+
+# MIME types of the output formats, for data URIs
+GRAPH_MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'pdf': 'application/pdf'
+}
+
+
+def graph_data_uri(data, graph_format):
+    """
+    Encode a rendered chart as a base64 data URI.
+
+    Args:
+        data (bytes): Rendered chart
+        graph_format (str): Output format
+
+    Returns:
+        str: Data URI
+    """
+    return f"data:{GRAPH_MIME_TYPES[graph_format]};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+# Output backends, keyed by the name used in chart specs
+GRAPH_BACKENDS = {
+    'matplotlib': MatplotlibChartBackend(),
+    'profile': ProfileGraphBackend()
+}
+
+
+def register_graph_backend(name, backend):
+    """
+    Register an output backend.
+
+    Args:
+        name (str): Name used in the "backend" setting of chart specs
+        backend: Object with a "formats" tuple, render(spec, scores, output,
+            graph_format) and render_pages(charts, output_path)
+    """
+    GRAPH_BACKENDS[name] = backend
+
+
+def render_chart_bytes(spec, scores, graph_format):
+    """
+    Render a chart to bytes. Used directly and by graph render pool processes.
+
+    Args:
+        spec (dict): Chart spec
+        scores (dict): Scale code -> T-score
+        graph_format (str): Output format
+
+    Returns:
+        bytes: The rendered chart
+    """
+    backend = GRAPH_BACKENDS[spec['backend']]
+    if graph_format not in backend.formats:
+        raise ValueError(f"The {spec['backend']} backend cannot write {graph_format}")
+    buffer = io.BytesIO()
+    backend.render(spec, scores, buffer, graph_format)
+    return buffer.getvalue()
+
+
+def _is_layered(spec, graph_format):
+    """Whether a chart is cached as a layer that compose_chart() completes."""
+    return graph_format in getattr(GRAPH_BACKENDS[spec['backend']], 'layered_formats', ())
+
+
+def chart_cache_format(spec, graph_format):
+    """
+    Get the graph cache format of a chart: its output format, or the layer
+    format of a layered chart.
+
+    Args:
+        spec (dict): Chart spec
+        graph_format (str): Output format
+
+    Returns:
+        str: Format of the cached entry
+    """
+    return f"{graph_format}-layer" if _is_layered(spec, graph_format) else graph_format
+
+
+def chart_cache_key(spec, scores, graph_format):
+    """
+    Compute the graph cache key of a chart.
+
+    The client settings of a layered chart (the title with the client's name)
+    are left out, so every client with the same scores shares the cached layer.
+
+    Args:
+        spec (dict): Chart spec
+        scores (dict): Scale code -> T-score
+        graph_format (str): Output format
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    if _is_layered(spec, graph_format):
+        client_fields = GRAPH_BACKENDS[spec['backend']].client_fields
+        spec = {name: value for name, value in spec.items() if name not in client_fields}
+    return graph_cache_key(spec, chart_values(spec, scores), chart_cache_format(spec, graph_format))
+
+
+def render_cached_chart_bytes(spec, scores, graph_format):
+    """
+    Render what the graph cache keeps of a chart: the layer of a layered
+    chart, otherwise the chart. Used directly and by graph render pool processes.
+
+    Args:
+        spec (dict): Chart spec
+        scores (dict): Scale code -> T-score
+        graph_format (str): Output format
+
+    Returns:
+        bytes: The layer or the rendered chart
+    """
+    if _is_layered(spec, graph_format):
+        return GRAPH_BACKENDS[spec['backend']].render_layer(spec, scores, graph_format)
+    return render_chart_bytes(spec, scores, graph_format)
+
+
+def compose_chart(spec, data, graph_format):
+    """
+    Complete a chart from what the graph cache keeps of it.
+
+    Args:
+        spec (dict): Chart spec
+        data (bytes): Result of render_cached_chart_bytes()
+        graph_format (str): Output format
+
+    Returns:
+        bytes: The rendered chart
+    """
+    if _is_layered(spec, graph_format):
+        return GRAPH_BACKENDS[spec['backend']].compose(spec, data, graph_format)
+    return data
+
+
+class GraphEngine:
+    """
+    Renders chart specs through the graph cache and the graph render pool.
+    """
+
+    def __init__(self, graph_cache=None, graph_workers=0, graph_threads=0):
+        """
+        Initialize the graph engine.
+
+        Args:
+            graph_cache (GraphCache, optional): Cache of rendered charts to
+                reuse and fill
+            graph_workers (int): Render charts concurrently in the persistent
+                graph render pool of this many processes; 0 renders in turn
+            graph_threads (int): Without graph workers, render charts
+                concurrently in a pool of this many threads
+        """
+        self.graph_cache = graph_cache
+        self.graph_workers = graph_workers
+        self.graph_threads = graph_threads
+
+        # Graph cache hits and misses of this engine
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def render(self, spec, scores, output_path, graph_format=None):
+        """
+        Render one chart to a file.
+
+        Args:
+            spec (dict): Chart spec
+            scores (dict): Scale code -> T-score
+            output_path (str): Path of the file to write
+            graph_format (str, optional): Output format; defaults to the
+                extension of output_path
+
+        Returns:
+            str: output_path
+        """
+        return self.render_charts([(spec, scores, output_path)], graph_format)[0]
+
+    def render_charts(self, charts, graph_format=None):
+        """
+        Render several charts to files.
+
+        Args:
+            charts (list): (spec, scores, output_path) tuples
+            graph_format (str, optional): Output format; defaults to the
+                extension of each output path
+
+        Returns:
+            list: Output paths, in the order of charts
+        """
+        rendered = self.render_charts_bytes([
+            (spec, scores, graph_format or os.path.splitext(output_path)[1][1:])
+            for spec, scores, output_path in charts
+        ])
+        for (_, _, output_path), data in zip(charts, rendered):
+            _write_output(output_path, data)
+        return [output_path for _, _, output_path in charts]
+
+    def render_charts_bytes(self, charts):
+        """
+        Render several charts in memory.
+
+        Cached charts are read from the graph cache. The others are rendered
+        in turn, or concurrently by the graph render pool or a thread pool
+        when the engine has graph workers or threads, and then cached. Profile
+        PNGs are cached as a scores layer that every client shares, and get
+        their title when they are read.
+
+        Args:
+            charts (list): (spec, scores, graph_format) tuples
+
+        Returns:
+            list: Rendered charts as bytes, in the order of charts
+        """
+        # Look every chart up in the cache first
+        rendered = [None] * len(charts)
+        misses = []
+        for index, (spec, scores, graph_format) in enumerate(charts):
+            key = None
+            if self.graph_cache is not None:
+                key = chart_cache_key(spec, scores, graph_format)
+                cached = self.graph_cache.get(key, chart_cache_format(spec, graph_format))
+                if cached is not None:
+                    rendered[index] = compose_chart(spec, cached, graph_format)
+                    self.stats['hits'] += 1
+                    continue
+                self.stats['misses'] += 1
+            misses.append((index, key))
+
+        # Render the misses, gathering the results in order
+        if self.graph_workers and len(misses) > 1:
+            from src.reporting.profile_graph_renderer import get_graph_render_pool
+            pool = get_graph_render_pool(self.graph_workers)
+            futures = [pool.submit(render_cached_chart_bytes, *charts[index]) for index, _ in misses]
+            results = [future.result() for future in futures]
+        elif self.graph_threads and len(misses) > 1:
+            with ThreadPoolExecutor(max_workers=self.graph_threads) as pool:
+                results = list(pool.map(lambda miss: render_cached_chart_bytes(*charts[miss[0]]), misses))
+        else:
+            results = [render_cached_chart_bytes(*charts[index]) for index, _ in misses]
+
+        for (index, key), data in zip(misses, results):
+            spec, _, graph_format = charts[index]
+            if key is not None:
+                self.graph_cache.put(key, chart_cache_format(spec, graph_format), data)
+            rendered[index] = compose_chart(spec, data, graph_format)
+
+        return rendered
+
+    def render_data_uris(self, charts):
+        """
+        Render several charts in memory as data URIs, ready to use as the
+        source of <img> elements in HTML reports; nothing is written to disk.
+
+        Args:
+            charts (list): (spec, scores, graph_format) tuples
+
+        Returns:
+            list: Data URIs, in the order of charts
+        """
+        rendered = self.render_charts_bytes(charts)
+        return [graph_data_uri(data, graph_format) for (_, _, graph_format), data in zip(charts, rendered)]
+
+    def render_pages(self, charts, output_path, title=None):
+        """
+        Render charts as the pages of one PDF.
+
+        Profile graphs become vector pages of the scene PDF backend; any other
+        charts are drawn by their own backend.
+
+        Args:
+            charts (list): (spec, scores) pairs in page order
+            output_path (str): Path of the PDF file to write
+            title (str, optional): Document title
+
+        Returns:
+            str: output_path
+        """
+        backends = {spec['backend'] for spec, _ in charts}
+        if backends == {'profile'}:
+            GRAPH_BACKENDS['profile'].render_pages(charts, output_path, title=title)
+        elif len(backends) == 1:
+            GRAPH_BACKENDS[backends.pop()].render_pages(charts, output_path)
+        else:
+            raise ValueError("A PDF can only combine charts of one backend")
+        return output_path
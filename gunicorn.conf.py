@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for the MMPI-2 web application.
+
+The application is loaded and warmed up once in the master process; workers
+are forked from it and share the loaded modules, matplotlib font cache and
+interpretation tables copy-on-write.
+"""
+
+import os
+
+# Import webapp in the master so warm-up happens before workers are forked
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+# Workers are sync by default. Graph rendering is thread-safe (see
+# tests/test_graph_threads.py), so GUNICORN_THREADS > 1 switches to gthread
+# workers that serve several requests from threads
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+
+def when_ready(server):
+    """Warm up the master once the application is loaded, before workers fork."""
+    from src.web.warmup import warm_up, format_startup_report
+
+    report = warm_up(freeze=True)
+    server.log.info(format_startup_report(report))
+
+
+def post_fork(server, worker):
+    """Log how long each worker took to come up after the master forked it."""
+    from src.web.warmup import WARMUP_REPORT
+
+    WARMUP_REPORT['pid'] = worker.pid
+    server.log.info("Worker %s forked from warmed master (ready=%s)", worker.pid, WARMUP_REPORT['ready'])
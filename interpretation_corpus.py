@@ -0,0 +1,509 @@
+"""
+Packed, lazily loaded interpretation corpora for MMPI-2.
+
+The interpretation dictionaries (clinical, RC, content, PSY-5, ...) are written
+as Python literals in their modules, and importing a module parses and keeps
+all of its narrative text. build_corpus() exports every dictionary once into a
+single packed data file; load_corpus() then reads one dictionary from it the
+first time it is asked for and keeps it for the life of the process, so a
+process only pays for the families it actually interprets.
+
+The packed file is a JSON index followed by one JSON document per corpus:
+
+    <index length, 8 bytes big-endian> <index JSON> <corpus JSON> ...
+
+The index maps each corpus name to its offset and length in the file and to
+the SHA-256 of the source of the module it was exported from. Corpora that keep a
+female and a male copy of the same narratives (CORPUS_PAIRS) are packed once,
+as a pronoun template corpus (see narrative_templates), and rendered for each
+sex when loaded. A corpus whose module
+changed since the file was built, or that is missing from the file, is imported
+from its module instead, as is every corpus when there is no file.
+
+With INTERPRETATION_CORPUS_MMAP=1 the file is memory-mapped rather than read,
+so the gunicorn master and all workers forked from it share the file's pages
+through the page cache; only the corpora a worker uses are parsed into its own
+memory. Warm-up rebuilds the file (refresh_corpus) when it is missing or a
+module changed since it was built; build it by hand, and compare the import
+cost of the modules and of the packed file, with:
+
+    python interpretation_corpus.py --build
+    python interpretation_corpus.py --measure
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+import importlib
+import threading
+import subprocess
+
+from src.interpretation.narrative_templates import SEXES, merge_corpora, render_corpus
+
+# Directory of the interpretation modules
+PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
+
+# Module defining each corpus, relative to the project root
+CORPUS_SOURCES = {
+    'VALIDITY_SCALE_INTERPRETATIONS': 'validity_scales',
+    'CLINICAL_SCALES_INTERPRETATIONS': 'clinical_scales',
+    'RC_SCALES_INTERPRETATIONS': 'rc_scales',
+    'CONTENT_SCALE_INTERPRETATIONS': 'content_scales',
+    'CONTENT_COMPONENT_SCALE_INTERPRETATIONS': 'content_component_scales',
+    'COMPONENT_SCALE_INTERPRETATIONS': 'component_scales',
+    'PSY5_SCALES_FEMALE': 'psy5_scales',
+    'PSY5_SCALES_MALE': 'psy5_scales',
+    'HARRIS_LINGOES_SUBSCALE_INTERPRETATIONS': 'harris_lingoes_subscales',
+    'SUPPLEMENTARY_SCALES_FEMALE': 'supplementary_scales'
+}
+
+# Corpora whose female and male narratives are packed as one template corpus:
+# template corpus name -> {sex: (corpus name, key of that sex in the corpus or
+# None for a corpus of one sex)}
+CORPUS_PAIRS = {
+    'PSY5_SCALES_TEMPLATES': {'Female': ('PSY5_SCALES_FEMALE', None), 'Male': ('PSY5_SCALES_MALE', None)}
+}
+CORPUS_PAIRS.update({
+    corpus_name.replace('_INTERPRETATIONS', '_TEMPLATES'): {sex: (corpus_name, sex) for sex in SEXES}
+    for corpus_name in ['VALIDITY_SCALE_INTERPRETATIONS', 'CLINICAL_SCALES_INTERPRETATIONS',
+                        'CONTENT_SCALE_INTERPRETATIONS', 'CONTENT_COMPONENT_SCALE_INTERPRETATIONS',
+                        'COMPONENT_SCALE_INTERPRETATIONS', 'HARRIS_LINGOES_SUBSCALE_INTERPRETATIONS']
+})
+
+# Template corpus holding each paired corpus
+CORPUS_PAIR_NAMES = {corpus_name: pair_name
+                     for pair_name, members in CORPUS_PAIRS.items()
+                     for corpus_name, _ in members.values()}
+
+# Packed corpus file and how to read it
+CORPUS_PATH = os.environ.get('INTERPRETATION_CORPUS_PATH',
+                             os.path.join(PROJECT_ROOT, 'data', 'interpretation_corpus.pack'))
+CORPUS_MMAP = os.environ.get('INTERPRETATION_CORPUS_MMAP', '').lower() in ('1', 'true', 'yes')
+
+# Size of the index length header
+_HEADER = struct.Struct('>Q')
+
+# Corpora loaded in this process, the open packed file and the source hashes
+# of the interpretation modules
+_CORPORA = {}
+_PACK = {'index': None, 'file': None, 'mmap': None}
+_SOURCE_HASHES = {}
+_LOCK = threading.RLock()
+
+
+def _source_hash(corpus_name):
+    """
+    Hash the source of the module defining a corpus, once per process.
+
+    The content is hashed rather than the modification time, which git
+    checkouts and container builds reset.
+
+    Args:
+        corpus_name (str): Key of CORPUS_SOURCES, or of CORPUS_PAIRS for the
+            module of a template corpus
+
+    Returns:
+        str: Hex SHA-256 of the module source, or None if the module is missing
+    """
+    if corpus_name in CORPUS_PAIRS:
+        corpus_name = next(iter(CORPUS_PAIRS[corpus_name].values()))[0]
+    module_name = CORPUS_SOURCES[corpus_name]
+    if module_name not in _SOURCE_HASHES:
+        try:
+            with open(os.path.join(PROJECT_ROOT, module_name + '.py'), 'rb') as f:
+                _SOURCE_HASHES[module_name] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            _SOURCE_HASHES[module_name] = None
+    return _SOURCE_HASHES[module_name]
+
+
+def _import_corpus(corpus_name):
+    """
+    Import a corpus from its module.
+
+    Args:
+        corpus_name (str): Key of CORPUS_SOURCES
+
+    Returns:
+        dict: The corpus
+    """
+    module = importlib.import_module(f"src.interpretation.{CORPUS_SOURCES[corpus_name]}")
+    return getattr(module, corpus_name)
+
+
+def _open_pack():
+    """
+    Open the packed corpus file and read its index, once per process.
+
+    Returns:
+        dict: Corpus name -> {"offset", "length", "source_hash"}, or
+            {"error", "source_hash"} for a corpus that could not be packed;
+            empty if there is no packed file
+    """
+    with _LOCK:
+        if _PACK['index'] is not None:
+            return _PACK['index']
+        try:
+            pack_file = open(CORPUS_PATH, 'rb')
+        except OSError:
+            _PACK['index'] = {}
+            return _PACK['index']
+
+        index_length, = _HEADER.unpack(pack_file.read(_HEADER.size))
+        _PACK['index'] = json.loads(pack_file.read(index_length))
+        _PACK['file'] = pack_file
+        if CORPUS_MMAP:
+            _PACK['mmap'] = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return _PACK['index']
+
+
+def _read_packed(entry):
+    """
+    Read one corpus document from the packed file.
+
+    Args:
+        entry (dict): Index entry of the corpus
+
+    Returns:
+        dict: The corpus
+    """
+    start, length = entry['offset'], entry['length']
+    if _PACK['mmap'] is not None:
+        return json.loads(_PACK['mmap'][start:start + length])
+    # pread leaves the file offset alone, which forked workers share
+    return json.loads(os.pread(_PACK['file'].fileno(), length, start))
+
+
+def _render_paired(corpus_name, templates):
+    """
+    Rebuild a paired corpus from its template corpus.
+
+    Args:
+        corpus_name (str): Key of CORPUS_SOURCES
+        templates (dict): Template corpus of its pair
+
+    Returns:
+        dict: The corpus
+    """
+    corpus = {}
+    for sex, (member_name, key) in CORPUS_PAIRS[CORPUS_PAIR_NAMES[corpus_name]].items():
+        if member_name != corpus_name:
+            continue
+        if key is None:
+            return render_corpus(templates, sex)
+        corpus[key] = render_corpus(templates, sex)
+    return corpus
+
+
+def _is_current(entry, corpus_name):
+    """
+    Check that an index entry holds a packed copy of the current module source.
+
+    Args:
+        entry (dict): Index entry, or None
+        corpus_name (str): Corpus whose module the entry must match
+
+    Returns:
+        bool: True if the entry can be read instead of importing the module
+    """
+    return entry is not None and 'offset' in entry and entry.get('source_hash') == _source_hash(corpus_name)
+
+
+def load_corpus(corpus_name):
+    """
+    Get an interpretation corpus, loading it on first use.
+
+    The corpus is read from the packed file when it holds an up-to-date copy,
+    or rendered from the template corpus of its pair, and imported from its
+    module otherwise.
+
+    Args:
+        corpus_name (str): Key of CORPUS_SOURCES
+
+    Returns:
+        dict: The corpus
+    """
+    corpus = _CORPORA.get(corpus_name)
+    if corpus is not None:
+        return corpus
+    if corpus_name not in CORPUS_SOURCES:
+        raise KeyError(f"Unknown interpretation corpus: {corpus_name}")
+
+    with _LOCK:
+        if corpus_name in _CORPORA:
+            return _CORPORA[corpus_name]
+        index = _open_pack()
+        entry = index.get(corpus_name)
+        pair_entry = index.get(CORPUS_PAIR_NAMES.get(corpus_name))
+        if _is_current(entry, corpus_name):
+            corpus = _read_packed(entry)
+        elif _is_current(pair_entry, corpus_name):
+            corpus = _render_paired(corpus_name, _read_packed(pair_entry))
+        else:
+            corpus = _import_corpus(corpus_name)
+        _CORPORA[corpus_name] = corpus
+        return corpus
+
+
+def loaded_corpora():
+    """
+    List the corpora loaded in this process so far.
+
+    Returns:
+        list: Corpus names
+    """
+    return list(_CORPORA)
+
+
+def packed_corpora():
+    """
+    List the corpora the packed file holds, opening it if needed.
+
+    Returns:
+        list: Corpus names
+    """
+    return [corpus_name for corpus_name, entry in _open_pack().items() if 'offset' in entry]
+
+
+def paired_corpora():
+    """
+    List the template corpora of the paired corpora.
+
+    Returns:
+        list: Keys of CORPUS_PAIRS
+    """
+    return list(CORPUS_PAIRS)
+
+
+def merge_paired_corpus(pair_name):
+    """
+    Import the female and male copies of a paired corpus and merge them.
+
+    Args:
+        pair_name (str): Key of CORPUS_PAIRS
+
+    Returns:
+        tuple: ({sex: corpus of that sex}, template corpus, paths of the
+            narratives kept per sex)
+    """
+    sources = {}
+    for sex, (corpus_name, key) in CORPUS_PAIRS[pair_name].items():
+        corpus = _import_corpus(corpus_name)
+        if key is not None and set(corpus) != set(SEXES):
+            raise ValueError(f"{corpus_name} is not keyed by {' and '.join(SEXES)} only")
+        sources[sex] = corpus if key is None else corpus[key]
+    unmerged = []
+    templates = merge_corpora(sources['Female'], sources['Male'], unmerged=unmerged)
+    return sources, templates, unmerged
+
+
+def build_corpus(path=None):
+    """
+    Export every corpus from its module into a packed corpus file.
+
+    Paired corpora are packed once, as their template corpus. A module that
+    cannot be imported is reported and left out, so its corpus keeps being
+    imported from the module; a pair that cannot be merged is packed as
+    separate corpora. Failures are recorded in the index with the hash of
+    their module, so the next refresh retries them once the module changes.
+    The file is written next to its destination and moved
+    into place, so readers never see a partial file.
+
+    Args:
+        path (str, optional): Destination; CORPUS_PATH by default
+
+    Returns:
+        dict: {"path", "packed": corpus names, "failed": corpus name -> error}
+    """
+    path = path or CORPUS_PATH
+    documents = []
+    failed = {}
+    templated = set()
+    for pair_name, members in CORPUS_PAIRS.items():
+        try:
+            _, corpus, _ = merge_paired_corpus(pair_name)
+        except Exception as e:
+            failed[pair_name] = f"{type(e).__name__}: {e}"
+            continue
+        document = json.dumps(corpus, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        documents.append((pair_name, document, _source_hash(pair_name)))
+        templated.update(corpus_name for corpus_name, _ in members.values())
+
+    for corpus_name in CORPUS_SOURCES:
+        if corpus_name in templated:
+            continue
+        try:
+            corpus = _import_corpus(corpus_name)
+        except Exception as e:
+            failed[corpus_name] = f"{type(e).__name__}: {e}"
+            continue
+        document = json.dumps(corpus, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        documents.append((corpus_name, document, _source_hash(corpus_name)))
+
+    # Lay out the documents after the index; the index length depends on the
+    # offsets, so grow the reserved header until the layout is stable
+    header_size = 0
+    while True:
+        index = {}
+        offset = _HEADER.size + header_size
+        for corpus_name, document, source_hash in documents:
+            index[corpus_name] = {'offset': offset, 'length': len(document), 'source_hash': source_hash}
+            offset += len(document)
+        for corpus_name, error in failed.items():
+            index[corpus_name] = {'error': error, 'source_hash': _source_hash(corpus_name)}
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        if len(index_bytes) <= header_size:
+            break
+        header_size = len(index_bytes)
+    index_bytes = index_bytes.ljust(header_size)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(header_size))
+        f.write(index_bytes)
+        for _, document, _ in documents:
+            f.write(document)
+    os.replace(tmp_path, path)
+    return {'path': path, 'packed': [corpus_name for corpus_name, _, _ in documents], 'failed': failed}
+
+
+def _close_pack():
+    """
+    Close the packed file, so the next load reopens it. Must be called with the lock held.
+    """
+    if _PACK['mmap'] is not None:
+        _PACK['mmap'].close()
+    if _PACK['file'] is not None:
+        _PACK['file'].close()
+    _PACK.update(index=None, file=None, mmap=None)
+
+
+def _pack_is_current(index):
+    """
+    Check that a packed file index covers every corpus at its current source.
+
+    Every paired corpus must have an entry, and so must every other corpus
+    unless its pair was packed as a template corpus. Entries of corpora that
+    failed to pack count as current until their module changes.
+
+    Args:
+        index (dict): Index of the packed file
+
+    Returns:
+        bool: True if rebuilding would not change the file
+    """
+    if any(entry.get('source_hash') != _source_hash(corpus_name) for corpus_name, entry in index.items()):
+        return False
+    templated = {corpus_name for pair_name, members in CORPUS_PAIRS.items()
+                 if 'offset' in index.get(pair_name, {})
+                 for corpus_name, _ in members.values()}
+    expected = set(CORPUS_PAIRS) | {corpus_name for corpus_name in CORPUS_SOURCES if corpus_name not in templated}
+    return set(index) == expected
+
+
+def refresh_corpus():
+    """
+    Rebuild the packed file if it is missing, lacks a corpus, or a corpus
+    module changed since it was built.
+
+    The build runs in a separate interpreter, so importing every corpus does
+    not leave them all loaded in this process (the gunicorn master, whose
+    workers would inherit them).
+
+    Returns:
+        bool: Whether the file was rebuilt
+    """
+    with _LOCK:
+        if _pack_is_current(_open_pack()):
+            return False
+
+        completed = subprocess.run([sys.executable, os.path.join(PROJECT_ROOT, 'interpretation_corpus.py'),
+                                    '--build', '--path', CORPUS_PATH],
+                                   cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if completed.returncode:
+            raise RuntimeError(f"Building the packed corpus failed: {completed.stderr.strip()[-500:]}")
+        _close_pack()
+        return True
+
+
+# Loading steps compared by --measure: (packed file, memory-mapped, step),
+# each run in a fresh interpreter
+_EVERY_FAMILY = ("import src.interpretation.scale_interpretations as s\n"
+                 "[s.family_interpretations(family) for family in s.INTERPRETATION_FAMILIES]")
+_ONE_FAMILY = ("from src.interpretation.scale_interpretations import get_scale_interpretation\n"
+               "get_scale_interpretation('Hs', 70)")
+MEASURE_MODES = {
+    'interpreter': (False, False, "pass"),
+    'modules, every family': (False, False, _EVERY_FAMILY),
+    'modules, one family': (False, False, _ONE_FAMILY),
+    'packed, one family': (True, False, _ONE_FAMILY),
+    'mmap, one family': (True, True, _ONE_FAMILY)
+}
+
+# Script run for each mode: time the step, then report the peak RSS in KiB
+_MEASURE_SCRIPT = """
+import sys, time, resource
+sys.path.insert(0, {root!r})
+started_at = time.perf_counter()
+import src.interpretation
+{step}
+elapsed = time.perf_counter() - started_at
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure_loading():
+    """
+    Measure the time and peak memory of loading interpretation corpora.
+
+    Each mode runs in a fresh interpreter: a bare interpreter as the baseline,
+    loading every family from the modules as importing scale_interpretations
+    used to, and interpreting one scale with its corpus imported from the
+    module, read from the packed file or memory-mapped.
+
+    Returns:
+        dict: Mode -> (seconds, peak RSS in KiB), or the error of a failed mode
+    """
+    results = {}
+    for mode, (packed, mapped, step) in MEASURE_MODES.items():
+        env = dict(os.environ,
+                   INTERPRETATION_CORPUS_PATH=CORPUS_PATH if packed else os.devnull + '.missing',
+                   INTERPRETATION_CORPUS_MMAP='1' if mapped else '0')
+        script = _MEASURE_SCRIPT.format(root=PROJECT_ROOT, step=step)
+        completed = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True)
+        if completed.returncode:
+            results[mode] = completed.stderr.strip().splitlines()[-1]
+            continue
+        seconds, rss = completed.stdout.split()
+        results[mode] = (float(seconds), int(rss))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or measure the packed interpretation corpus")
+    parser.add_argument('--build', action='store_true', help="Export every corpus into the packed file")
+    parser.add_argument('--measure', action='store_true', help="Compare loading from modules and from the packed file")
+    parser.add_argument('--path', help="Packed file to build (default: INTERPRETATION_CORPUS_PATH)")
+    args = parser.parse_args()
+
+    if args.build:
+        started_at = time.perf_counter()
+        result = build_corpus(args.path)
+        print(f"Packed {len(result['packed'])} corpora into {result['path']} "
+              f"in {time.perf_counter() - started_at:.2f}s")
+        for corpus_name, error in result['failed'].items():
+            print(f"Not packed: {corpus_name} ({error})")
+    if args.measure:
+        print(f"{'Mode':<24}{'Seconds':>10}{'Peak RSS (MiB)':>16}")
+        for mode, result in measure_loading().items():
+            if isinstance(result, str):
+                print(f"{mode:<24}failed: {result}")
+            else:
+                seconds, rss = result
+                print(f"{mode:<24}{seconds:>10.3f}{rss / 1024:>16.1f}")
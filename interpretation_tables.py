@@ -0,0 +1,426 @@
+"""
+Dense T-score lookup tables for MMPI-2 scale narratives.
+
+The interpretation dictionaries define their narratives over bands of integer
+T-scores, either as explicit ranges ({"range": [min, max], "interpretation":
+...}) or as "low", "moderate" and "high" texts for T < 65, T = 65 and T > 65.
+This module compiles every scale of a family, the first time the family is
+looked up, into an array of 121 narrative ids, one per T-score from 0 to 120,
+so finding the narrative for an integer T-score is a single array index. The
+narrative texts are stored once, in the shared NARRATIVES table, however many
+scales and T-scores use them.
+
+While compiling, every T-score from 0 to 120 that no band covers (a gap) or
+that more than one range covers (an overlap) is recorded in TABLE_ISSUES;
+overlaps resolve to the first range in list order, as a scan of the ranges
+would. Run this module to compile every family and list them:
+
+    python interpretation_tables.py
+
+interpret_profiles applies the tables to a whole matrix of profiles at once
+(respondents x scales), indexing a stacked NumPy copy of the tables instead of
+looking cells up one at a time.
+"""
+
+import sys
+import math
+import threading
+from array import array
+
+from src.interpretation.interpretation_corpus import load_corpus
+
+# T-scores covered by the tables (inclusive)
+TABLE_MIN_T_SCORE = 0
+TABLE_MAX_T_SCORE = 120
+
+# T-score at which the low/moderate/high narratives turn moderate
+LEVEL_CUTOFF = 65
+
+# Integer T-score bands of the low/moderate/high narratives
+LEVEL_BANDS = [
+    ('low', 0, 64),
+    ('moderate', 65, 65),
+    ('high', 66, 120)
+]
+
+# Narrative id of T-scores without a narrative
+NO_NARRATIVE = 0
+
+# Gender key of narratives that apply to every respondent
+ANY_GENDER = 'Any'
+
+# Interpretation sources: (family, gender, corpus name); a gender of None marks
+# a dictionary keyed by "Female" and "Male"
+INTERPRETATION_SOURCES = [
+    ('VALIDITY', None, 'VALIDITY_SCALE_INTERPRETATIONS'),
+    ('CLINICAL', None, 'CLINICAL_SCALES_INTERPRETATIONS'),
+    ('RC', ANY_GENDER, 'RC_SCALES_INTERPRETATIONS'),
+    ('CONTENT', None, 'CONTENT_SCALE_INTERPRETATIONS'),
+    ('CONTENT_COMPONENT', None, 'CONTENT_COMPONENT_SCALE_INTERPRETATIONS'),
+    ('COMPONENT', None, 'COMPONENT_SCALE_INTERPRETATIONS'),
+    ('PSY5', 'Female', 'PSY5_SCALES_FEMALE'),
+    ('PSY5', 'Male', 'PSY5_SCALES_MALE'),
+    ('HARRIS_LINGOES', None, 'HARRIS_LINGOES_SUBSCALE_INTERPRETATIONS'),
+    ('SUPPLEMENTARY', 'Female', 'SUPPLEMENTARY_SCALES_FEMALE')
+]
+
+# Families with at least one interpretation source
+TABLE_FAMILIES = list(dict.fromkeys(family for family, _, _ in INTERPRETATION_SOURCES))
+
+# Shared narrative texts; a table entry is an index into this list
+NARRATIVES = [None]
+_NARRATIVE_IDS = {}
+
+# T-score gaps and overlaps found while compiling
+TABLE_ISSUES = []
+
+# Guards NARRATIVES and the compiled tables against concurrent compiles
+_COMPILE_LOCK = threading.RLock()
+
+
+def _narrative_id(narrative):
+    """
+    Get the id of a narrative in the shared table, adding it on first use.
+
+    Args:
+        narrative: Narrative text (or any other interpretation value)
+
+    Returns:
+        int: Index into NARRATIVES
+    """
+    key = narrative if isinstance(narrative, str) else id(narrative)
+    narrative_id = _NARRATIVE_IDS.get(key)
+    if narrative_id is None:
+        with _COMPILE_LOCK:
+            narrative_id = _NARRATIVE_IDS.get(key)
+            if narrative_id is None:
+                narrative_id = _NARRATIVE_IDS[key] = len(NARRATIVES)
+                NARRATIVES.append(narrative)
+    return narrative_id
+
+
+def _t_score_runs(t_scores):
+    """
+    Collapse sorted T-scores into inclusive runs for reporting.
+
+    Args:
+        t_scores (list): Sorted integer T-scores
+
+    Returns:
+        list: [first, last] pairs
+    """
+    runs = []
+    for t_score in t_scores:
+        if runs and runs[-1][1] == t_score - 1:
+            runs[-1][1] = t_score
+        else:
+            runs.append([t_score, t_score])
+    return runs
+
+
+def compile_bands(bands):
+    """
+    Compile narrative bands into a dense table of narrative ids.
+
+    Args:
+        bands (list): (narrative, min T-score, max T-score) tuples in priority
+            order; the first band covering a T-score wins
+
+    Returns:
+        tuple: (array of narrative ids indexed by T-score, gap T-scores,
+            overlap T-scores)
+    """
+    table = array('I', [NO_NARRATIVE]) * (TABLE_MAX_T_SCORE + 1)
+    coverage = [0] * (TABLE_MAX_T_SCORE + 1)
+    for narrative, min_val, max_val in bands:
+        narrative_id = _narrative_id(narrative)
+        for t_score in range(max(TABLE_MIN_T_SCORE, math.ceil(min_val)),
+                             min(TABLE_MAX_T_SCORE, math.floor(max_val)) + 1):
+            if not coverage[t_score]:
+                table[t_score] = narrative_id
+            coverage[t_score] += 1
+
+    t_scores = range(TABLE_MIN_T_SCORE, TABLE_MAX_T_SCORE + 1)
+    gaps = [t_score for t_score in t_scores if not coverage[t_score]]
+    overlaps = [t_score for t_score in t_scores if coverage[t_score] > 1]
+    return table, gaps, overlaps
+
+
+def scale_bands(scale_dict):
+    """
+    Get the narrative bands of a scale in either dictionary scheme.
+
+    Args:
+        scale_dict (dict): Interpretation entry of one scale
+
+    Returns:
+        list: (narrative, min T-score, max T-score) tuples
+    """
+    if 'ranges' in scale_dict:
+        return [(range_dict['interpretation'], *range_dict['range']) for range_dict in scale_dict['ranges']]
+    return [(scale_dict[level], min_val, max_val) for level, min_val, max_val in LEVEL_BANDS if level in scale_dict]
+
+
+def band_narrative(scale_dict, t_score):
+    """
+    Find the narrative of a scale for any T-score by matching its bands, as
+    the per-family interpretation functions do.
+
+    Args:
+        scale_dict (dict): Interpretation entry of one scale
+        t_score (float): T-score
+
+    Returns:
+        The narrative, or None if no band covers the T-score
+    """
+    if 'ranges' in scale_dict:
+        for range_dict in scale_dict['ranges']:
+            min_val, max_val = range_dict['range']
+            if min_val <= t_score <= max_val:
+                return range_dict['interpretation']
+        return None
+    if t_score < LEVEL_CUTOFF:
+        return scale_dict.get('low')
+    if t_score == LEVEL_CUTOFF:
+        return scale_dict.get('moderate')
+    return scale_dict.get('high')
+
+
+# Compiled table and source entry of every scale of the families compiled so
+# far, keyed by (family, gender, scale code)
+NARRATIVE_TABLES = {}
+SCALE_SOURCES = {}
+COMPILED_FAMILIES = set()
+
+# Tables of a family stacked for batch lookups, keyed by (family, gender):
+# (scale code -> row, read-only NumPy array); built on first use
+STACKED_TABLES = {}
+
+# NARRATIVES as a NumPy object array, rebuilt when narratives have been added
+_NARRATIVE_ARRAY = {'array': None}
+
+
+def compile_family(family):
+    """
+    Compile every scale of a family's interpretation sources, once.
+
+    Args:
+        family (str): Interpretation family, e.g. "RC" or "PSY5"
+    """
+    if family in COMPILED_FAMILIES:
+        return
+    with _COMPILE_LOCK:
+        if family in COMPILED_FAMILIES:
+            return
+        for source_family, gender, corpus_name in INTERPRETATION_SOURCES:
+            if source_family != family:
+                continue
+            source = load_corpus(corpus_name)
+            genders = [(gender, source)] if gender else list(source.items())
+            for scale_gender, scales in genders:
+                for scale, scale_dict in scales.items():
+                    if not isinstance(scale_dict, dict):
+                        continue
+                    table, gaps, overlaps = compile_bands(scale_bands(scale_dict))
+                    NARRATIVE_TABLES[(family, scale_gender, scale)] = table
+                    SCALE_SOURCES[(family, scale_gender, scale)] = scale_dict
+                    for kind, t_scores in (('gap', gaps), ('overlap', overlaps)):
+                        if t_scores:
+                            TABLE_ISSUES.append({'family': family, 'gender': scale_gender, 'scale': scale,
+                                                 'kind': kind, 't_scores': _t_score_runs(t_scores)})
+        COMPILED_FAMILIES.add(family)
+
+
+def compile_all_tables():
+    """
+    Compile every family, as the checks over all tables need.
+
+    Returns:
+        dict: NARRATIVE_TABLES
+    """
+    for family in TABLE_FAMILIES:
+        compile_family(family)
+    return NARRATIVE_TABLES
+
+
+def lookup_narrative(family, scale, t_score, gender=None):
+    """
+    Look up the narrative of a scale for a T-score.
+
+    Integer T-scores from 0 to 120 are read straight from the scale's table;
+    other T-scores are matched against the scale's source bands.
+
+    Args:
+        family (str): Interpretation family, e.g. "RC" or "PSY5"
+        scale (str): Scale code
+        t_score (float): T-score
+        gender (str, optional): "female"/"male" in any case
+
+    Returns:
+        str or None: The narrative, or None if the scale has none for the
+            T-score
+    """
+    compile_family(family)
+    key = (family, gender.capitalize() if gender else None, scale)
+    if key not in NARRATIVE_TABLES:
+        key = (family, ANY_GENDER, scale)
+        if key not in NARRATIVE_TABLES:
+            return None
+    if TABLE_MIN_T_SCORE <= t_score <= TABLE_MAX_T_SCORE and t_score == int(t_score):
+        return NARRATIVES[NARRATIVE_TABLES[key][int(t_score)]]
+    return band_narrative(SCALE_SOURCES[key], t_score)
+
+
+def _stack_tables(family, gender):
+    """
+    Stack the tables of every scale of a family for one gender, once.
+
+    A scale without a table for the gender uses the table shared by every
+    gender. The last row has no narrative at any T-score, for scales without
+    either table.
+
+    Args:
+        family (str): Interpretation family
+        gender (str or None): Capitalized gender, or None for no gender
+
+    Returns:
+        tuple: (scale code -> row, (rows x 121) array of narrative ids)
+    """
+    stacked = STACKED_TABLES.get((family, gender))
+    if stacked is not None:
+        return stacked
+
+    import numpy as np
+
+    compile_family(family)
+    with _COMPILE_LOCK:
+        if (family, gender) in STACKED_TABLES:
+            return STACKED_TABLES[(family, gender)]
+        family_scales = list(dict.fromkeys(scale for table_family, _, scale in NARRATIVE_TABLES
+                                           if table_family == family))
+        tables = np.full((len(family_scales) + 1, TABLE_MAX_T_SCORE + 1), NO_NARRATIVE, dtype=np.uint32)
+        for row, scale in enumerate(family_scales):
+            table = NARRATIVE_TABLES.get((family, gender, scale), NARRATIVE_TABLES.get((family, ANY_GENDER, scale)))
+            if table is not None:
+                tables[row] = np.frombuffer(table, dtype=np.uint32)
+        tables.setflags(write=False)
+        stacked = STACKED_TABLES[(family, gender)] = ({scale: row for row, scale in enumerate(family_scales)}, tables)
+        return stacked
+
+
+def _gender_tables(family, scales, gender):
+    """
+    Get a family's stacked tables for one gender and the table row of each scale.
+
+    Args:
+        family (str): Interpretation family
+        scales (list): Scale codes, one per matrix column
+        gender (str or None): Capitalized gender, or None for no gender
+
+    Returns:
+        tuple: ((rows x 121) array of narrative ids, array of the row of each
+            column's scale)
+    """
+    import numpy as np
+
+    scale_rows, tables = _stack_tables(family, gender)
+    no_table = len(tables) - 1
+    return tables, np.array([scale_rows.get(scale, no_table) for scale in scales], dtype=np.intp)
+
+
+def _narrative_array():
+    """
+    Get NARRATIVES as a NumPy object array for indexing with narrative ids.
+
+    Returns:
+        numpy.ndarray: Narrative texts by id
+    """
+    import numpy as np
+
+    narratives = _NARRATIVE_ARRAY['array']
+    if narratives is None or len(narratives) != len(NARRATIVES):
+        narratives = np.fromiter(NARRATIVES, dtype=object, count=len(NARRATIVES))
+        _NARRATIVE_ARRAY['array'] = narratives
+    return narratives
+
+
+def interpret_profiles(matrix, scales, family, genders=None):
+    """
+    Look up the narratives of many profiles in one vectorized pass.
+
+    Each cell's T-score indexes the table of its column's scale. Sex-specific
+    tables are applied by masking the rows of each gender rather than by
+    branching per row, so the work is one fancy-indexing pass per gender.
+    Integer T-scores from 0 to 120 come straight from the tables; the few other
+    finite T-scores are matched against the source bands as lookup_narrative
+    does, and missing (NaN) T-scores have no narrative.
+
+    Args:
+        matrix: (respondents x scales) array-like of T-scores
+        scales (list): Scale codes, one per matrix column
+        family (str): Interpretation family of the scales, e.g. "PSY5"
+        genders: Optional sequence of "female"/"male" in any case, one per row;
+            rows without a gender use the tables shared by every gender
+
+    Returns:
+        tuple: ((respondents x scales) array of narrative ids, matching object
+            array of narrative texts, None where a cell has no narrative)
+    """
+    # NumPy is only needed for batches, so single lookups do not import it
+    import numpy as np
+
+    t_scores = np.asarray(matrix, dtype=float)
+    if t_scores.ndim != 2 or t_scores.shape[1] != len(scales):
+        raise ValueError(f"Expected a (respondents x {len(scales)}) T-score matrix, got shape {t_scores.shape}")
+
+    # Split the cells into those the tables cover and the rest
+    finite = np.isfinite(t_scores)
+    rounded = np.where(finite, np.rint(t_scores), -1)
+    tabled = finite & (rounded == t_scores) & (rounded >= TABLE_MIN_T_SCORE) & (rounded <= TABLE_MAX_T_SCORE)
+    indices = np.where(tabled, rounded, TABLE_MIN_T_SCORE).astype(np.intp)
+
+    # Index each gender's stacked tables with the T-scores of its rows
+    if genders is None:
+        labels, row_labels = [None], np.zeros(len(t_scores), dtype=np.intp)
+    else:
+        gender_names, row_labels = np.unique(np.asarray(genders, dtype=str), return_inverse=True)
+        labels = [str(name).capitalize() or None for name in gender_names]
+    ids = np.full(t_scores.shape, NO_NARRATIVE, dtype=np.uint32)
+    for label_index, label in enumerate(labels):
+        rows = row_labels == label_index
+        tables, table_rows = _gender_tables(family, scales, label)
+        gender_ids = tables[table_rows, indices[rows]]
+        ids[rows] = np.where(tabled[rows], gender_ids, NO_NARRATIVE)
+
+    # Match the remaining finite T-scores against the source bands
+    for row, column in zip(*np.nonzero(finite & ~tabled)):
+        gender = labels[row_labels[row]]
+        narrative = lookup_narrative(family, scales[column], float(t_scores[row, column]), gender)
+        ids[row, column] = NO_NARRATIVE if narrative is None else _narrative_id(narrative)
+
+    return ids, _narrative_array()[ids]
+
+
+def format_table_issues(issues=None):
+    """
+    Format gaps and overlaps for display, one line per scale and kind.
+
+    Args:
+        issues (list, optional): Issues to format; TABLE_ISSUES by default
+
+    Returns:
+        str: The report
+    """
+    lines = []
+    for issue in TABLE_ISSUES if issues is None else issues:
+        runs = ', '.join(f"{low}" if low == high else f"{low}-{high}" for low, high in issue['t_scores'])
+        lines.append(f"{issue['family']}/{issue['gender']}/{issue['scale']}: {issue['kind']} at T={runs}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    compile_all_tables()
+    print(f"{len(NARRATIVE_TABLES)} scale tables, {len(NARRATIVES) - 1} distinct narratives")
+    if TABLE_ISSUES:
+        print(format_table_issues())
+        sys.exit(1)
@@ -0,0 +1,235 @@
+"""
+Pronoun-templated narratives for MMPI-2 interpretation corpora.
+
+Several corpora keep a female and a male copy of every narrative that differ
+only in pronouns and nouns ("This woman ... she ... her" against "This man ...
+he ... his"). A template stores such a narrative once, with a slot for each
+word that depends on the respondent's sex:
+
+    "This {noun} avoids confrontation. {Subject} defers to {object} partner..."
+
+A slot written with a capital letter renders capitalized. Literal braces are
+doubled, as in str.format. The words of every slot are resolved once per sex
+(SLOT_VALUES), so rendering a template is a single str.format_map call, and a
+narrative without slots renders as the template itself, shared by both sexes.
+Rendered corpora are cached by interpretation_corpus.load_corpus.
+
+merge_corpora() converts a pair of corpora into one template corpus by aligning
+the two copies of each narrative word for word; pairs of words that differ are
+turned into slots when they are a known female/male pair ("her"/"his" is a
+possessive, "her"/"him" an object) and otherwise the narrative is kept as a
+sex-specific pair. Run this module to merge the paired corpora and report how
+much they shrink:
+
+    python narrative_templates.py
+"""
+
+import re
+import sys
+import json
+
+# Sexes the templates render for
+SEXES = ('Female', 'Male')
+
+# Words each slot renders to, by sex
+PRONOUN_SLOTS = {
+    'noun': {'Female': 'woman', 'Male': 'man'},
+    'nouns': {'Female': 'women', 'Male': 'men'},
+    'sex': {'Female': 'female', 'Male': 'male'},
+    'subject': {'Female': 'she', 'Male': 'he'},
+    'object': {'Female': 'her', 'Male': 'him'},
+    'possessive': {'Female': 'her', 'Male': 'his'},
+    'independent': {'Female': 'hers', 'Male': 'his'},
+    'reflexive': {'Female': 'herself', 'Male': 'himself'}
+}
+
+# Key of a narrative (or subtree) that could not be templated and is kept per sex
+SEX_SPECIFIC_KEY = 'by_sex'
+
+
+def _compile_slot_values():
+    """
+    Resolve every slot, in lower and capitalized form, for every sex.
+
+    Returns:
+        dict: sex -> {slot field: word}
+    """
+    values = {sex: {} for sex in SEXES}
+    for slot, words in PRONOUN_SLOTS.items():
+        for sex, word in words.items():
+            values[sex][slot] = word
+            values[sex][slot.capitalize()] = word.capitalize()
+    return values
+
+
+def _compile_word_pairs():
+    """
+    Map every (female word, male word) pair to the slot field it becomes.
+
+    Returns:
+        dict: (female word, male word) -> slot field
+    """
+    pairs = {}
+    for slot, words in PRONOUN_SLOTS.items():
+        female, male = words['Female'], words['Male']
+        pairs[(female, male)] = slot
+        pairs[(female.capitalize(), male.capitalize())] = slot.capitalize()
+    return pairs
+
+
+SLOT_VALUES = _compile_slot_values()
+WORD_PAIRS = _compile_word_pairs()
+
+# Splits a narrative into alternating separators and words
+_WORDS = re.compile(r"(\w+)")
+
+
+def render_template(template, sex):
+    """
+    Render a template for a sex.
+
+    Args:
+        template (str): Narrative template
+        sex (str): "Female" or "Male"
+
+    Returns:
+        str: The narrative; the template itself when it has no slot or brace
+    """
+    if '{' not in template and '}' not in template:
+        return template
+    try:
+        return template.format_map(SLOT_VALUES[sex])
+    except KeyError as e:
+        raise ValueError(f"Unknown pronoun slot {e} in narrative template") from None
+
+
+def _escape(text):
+    """Escape the braces of literal text for a template."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def merge_narratives(female, male):
+    """
+    Merge the female and male copies of a narrative into one template.
+
+    Args:
+        female (str): Female narrative
+        male (str): Male narrative
+
+    Returns:
+        str or None: The template, or None if the copies differ in more than
+            their pronouns and nouns
+    """
+    female_parts = _WORDS.split(female)
+    male_parts = _WORDS.split(male)
+    if len(female_parts) != len(male_parts):
+        return None
+
+    template = []
+    for female_part, male_part in zip(female_parts, male_parts):
+        if female_part == male_part:
+            template.append(_escape(female_part))
+            continue
+        slot = WORD_PAIRS.get((female_part, male_part))
+        if slot is None:
+            return None
+        template.append('{' + slot + '}')
+    return ''.join(template)
+
+
+def merge_corpora(female, male, path=(), unmerged=None):
+    """
+    Merge a female and a male corpus into one template corpus.
+
+    Both corpora are walked in parallel. Narratives that differ only in their
+    pronouns and nouns become templates; any other difference, or a key found
+    in one corpus only, is kept as {SEX_SPECIFIC_KEY: {sex: value}}.
+
+    Args:
+        female: Female corpus (or subtree)
+        male: Male corpus (or subtree)
+        path (tuple): Keys leading to the subtree, for reporting
+        unmerged (list, optional): Collects the paths kept per sex
+
+    Returns:
+        The template corpus
+    """
+    if isinstance(female, dict) and isinstance(male, dict):
+        merged = {}
+        for key in list(female) + [key for key in male if key not in female]:
+            if key in female and key in male:
+                merged[key] = merge_corpora(female[key], male[key], path + (key,), unmerged)
+            else:
+                sex_values = {sex: corpus[key] for sex, corpus in zip(SEXES, (female, male)) if key in corpus}
+                merged[key] = {SEX_SPECIFIC_KEY: sex_values}
+                if unmerged is not None:
+                    unmerged.append(path + (key,))
+        return merged
+
+    if isinstance(female, list) and isinstance(male, list) and len(female) == len(male):
+        return [merge_corpora(f, m, path + (i,), unmerged) for i, (f, m) in enumerate(zip(female, male))]
+
+    if isinstance(female, str) and isinstance(male, str):
+        template = merge_narratives(female, male)
+        if template is not None:
+            return template
+    elif not isinstance(female, (dict, list, str)) and female == male:
+        return female
+
+    if unmerged is not None:
+        unmerged.append(path)
+    return {SEX_SPECIFIC_KEY: {'Female': female, 'Male': male}}
+
+
+def render_corpus(templates, sex):
+    """
+    Render a template corpus for a sex.
+
+    Args:
+        templates: Template corpus (or subtree) from merge_corpora
+        sex (str): "Female" or "Male"
+
+    Returns:
+        The corpus as written for that sex; keys kept for the other sex only
+            are left out
+    """
+    if isinstance(templates, dict):
+        if len(templates) == 1 and SEX_SPECIFIC_KEY in templates:
+            return templates[SEX_SPECIFIC_KEY].get(sex)
+        rendered = {}
+        for key, value in templates.items():
+            if isinstance(value, dict) and len(value) == 1 and SEX_SPECIFIC_KEY in value \
+                    and sex not in value[SEX_SPECIFIC_KEY]:
+                continue
+            rendered[key] = render_corpus(value, sex)
+        return rendered
+    if isinstance(templates, list):
+        return [render_corpus(item, sex) for item in templates]
+    if isinstance(templates, str):
+        return render_template(templates, sex)
+    return templates
+
+
+if __name__ == "__main__":
+    from src.interpretation.interpretation_corpus import paired_corpora, merge_paired_corpus
+
+    print(f"{'Corpus':<42}{'Paired KiB':>12}{'Template KiB':>14}{'Kept per sex':>14}")
+    all_merged = True
+    for pair_name in paired_corpora():
+        try:
+            sources, templates, unmerged = merge_paired_corpus(pair_name)
+        except Exception as e:
+            print(f"{pair_name:<42}failed: {type(e).__name__}: {e}")
+            all_merged = False
+            continue
+        paired_size = sum(len(json.dumps(source, ensure_ascii=False)) for source in sources.values())
+        template_size = len(json.dumps(templates, ensure_ascii=False))
+        print(f"{pair_name:<42}{paired_size / 1024:>12.1f}{template_size / 1024:>14.1f}{len(unmerged):>14}")
+
+        # Rendering the templates must give back both corpora exactly
+        for sex, source in sources.items():
+            if render_corpus(templates, sex) != source:
+                print(f"  {sex} corpus does not round-trip")
+                all_merged = False
+    if not all_merged:
+        sys.exit(1)
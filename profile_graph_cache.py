@@ -0,0 +1,277 @@
+"""
+Rendered profile graph cache for MMPI-2 reports.
+
+The same graph is often rendered again with identical inputs: repeated reports,
+the families a clinician did not touch when editing one score, and the shared
+sample profiles. Graphs are keyed by a canonical hash of their chart spec (see
+graph_engine; it carries the scales, the figure size and the style), the
+plotted values and the output format. Profile PNGs are cached as a scores layer
+without the title, so their key leaves out the title with the client's name and
+every client with the same scores, family and quality tier shares the entry;
+graph_engine adds each client's title when it reads the layer. Other graphs
+are cached whole, title included. The cached bytes are kept:
+
+- in memory, in a small least-recently-used hot tier owned by the process
+- on disk, shared by every process, with least-recently-used eviction once the
+  cache grows past its size limit; an entry's modification time is refreshed
+  on every hit, as in the report cache
+
+Hit and miss counters are kept per process.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Bump when the renderers change, so graphs cached by older code are not reused
+GRAPH_CACHE_VERSION = 4
+
+# Rendered graphs kept in memory by each process
+DEFAULT_HOT_ENTRIES = 64
+
+# Disk space used by cached graphs; 0 disables the limit
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+def graph_cache_key(spec, values, graph_format):
+    """
+    Compute the canonical hash of a rendered graph.
+
+    Args:
+        spec (dict): Chart spec
+        values (list): Plotted values, in plotting order
+        graph_format (str): Output format, e.g. "png" or "svg"
+
+    Returns:
+        str: Hex SHA-256 digest identifying the rendered graph
+    """
+    payload = {
+        'version': GRAPH_CACHE_VERSION,
+        'spec': spec,
+        'values': values,
+        'format': graph_format
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class GraphCache:
+    """
+    Two-tier (memory, then disk) cache of rendered graphs.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, hot_entries=DEFAULT_HOT_ENTRIES,
+                 evict_interval=60):
+        """
+        Initialize the graph cache.
+
+        Args:
+            cache_dir (str): Directory that holds the cached graphs
+            max_bytes (int): Disk space to use; 0 disables the size limit
+            hot_entries (int): Graphs kept in memory; 0 disables the hot tier
+            evict_interval (int): Minimum seconds between eviction passes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hot_entries = hot_entries
+        self.evict_interval = evict_interval
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_evicted = 0
+        self._stats = {
+            'hot_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evicted_total': 0,
+            'evicted_bytes_total': 0
+        }
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, key, graph_format):
+        """
+        Get the path of the cached graph for a key.
+
+        Entries are spread over sub-directories named after the first two
+        characters of the key.
+
+        Args:
+            key (str): Graph hash
+            graph_format (str): Output format, used as the file extension
+
+        Returns:
+            str: Path to the cached graph
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{graph_format}")
+
+    def _remember(self, entry_path, data):
+        """
+        Put a graph in the hot tier, dropping the least recently used graphs.
+
+        Must be called with the lock held.
+
+        Args:
+            entry_path (str): Path of the cached graph, used as hot tier key
+            data (bytes): Rendered graph
+        """
+        if not self.hot_entries:
+            return
+        self._hot[entry_path] = data
+        self._hot.move_to_end(entry_path)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    def get(self, key, graph_format):
+        """
+        Look up a rendered graph.
+
+        Args:
+            key (str): Graph hash
+            graph_format (str): Output format
+
+        Returns:
+            bytes or None: The rendered graph, or None on a miss
+        """
+        entry_path = self._entry_path(key, graph_format)
+        with self._lock:
+            data = self._hot.get(entry_path)
+            if data is not None:
+                self._hot.move_to_end(entry_path)
+                self._stats['hot_hits'] += 1
+                return data
+
+        try:
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+            # Refresh the entry so eviction treats it as recently used
+            os.utime(entry_path)
+        except OSError:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self._remember(entry_path, data)
+            self._stats['disk_hits'] += 1
+        return data
+
+    def put(self, key, graph_format, data):
+        """
+        Store a rendered graph.
+
+        Args:
+            key (str): Graph hash
+            graph_format (str): Output format
+            data (bytes): Rendered graph
+        """
+        entry_path = self._entry_path(key, graph_format)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            self._remember(entry_path, data)
+            self._stats['stores'] += 1
+
+        if time.time() - self._last_evicted >= self.evict_interval:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used graphs until the cache is within max_bytes.
+
+        Returns:
+            dict: Number of graphs and bytes removed
+        """
+        self._last_evicted = time.time()
+        removed = {'graphs': 0, 'bytes': 0}
+        if not self.max_bytes:
+            return removed
+
+        # Collect (last used, path, size) for every cached graph
+        entries = []
+        with os.scandir(self.cache_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(shard.path) as graphs:
+                    for entry in graphs:
+                        if entry.name.endswith('.tmp') or not entry.is_file(follow_symlinks=False):
+                            continue
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, entry.path, stat.st_size))
+
+        entries.sort()
+        total_bytes = sum(entry[2] for entry in entries)
+        for _, entry_path, size in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total_bytes -= size
+            removed['graphs'] += 1
+            removed['bytes'] += size
+
+        with self._lock:
+            self._stats['evicted_total'] += removed['graphs']
+            self._stats['evicted_bytes_total'] += removed['bytes']
+        return removed
+
+    def metrics(self):
+        """
+        Get the hit, miss and eviction counters of this process.
+
+        Returns:
+            dict: Cache metrics
+        """
+        with self._lock:
+            hits = self._stats['hot_hits'] + self._stats['disk_hits']
+            lookups = hits + self._stats['misses']
+            return {
+                'pid': os.getpid(),
+                'hot_entries': len(self._hot),
+                'hot_hits_total': self._stats['hot_hits'],
+                'disk_hits_total': self._stats['disk_hits'],
+                'misses_total': self._stats['misses'],
+                'stores_total': self._stats['stores'],
+                'evicted_total': self._stats['evicted_total'],
+                'evicted_bytes_total': self._stats['evicted_bytes_total'],
+                'hit_ratio': round(hits / lookups, 3) if lookups else None
+            }
+
+
+# Graph caches opened by this process, keyed by directory
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_graph_cache(cache_dir, max_bytes=DEFAULT_MAX_BYTES, hot_entries=DEFAULT_HOT_ENTRIES):
+    """
+    Get the graph cache of this process for a directory.
+
+    The cache is opened on first use and kept, so its hot tier survives across
+    the reports built by a report worker process.
+
+    Args:
+        cache_dir (str): Directory that holds the cached graphs
+        max_bytes (int): Disk space to use; 0 disables the size limit
+        hot_entries (int): Graphs kept in memory
+
+    Returns:
+        GraphCache: The graph cache
+    """
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_dir)
+        if cache is None:
+            cache = _CACHES[cache_dir] = GraphCache(cache_dir, max_bytes=max_bytes, hot_entries=hot_entries)
+        return cache
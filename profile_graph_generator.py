@@ -1,459 +1,351 @@
 """
 Enhanced graphical profile generator for MMPI-2 reports using web-compatible methods.
-This module creates profile graphs without using Pillow/PIL dependencies.
+PNG graphs are drawn with matplotlib, which requires Pillow; SVG graphs and the
+combined PDF are written without matplotlib or any imaging library.
+
+Graphs are rendered by the shared graph engine (graph_engine) from profile
+chart specs. PNG graphs are drawn by the template renderer in
+profile_graph_renderer, which builds the static background of each scale family
+once per process and only draws the client's data on top of it for every
+report. SVG graphs and the pages of the combined PDF are written directly from
+the vector scenes of profile_graph_scene; matplotlib is only imported for PNG
+output. With graph_workers set, PNG family graphs are rendered concurrently by
+the persistent graph render pool. With a graph cache, only families whose graph
+is not cached are rendered at all.
+
+PNG graphs come in the quality tiers of GRAPH_QUALITY_TIERS. A report build
+only renders the small preview tier (EAGER_GRAPH_QUALITIES) and writes the JSON
+graph profile; the full and print tiers are rendered from that profile by
+render_graph_variant the first time they are requested, so viewing a report
+never waits for print-resolution rasters.
+
+In the "client" format no family graph is rendered on the server: the generator
+writes a compact JSON graph profile that static/profile_charts.js draws in the
+report viewer, and only the combined vector PDF is produced for printing.
 """
 
 import os
 import json
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.ticker import MultipleLocator
+import html
+
+from src.constants.graph_constants import (
+    GRAPH_FAMILIES, GRAPH_FAMILY_SPECS, GRAPH_FORMATS, DEFAULT_GRAPH_FORMAT, GRAPH_PROFILE_FILENAME,
+    GRAPH_QUALITY_TIERS, DEFAULT_GRAPH_QUALITY, EAGER_GRAPH_QUALITIES, T_SCORE_AXIS, REFERENCE_LINES,
+    family_t_scores, graph_filename, graph_title, combined_graphs_filename
+)
+from src.reporting.graph_engine import GraphEngine, profile_chart_spec
+
+def graph_profile(family_scores, client_info):
+    """
+    Build the compact graph profile of a client: for every family its title,
+    scale order, labels and T-scores, plus the shared T-score axis, reference
+    lines and the client's sex.
+
+    Args:
+        family_scores (dict): Family -> dictionary of scale scores
+        client_info (dict): Dictionary containing client information
+
+    Returns:
+        dict: JSON-serializable graph profile
+    """
+    families = []
+    for family in GRAPH_FAMILIES:
+        spec = GRAPH_FAMILY_SPECS[family]
+        entry = {
+            'family': family,
+            'name': spec['display_name'],
+            'title': graph_title(family, client_info),
+            'scales': spec['scales'],
+            't_scores': family_t_scores(family, family_scores[family])
+        }
+        if 'labels' in spec:
+            entry['labels'] = spec['labels']
+        if 'full_names' in spec:
+            entry['full_names'] = [spec['full_names'].get(scale, '') for scale in spec['scales']]
+        if spec.get('label_rotation'):
+            entry['label_rotation'] = spec['label_rotation']
+        families.append(entry)
+    return {'axis': list(T_SCORE_AXIS), 'reference_lines': REFERENCE_LINES,
+            'sex': client_info.get('sex', 'female'), 'families': families}
+
 
 class ProfileGraphGenerator:
     """
     Generates graphical representations of MMPI-2 profiles using web-compatible methods.
     """
-    
-    def __init__(self, output_dir):
+
+    def __init__(self, output_dir, graph_format=DEFAULT_GRAPH_FORMAT, graph_workers=0, graph_cache=None,
+                 graph_qualities=None):
         """
         Initialize the profile graph generator.
-        
+
         Args:
             output_dir (str): Directory to save generated graphs
+            graph_format (str): "png", "svg" or "client"
+            graph_workers (int): Render PNG family graphs concurrently in a
+                pool of this many processes; 0 renders them one after another
+            graph_cache (GraphCache, optional): Cache of rendered graphs to
+                reuse and fill
+            graph_qualities (list, optional): Quality tiers of PNG graphs to
+                render with the report, EAGER_GRAPH_QUALITIES by default; the
+                other tiers are rendered on request by render_graph_variant
         """
+        if graph_format not in GRAPH_FORMATS:
+            raise ValueError(f"Unknown graph format: {graph_format}")
+        self.graph_qualities = list(graph_qualities or EAGER_GRAPH_QUALITIES)
+        for quality in self.graph_qualities:
+            if quality not in GRAPH_QUALITY_TIERS:
+                raise ValueError(f"Unknown graph quality: {quality}")
         self.output_dir = output_dir
+        self.graph_format = graph_format
+        self.graph_workers = graph_workers
+        self.graph_cache = graph_cache
         os.makedirs(output_dir, exist_ok=True)
-        
-        # Set matplotlib style for clinical appearance
-        plt.style.use('ggplot')
-        self.fig_size = (10, 8)
-        self.dpi = 100
-        
+
+        # SVG graphs are cheap enough that the render pool would only add overhead
+        self.engine = GraphEngine(graph_cache=graph_cache,
+                                  graph_workers=graph_workers if graph_format == 'png' else 0)
+
+        # Graph cache hits and misses of this generator
+        self.cache_stats = self.engine.stats
+
     def generate_all_graphs(self, scores, client_info):
         """
         Generate all profile graphs for the MMPI-2 report.
-        
+
         Args:
             scores (dict): Dictionary containing all scale scores
             client_info (dict): Dictionary containing client information
-            
+
         Returns:
             dict: Dictionary of paths to generated graph files
         """
-        graph_paths = {}
-        
-        # Generate traditional profile graph
-        graph_paths['traditional'] = self.generate_traditional_profile_graph(
-            scores['clinical_scales'], 
-            client_info
-        )
-        
-        # Generate RC scales graph
-        graph_paths['rc_scales'] = self.generate_rc_scales_graph(
-            scores['rc_scales'], 
-            client_info
-        )
-        
-        # Generate content scales graph
-        graph_paths['content_scales'] = self.generate_content_scales_graph(
-            scores['content_scales'], 
-            client_info
-        )
-        
-        # Generate PSY-5 scales graph
-        graph_paths['psy5_scales'] = self.generate_psy5_scales_graph(
-            scores['psy5_scales'], 
-            client_info
-        )
-        
-        # Generate supplementary scales graph
-        graph_paths['supplementary_scales'] = self.generate_supplementary_scales_graph(
-            scores['supplementary_scales'], 
-            client_info
-        )
-        
-        # Combine all graphs into a single PDF
-        graph_paths['all_graphs'] = self.combine_graphs_to_pdf(graph_paths, client_info)
-        
+        family_scores = {
+            family: scores['clinical_scales' if family == 'traditional' else family]
+            for family in GRAPH_FAMILIES
+        }
+
+        # Leave the family graphs to the browser; only the printable PDF is rendered here
+        if self.graph_format == 'client':
+            graph_paths = {'graph_profile': self.write_graph_profile(family_scores, client_info)}
+            graph_paths['all_graphs'] = self.combine_graphs_to_pdf(dict.fromkeys(GRAPH_FAMILIES), client_info,
+                                                                   family_scores)
+            return graph_paths
+
+        # Generate the traditional, RC, content, PSY-5 and supplementary graphs;
+        # PNG graphs in each eager quality tier, keyed by family for the first
+        # tier and by "<family>_<quality>" for the others
+        qualities = self.graph_qualities if self.graph_format == 'png' else [None]
+        keys, charts = [], []
+        for quality in qualities:
+            for family in GRAPH_FAMILIES:
+                keys.append(family if quality == qualities[0] else f"{family}_{quality}")
+                charts.append((self._chart_spec(family, client_info, quality), family_scores[family],
+                               os.path.join(self.output_dir, graph_filename(family, self.graph_format, quality))))
+        graph_paths = dict(zip(keys, self.engine.render_charts(charts, self.graph_format)))
+
+        # The other PNG tiers are rendered later from the graph profile
+        if self.graph_format == 'png':
+            graph_paths['graph_profile'] = self.write_graph_profile(family_scores, client_info)
+
+        # Combine all graphs into a single PDF (PNG) or HTML page (SVG)
+        if self.graph_format == 'svg':
+            graph_paths['all_graphs'] = self.combine_graphs_to_html(graph_paths, client_info)
+        else:
+            graph_paths['all_graphs'] = self.combine_graphs_to_pdf(graph_paths, client_info, family_scores)
+
         return graph_paths
-    
+
+    def write_graph_profile(self, family_scores, client_info):
+        """
+        Write the JSON graph profile that the report viewer draws client-side.
+
+        Args:
+            family_scores (dict): Family -> dictionary of scale scores
+            client_info (dict): Dictionary containing client information
+
+        Returns:
+            str: Path to the graph profile file
+        """
+        output_path = os.path.join(self.output_dir, GRAPH_PROFILE_FILENAME)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(graph_profile(family_scores, client_info), f, separators=(',', ':'))
+        return output_path
+
+    def render_graph_variant(self, family, quality):
+        """
+        Render one family graph of a finished report in another quality tier.
+
+        The graph is drawn from the graph profile in the output directory, so
+        the report's scores are not needed again. It is written under a
+        temporary name and moved into place, so concurrent requests for the
+        same variant never see a partly written file.
+
+        Args:
+            family (str): Key of GRAPH_FAMILY_SPECS
+            quality (str): Key of GRAPH_QUALITY_TIERS
+
+        Returns:
+            str: Path to the PNG graph file
+        """
+        if family not in GRAPH_FAMILY_SPECS or quality not in GRAPH_QUALITY_TIERS:
+            raise ValueError(f"Unknown graph variant: {family} ({quality})")
+        with open(os.path.join(self.output_dir, GRAPH_PROFILE_FILENAME), encoding='utf-8') as f:
+            profile = json.load(f)
+        entry = next(entry for entry in profile['families'] if entry['family'] == family)
+
+        spec = profile_chart_spec(family, {'sex': profile.get('sex', 'female')}, quality=quality)
+        spec['title'] = entry['title']
+        output_path = os.path.join(self.output_dir, graph_filename(family, 'png', quality))
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        self.engine.render(spec, dict(zip(entry['scales'], entry['t_scores'])), tmp_path, 'png')
+        os.replace(tmp_path, output_path)
+        return output_path
+
+    def _chart_spec(self, family, client_info, quality=None):
+        """
+        Build the chart spec of one family graph.
+
+        Args:
+            family (str): Key of GRAPH_FAMILY_SPECS
+            client_info (dict): Dictionary containing client information
+            quality (str, optional): Key of GRAPH_QUALITY_TIERS; the full tier
+                by default
+
+        Returns:
+            dict: The chart spec
+        """
+        return profile_chart_spec(family, client_info, quality=quality or DEFAULT_GRAPH_QUALITY)
+
+    def _render_family_graph(self, family, family_scores, client_info):
+        """
+        Render the graph of one scale family into the output directory.
+
+        Args:
+            family (str): Key of GRAPH_FAMILY_SPECS
+            family_scores (dict): Dictionary of scale scores for the family
+            client_info (dict): Dictionary containing client information
+
+        Returns:
+            str: Path to generated graph file
+        """
+        output_path = os.path.join(self.output_dir, graph_filename(family, self.graph_format))
+        return self.engine.render(self._chart_spec(family, client_info), family_scores, output_path,
+                                  self.graph_format)
+
     def generate_traditional_profile_graph(self, clinical_scales, client_info):
         """
         Generate traditional MMPI-2 profile graph.
-        
+
         Args:
             clinical_scales (dict): Dictionary of clinical scale scores
             client_info (dict): Dictionary containing client information
-            
+
         Returns:
             str: Path to generated graph file
         """
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-        
-        # Define scales and their order
-        scale_names = ['L', 'F', 'K', '1', '2', '3', '4', '5', '6', '7', '8', '9', '0']
-        scale_labels = ['L', 'F', 'K', 'Hs', 'D', 'Hy', 'Pd', 'Mf', 'Pa', 'Pt', 'Sc', 'Ma', 'Si']
-        
-        # Extract scores in correct order
-        scores = []
-        for scale in scale_names:
-            if scale in clinical_scales:
-                scores.append(clinical_scales[scale])
-            else:
-                scores.append(50)  # Default value if missing
-        
-        # Create x-axis positions
-        x_pos = np.arange(len(scale_labels))
-        
-        # Plot scores
-        ax.plot(x_pos, scores, 'b-o', linewidth=1.5, markersize=6)
-        
-        # Set axis limits
-        ax.set_ylim(30, 120)
-        ax.set_xlim(-0.5, len(scale_labels) - 0.5)
-        
-        # Add clinical significance lines
-        ax.axhline(y=65, color='r', linestyle='-', linewidth=2)
-        ax.axhline(y=50, color='r', linestyle='-', linewidth=2)
-        
-        # Set grid
-        ax.grid(True, linestyle='-', alpha=0.7)
-        ax.set_axisbelow(True)
-        
-        # Set ticks and labels
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(scale_labels)
-        
-        # Y-axis ticks every 10 units
-        ax.yaxis.set_major_locator(MultipleLocator(10))
-        
-        # Add title
-        name = client_info.get('name', 'Client')
-        sex = client_info.get('sex', 'female')
-        sex_label = 'Female' if sex == 'female' else 'Male'
-        title = f"MMPI-2 Clinical Scales Profile: {name} ({sex_label})"
-        ax.set_title(title, fontsize=14, fontweight='bold')
-        
-        # Add labels
-        ax.set_ylabel('T-Score', fontsize=12)
-        
-        # Add raw scores above graph
-        for i, score in enumerate(scores):
-            ax.text(i, 122, str(score), ha='center', va='bottom', fontsize=10)
-        
-        # Add "Raw Score:" label
-        ax.text(-0.5, 122, "T-Score:", ha='right', va='bottom', fontsize=10)
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save figure
-        output_path = os.path.join(self.output_dir, 'traditional_profile_graph.png')
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close(fig)
-        
-        return output_path
-    
+        return self._render_family_graph('traditional', clinical_scales, client_info)
+
     def generate_rc_scales_graph(self, rc_scales, client_info):
         """
         Generate RC scales graph.
-        
+
         Args:
             rc_scales (dict): Dictionary of RC scale scores
             client_info (dict): Dictionary containing client information
-            
+
         Returns:
             str: Path to generated graph file
         """
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-        
-        # Define RC scales and their full names
-        rc_scale_names = ['RCd', 'RC1', 'RC2', 'RC3', 'RC4', 'RC6', 'RC7', 'RC8', 'RC9']
-        rc_scale_full_names = {
-            'RCd': 'Demoralization',
-            'RC1': 'Somatic Complaints',
-            'RC2': 'Low Positive Emotions',
-            'RC3': 'Cynicism',
-            'RC4': 'Antisocial Behavior',
-            'RC6': 'Ideas of Persecution',
-            'RC7': 'Dysfunctional Negative Emotions',
-            'RC8': 'Aberrant Experiences',
-            'RC9': 'Hypomanic Activation'
-        }
-        
-        # Extract scores in correct order
-        scores = []
-        for scale in rc_scale_names:
-            if scale in rc_scales:
-                scores.append(rc_scales[scale])
-            else:
-                scores.append(50)  # Default value if missing
-        
-        # Create x-axis positions
-        x_pos = np.arange(len(rc_scale_names))
-        
-        # Plot scores
-        ax.plot(x_pos, scores, 'b-o', linewidth=1.5, markersize=6)
-        
-        # Set axis limits
-        ax.set_ylim(30, 120)
-        ax.set_xlim(-0.5, len(rc_scale_names) - 0.5)
-        
-        # Add clinical significance lines
-        ax.axhline(y=65, color='r', linestyle='-', linewidth=2)
-        ax.axhline(y=50, color='r', linestyle='-', linewidth=2)
-        
-        # Set grid
-        ax.grid(True, linestyle='-', alpha=0.7)
-        ax.set_axisbelow(True)
-        
-        # Set ticks and labels
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(rc_scale_names)
-        
-        # Y-axis ticks every 10 units
-        ax.yaxis.set_major_locator(MultipleLocator(10))
-        
-        # Add title
-        name = client_info.get('name', 'Client')
-        sex = client_info.get('sex', 'female')
-        sex_label = 'Female' if sex == 'female' else 'Male'
-        title = f"MMPI-2 Restructured Clinical (RC) Scales: {name} ({sex_label})"
-        ax.set_title(title, fontsize=14, fontweight='bold')
-        
-        # Add labels
-        ax.set_ylabel('T-Score', fontsize=12)
-        
-        # Add raw scores above graph
-        for i, score in enumerate(scores):
-            ax.text(i, 122, str(score), ha='center', va='bottom', fontsize=10)
-        
-        # Add "Raw Score:" label
-        ax.text(-0.5, 122, "T-Score:", ha='right', va='bottom', fontsize=10)
-        
-        # Add RC scale full names as a table below the graph
-        table_data = []
-        for scale in rc_scale_names:
-            table_data.append([scale, rc_scale_full_names.get(scale, '')])
-        
-        table = ax.table(cellText=table_data, 
-                         colLabels=['Scale', 'Full Name'],
-                         loc='bottom', 
-                         cellLoc='center',
-                         bbox=[0, -0.4, 1, 0.2])
-        table.auto_set_font_size(False)
-        table.set_fontsize(8)
-        table.scale(1, 1.5)
-        
-        # Adjust layout
-        plt.subplots_adjust(bottom=0.25)
-        
-        # Save figure
-        output_path = os.path.join(self.output_dir, 'rc_scales_graph.png')
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close(fig)
-        
-        return output_path
-    
+        return self._render_family_graph('rc_scales', rc_scales, client_info)
+
     def generate_content_scales_graph(self, content_scales, client_info):
         """
         Generate content scales graph.
-        
+
         Args:
             content_scales (dict): Dictionary of content scale scores
             client_info (dict): Dictionary containing client information
-            
+
         Returns:
             str: Path to generated graph file
         """
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-        
-        # Define content scales
-        content_scale_names = ['ANX', 'FRS', 'OBS', 'DEP', 'HEA', 'BIZ', 'ANG', 'CYN', 
-                              'ASP', 'TPA', 'LSE', 'SOD', 'FAM', 'WRK', 'TRT']
-        
-        # Extract scores in correct order
-        scores = []
-        for scale in content_scale_names:
-            if scale in content_scales:
-                scores.append(content_scales[scale])
-            else:
-                scores.append(50)  # Default value if missing
-        
-        # Create x-axis positions
-        x_pos = np.arange(len(content_scale_names))
-        
-        # Plot scores
-        ax.plot(x_pos, scores, 'b-o', linewidth=1.5, markersize=6)
-        
-        # Set axis limits
-        ax.set_ylim(30, 120)
-        ax.set_xlim(-0.5, len(content_scale_names) - 0.5)
-        
-        # Add clinical significance lines
-        ax.axhline(y=65, color='r', linestyle='-', linewidth=2)
-        ax.axhline(y=50, color='r', linestyle='-', linewidth=2)
-        
-        # Set grid
-        ax.grid(True, linestyle='-', alpha=0.7)
-        ax.set_axisbelow(True)
-        
-        # Set ticks and labels
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(content_scale_names, rotation=45, ha='right')
-        
-        # Y-axis ticks every 10 units
-        ax.yaxis.set_major_locator(MultipleLocator(10))
-        
-        # Add title
-        name = client_info.get('name', 'Client')
-        sex = client_info.get('sex', 'female')
-        sex_label = 'Female' if sex == 'female' else 'Male'
-        title = f"MMPI-2 Content Scales: {name} ({sex_label})"
-        ax.set_title(title, fontsize=14, fontweight='bold')
-        
-        # Add labels
-        ax.set_ylabel('T-Score', fontsize=12)
-        
-        # Add raw scores above graph
-        for i, score in enumerate(scores):
-            ax.text(i, 122, str(score), ha='center', va='bottom', fontsize=10)
-        
-        # Add "Raw Score:" label
-        ax.text(-0.5, 122, "T-Score:", ha='right', va='bottom', fontsize=10)
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save figure
-        output_path = os.path.join(self.output_dir, 'content_scales_graph.png')
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close(fig)
-        
-        return output_path
-    
+        return self._render_family_graph('content_scales', content_scales, client_info)
+
     def generate_psy5_scales_graph(self, psy5_scales, client_info):
         """
         Generate PSY-5 scales graph.
-        
+
         Args:
             psy5_scales (dict): Dictionary of PSY-5 scale scores
             client_info (dict): Dictionary containing client information
-            
+
         Returns:
             str: Path to generated graph file
         """
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-        
-        # Define PSY-5 scales
-        psy5_scale_names = ['AGGR', 'PSYC', 'DISC', 'NEGE', 'INTR']
-        psy5_scale_full_names = {
-            'AGGR': 'Aggressiveness',
-            'PSYC': 'Psychoticism',
-            'DISC': 'Disconstraint',
-            'NEGE': 'Negative Emotionality/Neuroticism',
-            'INTR': 'Introversion/Low Positive Emotionality'
-        }
-        
-        # Extract scores in correct order
-        scores = []
-        for scale in psy5_scale_names:
-            if scale in psy5_scales:
-                scores.append(psy5_scales[scale])
-            else:
-                scores.append(50)  # Default value if missing
-        
-        # Create x-axis positions
-        x_pos = np.arange(len(psy5_scale_names))
-        
-        # Plot scores
-        ax.plot(x_pos, scores, 'b-o', linewidth=1.5, markersize=6)
-        
-        # Set axis limits
-        ax.set_ylim(30, 120)
-        ax.set_xlim(-0.5, len(psy5_scale_names) - 0.5)
-        
-        # Add clinical significance lines
-        ax.axhline(y=65, color='r', linestyle='-', linewidth=2)
-        ax.axhline(y=50, color='r', linestyle='-', linewidth=2)
-        
-        # Set grid
-        ax.grid(True, linestyle='-', alpha=0.7)
-        ax.set_axisbelow(True)
-        
-        # Set ticks and labels
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(psy5_scale_names)
-        
-        # Y-axis ticks every 10 units
-        ax.yaxis.set_major_locator(MultipleLocator(10))
-        
-        # Add title
-        name = client_info.get('name', 'Client')
-        sex = client_info.get('sex', 'female')
-        sex_label = 'Female' if sex == 'female' else 'Male'
-        title = f"MMPI-2 PSY-5 Scales: {name} ({sex_label})"
-        ax.set_title(title, fontsize=14, fontweight='bold')
-        
-        # Add labels
-        ax.set_ylabel('T-Score', fontsize=12)
-        
-        # Add raw scores above graph
-        for i, score in enumerate(scores):
-            ax.text(i, 122, str(score), ha='center', va='bottom', fontsize=10)
-        
-        # Add "Raw Score:" label
-        ax.text(-0.5, 122, "T-Score:", ha='right', va='bottom', fontsize=10)
-        
-        # Add PSY-5 scale full names as a table below the graph
-        table_data = []
-        for scale in psy5_scale_names:
-            table_data.append([scale, psy5_scale_full_names.get(scale, '')])
-        
-        table = ax.table(cellText=table_data, 
-                         colLabels=['Scale', 'Full Name'],
-                         loc='bottom', 
-                         cellLoc='center',
-                         bbox=[0, -0.4, 1, 0.2])
-        table.auto_set_font_size(False)
-        table.set_fontsize(8)
-        table.scale(1, 1.5)
-        
-        # Adjust layout
-        plt.subplots_adjust(bottom=0.25)
-        
-        # Save figure
-        output_path = os.path.join(self.output_dir, 'psy5_scales_graph.png')
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close(fig)
-        
-        return output_path
-    
+        return self._render_family_graph('psy5_scales', psy5_scales, client_info)
+
     def generate_supplementary_scales_graph(self, supplementary_scales, client_info):
         """
         Generate supplementary scales graph.
-        
+
         Args:
             supplementary_scales (dict): Dictionary of supplementary scale scores
             client_info (dict): Dictionary containing client information
-            
+
         Returns:
             str: Path to generated graph file
         """
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-        
-        # Define supplementary scales
-        supp_scale_names = ['A', 'R', 'Es', 'Do', 'Re', 'Mt', 'PK', 'MDS', 'Ho', 'O-H', 'MAC-R', 'APS', 'GM', 'GF']
-        
-        # Extract scores in correct order
-        scores = []
-        for scale in supp_scale_names:
-            if
-(Content truncated due to size limit. Use line ranges to read in chunks)
+        return self._render_family_graph('supplementary_scales', supplementary_scales, client_info)
+
+    def combine_graphs_to_pdf(self, graph_paths, client_info, family_scores):
+        """
+        Combine the family graphs into a single vector PDF, one graph per page.
+
+        The pages are drawn from the same vector scenes as the SVG graphs, so
+        nothing is rasterized again and matplotlib is not needed.
+
+        Args:
+            graph_paths (dict): Dictionary of paths to generated graph files;
+                only these families are included
+            client_info (dict): Dictionary containing client information
+            family_scores (dict): Family -> dictionary of scale scores
+
+        Returns:
+            str: Path to the combined PDF file
+        """
+        output_path = os.path.join(self.output_dir, combined_graphs_filename('png'))
+        charts = [(self._chart_spec(family, client_info), family_scores[family])
+                  for family in GRAPH_FAMILIES if family in graph_paths]
+        return self.engine.render_pages(charts, output_path,
+                                        title=f"MMPI-2 Profile Graphs: {client_info.get('name', 'Client')}")
+
+    def combine_graphs_to_html(self, graph_paths, client_info):
+        """
+        Combine SVG graphs into a single printable HTML page with the graphs inlined.
+
+        Args:
+            graph_paths (dict): Dictionary of paths to generated SVG graph files
+            client_info (dict): Dictionary containing client information
+
+        Returns:
+            str: Path to the combined HTML file
+        """
+        output_path = os.path.join(self.output_dir, combined_graphs_filename('svg'))
+        title = html.escape(f"MMPI-2 Profile Graphs: {client_info.get('name', 'Client')}")
+
+        parts = [
+            '<!DOCTYPE html><html><head><meta charset="utf-8">',
+            f'<title>{title}</title>',
+            '<style>section{page-break-after:always;margin:0 0 2em}svg{width:100%;height:auto}</style>',
+            '</head><body>'
+        ]
+        for family in GRAPH_FAMILIES:
+            if family in graph_paths:
+                with open(graph_paths[family], encoding='utf-8') as f:
+                    parts.append(f'<section>{f.read()}</section>')
+        parts.append('</body></html>')
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
+        return output_path
@@ -0,0 +1,260 @@
+"""
+PDF profile graph backend for MMPI-2 reports.
+
+Writes graph scenes from profile_graph_scene as vector PDF pages, one page per
+family graph, without matplotlib and without rasterizing anything. Text is set
+in the standard Helvetica fonts, which every PDF viewer provides, so no font is
+embedded and a page of graph is a few kilobytes of compressed drawing
+operators.
+
+As in the SVG backend, the content stream of the static part of each family is
+built and compressed once per process; a page only adds a small stream with the
+profile's title, polyline, points and T-score labels.
+"""
+
+import zlib
+import math
+
+# Points per canvas pixel; the 1000x800 canvas becomes a 10x8 inch page
+PDF_SCALE = 0.72
+
+# zlib level for content streams
+STREAM_COMPRESS_LEVEL = 6
+
+# Advance widths (1/1000 em) of the printable ASCII characters, from the AFM
+# metrics of the standard Helvetica and Helvetica-Bold fonts
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+]
+
+# Width used for characters outside printable ASCII
+DEFAULT_CHAR_WIDTH = 556
+
+# Resource name, base font and widths, keyed by whether the text is bold
+PDF_FONTS = {
+    False: ('F1', 'Helvetica', HELVETICA_WIDTHS),
+    True: ('F2', 'Helvetica-Bold', HELVETICA_BOLD_WIDTHS)
+}
+
+# Control point distance of the Bezier curves that approximate a quarter circle
+BEZIER_CIRCLE = 0.5523
+
+
+def _num(value):
+    """
+    Format a number for a content stream.
+
+    Args:
+        value (float): Number
+
+    Returns:
+        str: Shortest fixed-point form with at most three decimals
+    """
+    text = f'{value:.3f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _color(color):
+    """
+    Convert a "#rrggbb" colour to PDF RGB components.
+
+    Args:
+        color (str): Colour
+
+    Returns:
+        str: "r g b" with components from 0 to 1
+    """
+    return ' '.join(_num(int(color[i:i + 2], 16) / 255) for i in (1, 3, 5))
+
+
+def _text_width(encoded, bold, size):
+    """
+    Measure a text in canvas pixels.
+
+    Args:
+        encoded (bytes): Text in WinAnsiEncoding (cp1252)
+        bold (bool): Whether the text is bold
+        size (float): Font size
+
+    Returns:
+        float: Advance width of the text
+    """
+    widths = PDF_FONTS[bold][2]
+    units = sum(widths[byte - 32] if 32 <= byte <= 126 else DEFAULT_CHAR_WIDTH for byte in encoded)
+    return units * size / 1000
+
+
+def _pdf_string(encoded):
+    """
+    Quote a byte string as a PDF literal string.
+
+    Args:
+        encoded (bytes): String content
+
+    Returns:
+        str: Literal string, with bytes mapped one to one to characters
+    """
+    text = encoded.decode('latin-1')
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def _pdf_item(item):
+    """
+    Convert one drawing item to content stream operators.
+
+    Coordinates stay in canvas pixels; the page transform maps the canvas,
+    whose origin is at the top left, onto the page.
+
+    Args:
+        item (dict): Drawing item
+
+    Returns:
+        str: Operators
+    """
+    kind = item['type']
+    if kind == 'text':
+        encoded = item['text'].encode('cp1252', errors='replace')
+        name = PDF_FONTS[item['bold']][0]
+        shift = {'start': 0, 'middle': 0.5, 'end': 1}[item['anchor']] * _text_width(encoded, item['bold'], item['size'])
+        # Text matrix: flip glyphs upright in the y-down canvas, then rotate counter-clockwise
+        angle = math.radians(item['rotation'])
+        cos, sin = math.cos(angle), math.sin(angle)
+        matrix = ' '.join(_num(value) for value in (cos, -sin, -sin, -cos, item['x'], item['y']))
+        return (f'BT /{name} {_num(item["size"])} Tf {_color(item["fill"])} rg {matrix} Tm '
+                f'{_num(-shift)} 0 Td {_pdf_string(encoded)} Tj ET')
+    if kind == 'rect':
+        ops = []
+        if item['fill']:
+            ops.append(f'{_color(item["fill"])} rg')
+        if item['stroke']:
+            ops.append(f'{_color(item["stroke"])} RG {_num(item["stroke_width"])} w')
+        paint = 'B' if item['fill'] and item['stroke'] else ('f' if item['fill'] else 'S')
+        ops.append(f'{_num(item["x"])} {_num(item["y"])} {_num(item["width"])} {_num(item["height"])} re {paint}')
+        return ' '.join(ops)
+    if kind == 'segments':
+        path = ' '.join(f'{_num(x1)} {_num(y1)} m {_num(x2)} {_num(y2)} l'
+                        for (x1, y1), (x2, y2) in item['segments'])
+        return f'{_color(item["stroke"])} RG {_num(item["stroke_width"])} w {path} S'
+    if kind == 'line':
+        return (f'{_color(item["stroke"])} RG {_num(item["stroke_width"])} w '
+                f'{_num(item["x1"])} {_num(item["y1"])} m {_num(item["x2"])} {_num(item["y2"])} l S')
+    if kind == 'polyline':
+        (x, y), rest = item['points'][0], item['points'][1:]
+        path = ' '.join([f'{_num(x)} {_num(y)} m'] + [f'{_num(x)} {_num(y)} l' for x, y in rest])
+        return f'{_color(item["stroke"])} RG {_num(item["stroke_width"])} w 1 j {path} S'
+    if kind == 'circle':
+        cx, cy, r = item['cx'], item['cy'], item['r']
+        k = r * BEZIER_CIRCLE
+        curves = [
+            (cx + r, cy + k, cx + k, cy + r, cx, cy + r),
+            (cx - k, cy + r, cx - r, cy + k, cx - r, cy),
+            (cx - r, cy - k, cx - k, cy - r, cx, cy - r),
+            (cx + k, cy - r, cx + r, cy - k, cx + r, cy)
+        ]
+        path = ' '.join(' '.join(_num(value) for value in curve) + ' c' for curve in curves)
+        return f'{_color(item["fill"])} rg {_num(cx + r)} {_num(cy)} m {path} f'
+    raise ValueError(f"Unknown drawing item: {kind}")
+
+
+def _content_stream(scene, items):
+    """
+    Build a compressed content stream that draws items onto a scene's page.
+
+    Args:
+        scene (dict): Scene the items belong to
+        items (list): Drawing items
+
+    Returns:
+        bytes: zlib-compressed stream content
+    """
+    page_height = scene['height'] * PDF_SCALE
+    ops = [f'q {_num(PDF_SCALE)} 0 0 {_num(-PDF_SCALE)} 0 {_num(page_height)} cm']
+    ops.extend(_pdf_item(item) for item in items)
+    ops.append('Q')
+    return zlib.compress('\n'.join(ops).encode('latin-1'), STREAM_COMPRESS_LEVEL)
+
+
+# Compressed static content streams built in this process, keyed by family
+_STATIC_STREAMS = {}
+
+
+def _pdf_text_string(text):
+    """
+    Encode a text string (e.g. a document title) as a UTF-16 PDF hex string.
+
+    Args:
+        text (str): Text
+
+    Returns:
+        str: Hex string with a byte order mark
+    """
+    return '<FEFF' + text.encode('utf-16-be').hex().upper() + '>'
+
+
+def render_scenes_pdf(scenes, title=None):
+    """
+    Write graph scenes as a multi-page vector PDF, one page per scene.
+
+    Args:
+        scenes (list): Scenes built by build_family_scene, in page order
+        title (str, optional): Document title
+
+    Returns:
+        bytes: The PDF document
+    """
+    # Objects 1-5 are the catalog, page tree, fonts and document info;
+    # every page adds a page object, its static stream and its data stream
+    page_ids = [6 + index * 3 for index in range(len(scenes))]
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{" ".join(f"{page_id} 0 R" for page_id in page_ids)}] /Count {len(scenes)} >>',
+        f'<< /Type /Font /Subtype /Type1 /BaseFont /{PDF_FONTS[False][1]} /Encoding /WinAnsiEncoding >>',
+        f'<< /Type /Font /Subtype /Type1 /BaseFont /{PDF_FONTS[True][1]} /Encoding /WinAnsiEncoding >>',
+        f'<< /Title {_pdf_text_string(title)} >>' if title else '<< >>'
+    ]
+    for page_id, scene in zip(page_ids, scenes):
+        static = _STATIC_STREAMS.get(scene['family'])
+        if static is None:
+            static = _STATIC_STREAMS[scene['family']] = _content_stream(scene, scene['static'])
+        data = _content_stream(scene, scene['data'])
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R '
+            f'/MediaBox [0 0 {_num(scene["width"] * PDF_SCALE)} {_num(scene["height"] * PDF_SCALE)}] '
+            f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> '
+            f'/Contents [{page_id + 1} 0 R {page_id + 2} 0 R] >>'
+        )
+        objects.extend([static, data])
+
+    # Serialize the objects and the cross-reference table
+    parts = [b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n']
+    offsets = []
+    position = len(parts[0])
+    for number, body in enumerate(objects, start=1):
+        if isinstance(body, bytes):
+            chunk = (f'{number} 0 obj\n<< /Length {len(body)} /Filter /FlateDecode >>\nstream\n'.encode('latin-1')
+                     + body + b'\nendstream\nendobj\n')
+        else:
+            chunk = f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+        offsets.append(position)
+        parts.append(chunk)
+        position += len(chunk)
+
+    xref = [f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n']
+    xref.extend(f'{offset:010d} 00000 n \n' for offset in offsets)
+    xref.append(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 5 0 R >>\nstartxref\n{position}\n%%EOF\n')
+    parts.append(''.join(xref).encode('latin-1'))
+    return b''.join(parts)
+
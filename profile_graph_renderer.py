@@ -0,0 +1,451 @@
+"""
+Template-based profile graph renderer for MMPI-2 reports.
+
+Every profile graph of a scale family shares the same grid, ticks, 50/65
+reference lines, axis labels and (for RC and PSY-5) scale name table; only the
+title, the plotted line and the T-score labels depend on the client. A
+GraphTemplate builds the static background of a family once, renders it to a
+raster buffer and keeps it. Rendering a profile restores that buffer, draws the
+data layer on top (blitting) and encodes the result, instead of building,
+laying out and drawing a whole new figure.
+
+A PNG is encoded in two layers that are compressed independently and joined
+into one zlib stream: the title rows at the top, which carry the client's name,
+and the scores layer below them (line, points and T-score labels). The scores
+layer depends only on the family, the figure size and the T-scores, so the
+graph cache keeps it and compose() adds the title of each client.
+
+Templates are cached per process, so report worker processes pay the set-up
+cost once (at warm-up) and every later graph only pays for the data layer.
+Each template has its own Figure, canvas and lock, and blitting only draws
+artists styled when the template was built, so threads render different
+families at the same time.
+
+The family graphs of a report are independent, so they can also be rendered
+concurrently by a graph render pool: a process pool that is kept alive across
+reports and whose children warm their templates when they start.
+"""
+
+import os
+import math
+import zlib
+import struct
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import MultipleLocator
+
+from src.constants.graph_constants import (
+    T_SCORE_AXIS, REFERENCE_LINES, DEFAULT_T_SCORE, GRAPH_FAMILY_SPECS, GRAPH_FAMILIES, GRAPH_QUALITY_TIERS,
+    EAGER_GRAPH_QUALITIES, family_t_scores, graph_title
+)
+from src.reporting.graph_engine import report_style
+
+# zlib level for PNG output; encoding dominates the cost of a warm render
+PNG_COMPRESS_LEVEL = 6
+
+# Points between the top of the plot and the title, above the T-score labels
+TITLE_PAD = 30
+
+# Pixels kept clear between the title layer and the T-score labels, for antialiasing
+LAYER_MARGIN = 2
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# zlib stream header: deflate with a 32 KiB window, default compression
+ZLIB_HEADER = b'\x78\x9c'
+
+# Modulus of the Adler-32 checksum
+ADLER_BASE = 65521
+
+# Default figure geometry, matching the original graphs
+DEFAULT_FIG_SIZE = (10, 8)
+DEFAULT_DPI = 100
+
+
+def _adler32_combine(adler1, adler2, length2):
+    """
+    Combine the Adler-32 checksums of two consecutive pieces of data.
+
+    Args:
+        adler1 (int): Checksum of the first piece
+        adler2 (int): Checksum of the second piece
+        length2 (int): Length of the second piece
+
+    Returns:
+        int: Checksum of the two pieces joined
+    """
+    remainder = length2 % ADLER_BASE
+    sum1 = adler1 & 0xffff
+    sum2 = (remainder * sum1 + (adler1 >> 16) + (adler2 >> 16) - remainder) % ADLER_BASE
+    sum1 = (sum1 + (adler2 & 0xffff) - 1) % ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+
+def encode_png_layer(rows, final):
+    """
+    Filter and compress a band of image rows as one layer of a PNG.
+
+    Rows use the PNG "up" filter, except the first, which is left unfiltered
+    so the layer does not depend on the rows above it. Each layer is a
+    separate run of deflate blocks, so layers compressed on their own can be
+    joined into one zlib stream.
+
+    Args:
+        rows (ndarray): uint8 RGB rows, shape (rows, width * 3)
+        final (bool): Whether the layer ends the image
+
+    Returns:
+        bytes: Adler-32 checksum and length of the filtered rows, then the
+            deflate blocks
+    """
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 0] = 0
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+    data = filtered.tobytes()
+
+    compressor = zlib.compressobj(PNG_COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_FULL_FLUSH)
+    return struct.pack('>II', zlib.adler32(data), len(data)) + deflated
+
+
+def _png_chunk(kind, data):
+    """Frame a PNG chunk with its length and CRC."""
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)))
+
+
+def assemble_png(width, height, dpi, layers):
+    """
+    Join encoded layers, top to bottom, into an RGB PNG.
+
+    Args:
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        dpi (int): Resolution recorded in the file
+        layers (list): Layers from encode_png_layer; the last one final
+
+    Returns:
+        bytes: The PNG file
+    """
+    adler = 1
+    stream = [ZLIB_HEADER]
+    for layer in layers:
+        layer_adler, length = struct.unpack_from('>II', layer)
+        adler = _adler32_combine(adler, layer_adler, length)
+        stream.append(layer[8:])
+    stream.append(struct.pack('>I', adler))
+
+    pixels_per_metre = int(dpi / 0.0254 + 0.5)
+    return b''.join([
+        PNG_SIGNATURE,
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)),
+        _png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1)),
+        _png_chunk(b'IDAT', b''.join(stream)),
+        _png_chunk(b'IEND', b'')
+    ])
+
+
+class GraphTemplate:
+    """
+    A scale family graph whose static background is drawn once and reused.
+    """
+
+    def __init__(self, family, fig_size=DEFAULT_FIG_SIZE, dpi=DEFAULT_DPI):
+        """
+        Build the figure of a family and capture its static background.
+
+        Args:
+            family (str): Key of GRAPH_FAMILY_SPECS
+            fig_size (tuple): Figure size in inches
+            dpi (int): Figure resolution
+        """
+        self.family = family
+        self.spec = GRAPH_FAMILY_SPECS[family]
+        self.dpi = dpi
+        self._lock = threading.Lock()
+
+        scales = self.spec['scales']
+        labels = self.spec.get('labels', scales)
+        x_pos = np.arange(len(scales))
+
+        with report_style():
+            self.figure = Figure(figsize=fig_size, dpi=dpi)
+            self.canvas = FigureCanvasAgg(self.figure)
+            ax = self.figure.add_subplot()
+
+            # Static layer: axes, reference lines, grid, ticks and labels
+            ax.set_ylim(*T_SCORE_AXIS)
+            ax.set_xlim(-0.5, len(scales) - 0.5)
+            for y in REFERENCE_LINES:
+                ax.axhline(y=y, color='r', linestyle='-', linewidth=2)
+            ax.grid(True, linestyle='-', alpha=0.7)
+            ax.set_axisbelow(True)
+            ax.set_xticks(x_pos)
+            rotation = self.spec.get('label_rotation', 0)
+            ax.set_xticklabels(labels, rotation=rotation, ha='right' if rotation else 'center')
+            ax.yaxis.set_major_locator(MultipleLocator(10))
+            ax.set_ylabel('T-Score', fontsize=12)
+            ax.text(-0.5, T_SCORE_AXIS[1] + 2, "T-Score:", ha='right', va='bottom', fontsize=10)
+
+            # Data layer: drawn per profile on top of the cached background
+            # (placeholder text is used for layout; the title sits above the score
+            # row, with room between them for the title layer of a PNG)
+            self._title = ax.set_title(graph_title(family, {'name': 'Client'}), fontsize=14, fontweight='bold',
+                                       pad=TITLE_PAD)
+            self._line, = ax.plot(x_pos, [DEFAULT_T_SCORE] * len(scales), 'b-o', linewidth=1.5, markersize=6)
+            self._score_labels = [
+                ax.text(i, T_SCORE_AXIS[1] + 2, '120', ha='center', va='bottom', fontsize=10)
+                for i in x_pos
+            ]
+
+            if 'full_names' in self.spec:
+                # Scale name table below the graph
+                table = ax.table(cellText=[[scale, self.spec['full_names'].get(scale, '')] for scale in scales],
+                                 colLabels=['Scale', 'Full Name'],
+                                 loc='bottom',
+                                 cellLoc='center',
+                                 bbox=[0, -0.5, 1, 0.35])
+                table.auto_set_font_size(False)
+                table.set_fontsize(8)
+                table.scale(1, 1.5)
+                self.figure.subplots_adjust(bottom=0.35, top=0.9)
+            else:
+                self.figure.tight_layout()
+
+            self._data_artists = [self._title, self._line] + self._score_labels
+            for artist in self._data_artists:
+                artist.set_animated(True)
+
+            # Animated artists are left out of a full draw, so this is the background
+            self.canvas.draw()
+            self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+            # The rows above the T-score labels, which hold the title and no
+            # other data, are the title layer of a PNG
+            renderer = self.canvas.get_renderer()
+            labels_top = max(label.get_window_extent(renderer).y1 for label in self._score_labels)
+            layer_bottom = math.ceil(labels_top) + LAYER_MARGIN
+            if self._title.get_window_extent(renderer).y0 - LAYER_MARGIN < layer_bottom:
+                raise ValueError(f"The title of the {family} graph overlaps its T-score labels")
+            self.width, self.height = self.canvas.get_width_height()
+            self._title_rows = self.height - layer_bottom
+
+    def _set_scores(self, t_scores):
+        """
+        Update the line and T-score labels for a profile.
+
+        Args:
+            t_scores (list): T-scores in plotting order
+        """
+        self._line.set_ydata(t_scores)
+        for label, score in zip(self._score_labels, t_scores):
+            label.set_text(str(score))
+
+    def _rgb_rows(self, rows):
+        """
+        Get rows of the rendered canvas without the alpha channel; graphs are opaque.
+
+        Args:
+            rows (slice): Rows to get, from the top
+
+        Returns:
+            ndarray: uint8 RGB rows, shape (rows, width * 3)
+        """
+        return np.asarray(self.canvas.buffer_rgba())[rows, :, :3].reshape(-1, self.width * 3)
+
+    def render_scores_layer(self, t_scores):
+        """
+        Render the scores layer of a profile PNG: every row below the title.
+
+        Args:
+            t_scores (list): T-scores in plotting order
+
+        Returns:
+            bytes: The encoded layer, for compose()
+        """
+        with self._lock:
+            self._set_scores(t_scores)
+            self.canvas.restore_region(self._background)
+            renderer = self.canvas.get_renderer()
+            for artist in self._data_artists[1:]:
+                artist.draw(renderer)
+            return encode_png_layer(self._rgb_rows(slice(self._title_rows, None)), final=True)
+
+    def compose(self, title, scores_layer):
+        """
+        Render the title layer of a profile PNG and join it to a scores layer.
+
+        Args:
+            title (str): Graph title
+            scores_layer (bytes): Layer from render_scores_layer()
+
+        Returns:
+            bytes: The PNG
+        """
+        with self._lock:
+            self._title.set_text(title)
+            self.canvas.restore_region(self._background)
+            self._title.draw(self.canvas.get_renderer())
+            title_layer = encode_png_layer(self._rgb_rows(slice(self._title_rows)), final=False)
+        return assemble_png(self.width, self.height, self.dpi, [title_layer, scores_layer])
+
+    def render(self, t_scores, title, output):
+        """
+        Render a profile as PNG by drawing the data layer over the background.
+
+        Args:
+            t_scores (list): T-scores in plotting order
+            title (str): Graph title
+            output: File path or binary file object to write the PNG to
+        """
+        data = self.compose(title, self.render_scores_layer(t_scores))
+        if hasattr(output, 'write'):
+            output.write(data)
+        else:
+            with open(output, 'wb') as f:
+                f.write(data)
+
+    def render_figure(self, t_scores, title, output, format='pdf'):
+        """
+        Render a profile through a full figure draw, for vector formats that
+        cannot reuse the raster background.
+
+        Args:
+            t_scores (list): T-scores in plotting order
+            title (str): Graph title
+            output: File path, binary file object or PdfPages to write to
+            format (str): Output format, e.g. "pdf" or "svg"
+        """
+        with self._lock:
+            self._title.set_text(title)
+            self._set_scores(t_scores)
+            for artist in self._data_artists:
+                artist.set_animated(False)
+            try:
+                if hasattr(output, 'savefig'):
+                    output.savefig(self.figure)
+                else:
+                    self.figure.savefig(output, format=format)
+            finally:
+                for artist in self._data_artists:
+                    artist.set_animated(True)
+
+
+# Templates built in this process, keyed by (family, figure size, dpi)
+_TEMPLATES = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def get_graph_template(family, fig_size=DEFAULT_FIG_SIZE, dpi=DEFAULT_DPI):
+    """
+    Get the cached template of a family, building it on first use.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        fig_size (tuple): Figure size in inches
+        dpi (int): Figure resolution
+
+    Returns:
+        GraphTemplate: The family template
+    """
+    key = (family, tuple(fig_size), dpi)
+    template = _TEMPLATES.get(key)
+    if template is None:
+        with _TEMPLATES_LOCK:
+            template = _TEMPLATES.get(key)
+            if template is None:
+                template = _TEMPLATES[key] = GraphTemplate(family, fig_size, dpi)
+    return template
+
+
+def warm_graph_templates(qualities=None):
+    """
+    Build the templates of every family in this process.
+
+    Args:
+        qualities (list, optional): Keys of GRAPH_QUALITY_TIERS to build
+            templates for; the tiers rendered with every report by default
+
+    Returns:
+        int: Number of templates built
+    """
+    qualities = qualities or EAGER_GRAPH_QUALITIES
+    for quality in qualities:
+        tier = GRAPH_QUALITY_TIERS[quality]
+        for family in GRAPH_FAMILIES:
+            get_graph_template(family, tier['fig_size'], tier['dpi'])
+    return len(GRAPH_FAMILIES) * len(qualities)
+
+
+def render_family_graph(family, family_scores, client_info, output,
+                        fig_size=DEFAULT_FIG_SIZE, dpi=DEFAULT_DPI):
+    """
+    Render the PNG graph of one scale family from its cached template.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        family_scores (dict): Scale code -> T-score
+        client_info (dict): Dictionary containing client information
+        output: File path or binary file object to write the PNG to
+        fig_size (tuple): Figure size in inches
+        dpi (int): Figure resolution
+    """
+    template = get_graph_template(family, fig_size, dpi)
+    template.render(family_t_scores(family, family_scores), graph_title(family, client_info), output)
+
+
+# Graph render pools of this process, keyed by number of workers
+_RENDER_POOLS = {}
+_RENDER_POOLS_LOCK = threading.Lock()
+
+
+def get_graph_render_pool(max_workers, start_method='spawn'):
+    """
+    Get the persistent graph render pool of this process.
+
+    The pool is created on first use and reused by every later report. Each
+    child builds the family templates when it starts, so graphs rendered by the
+    pool only pay for the data layer. A pool created before a fork is not
+    reused by the child process.
+
+    Args:
+        max_workers (int): Number of render processes
+        start_method (str): multiprocessing start method for the children
+
+    Returns:
+        ProcessPoolExecutor: The render pool
+    """
+    with _RENDER_POOLS_LOCK:
+        executor, pid = _RENDER_POOLS.get(max_workers, (None, None))
+        if executor is None or pid != os.getpid():
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=warm_graph_templates
+            )
+            _RENDER_POOLS[max_workers] = (executor, os.getpid())
+        return executor
+
+
+def shutdown_graph_render_pools(wait=True):
+    """
+    Shut down the graph render pools created by this process.
+
+    Args:
+        wait (bool): Wait for running renders to finish
+    """
+    with _RENDER_POOLS_LOCK:
+        pools = list(_RENDER_POOLS.values())
+        _RENDER_POOLS.clear()
+    for executor, pid in pools:
+        if pid == os.getpid():
+            executor.shutdown(wait=wait)
+
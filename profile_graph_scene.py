@@ -0,0 +1,265 @@
+"""
+Vector scene representation of MMPI-2 profile graphs.
+
+A profile graph has a fixed geometry: scale positions along the x-axis, T=30-120
+on the y-axis, reference lines, a polyline and (for RC and PSY-5) a scale name
+table. This module lays a family graph out once as a list of plain drawing
+items (rectangles, line segments, polylines, circles and text) in a 1000x800
+canvas with the origin at the top left. The SVG and PDF backends serialize the
+same scene, so a graph is laid out once whatever format it is written in.
+
+A scene is split into a static part, shared by every profile of the family and
+built once per process, and a data part (title, polyline, points and T-score
+labels) built for each profile. Backends can therefore cache the serialized
+static part per family.
+
+Drawing items are dicts with a "type" key:
+
+- rect: x, y, width, height, fill, stroke, stroke_width
+- segments: segments [((x1, y1), (x2, y2)), ...], stroke, stroke_width
+- line: x1, y1, x2, y2, stroke, stroke_width
+- polyline: points [(x, y), ...], stroke, stroke_width
+- circle: cx, cy, r, fill
+- text: x, y (baseline), text, size, anchor ("start", "middle" or "end"),
+  fill, bold, rotation (degrees counter-clockwise about x, y)
+
+Colours are "#rrggbb" strings; None means no fill or no stroke.
+"""
+
+from src.constants.graph_constants import (
+    T_SCORE_AXIS, REFERENCE_LINES, GRAPH_FAMILY_SPECS, family_t_scores, graph_title
+)
+
+# Canvas size in pixels, matching the 10x8 inch, 100 dpi PNGs
+CANVAS_WIDTH = 1000
+CANVAS_HEIGHT = 800
+
+# Plot area; families with a scale name table leave room for it below
+PLOT_LEFT = 80
+PLOT_RIGHT = 980
+PLOT_TOP = 80
+PLOT_BOTTOM = 740
+PLOT_BOTTOM_ROTATED_LABELS = 720
+PLOT_BOTTOM_WITH_TABLE = 520
+TABLE_TOP = 580
+TABLE_ROW_HEIGHT = 20
+
+# Colours of the clinical (ggplot-like) style
+BACKGROUND_COLOR = '#ffffff'
+PLOT_BACKGROUND = '#e5e5e5'
+GRID_COLOR = '#ffffff'
+TICK_LABEL_COLOR = '#555555'
+TEXT_COLOR = '#000000'
+REFERENCE_LINE_COLOR = '#ff0000'
+PROFILE_COLOR = '#0000ff'
+
+
+def _rect(x, y, width, height, fill=None, stroke=None, stroke_width=1):
+    """
+    Build a rectangle item.
+
+    Returns:
+        dict: Drawing item
+    """
+    return {'type': 'rect', 'x': x, 'y': y, 'width': width, 'height': height,
+            'fill': fill, 'stroke': stroke, 'stroke_width': stroke_width}
+
+
+def _line(x1, y1, x2, y2, stroke, stroke_width=1):
+    """
+    Build a line item.
+
+    Returns:
+        dict: Drawing item
+    """
+    return {'type': 'line', 'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+            'stroke': stroke, 'stroke_width': stroke_width}
+
+
+def _text(x, y, text, size, anchor='start', fill=TEXT_COLOR, bold=False, rotation=0):
+    """
+    Build a text item.
+
+    Returns:
+        dict: Drawing item
+    """
+    return {'type': 'text', 'x': x, 'y': y, 'text': text, 'size': size, 'anchor': anchor,
+            'fill': fill, 'bold': bold, 'rotation': rotation}
+
+
+def plot_bottom(spec):
+    """
+    Get the bottom edge of the plot area of a family.
+
+    Args:
+        spec (dict): Family graph spec
+
+    Returns:
+        int: y coordinate of the bottom of the plot area
+    """
+    if 'full_names' in spec:
+        return PLOT_BOTTOM_WITH_TABLE
+    if spec.get('label_rotation'):
+        return PLOT_BOTTOM_ROTATED_LABELS
+    return PLOT_BOTTOM
+
+
+def x_positions(count):
+    """
+    Get the x coordinate of every scale position.
+
+    Args:
+        count (int): Number of scales
+
+    Returns:
+        list: x coordinates, rounded to one decimal
+    """
+    step = (PLOT_RIGHT - PLOT_LEFT) / count
+    return [round(PLOT_LEFT + (index + 0.5) * step, 1) for index in range(count)]
+
+
+def y_position(t_score, bottom):
+    """
+    Map a T-score to a y coordinate, clamped to the plotted range.
+
+    Args:
+        t_score (int): T-score
+        bottom (int): Bottom edge of the plot area
+
+    Returns:
+        float: y coordinate, rounded to one decimal
+    """
+    low, high = T_SCORE_AXIS
+    t_score = min(max(t_score, low), high)
+    return round(bottom - (t_score - low) * (bottom - PLOT_TOP) / (high - low), 1)
+
+
+def _build_static_items(family):
+    """
+    Lay out the static part of a family graph.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+
+    Returns:
+        list: Drawing items
+    """
+    spec = GRAPH_FAMILY_SPECS[family]
+    scales = spec['scales']
+    labels = spec.get('labels', scales)
+    bottom = plot_bottom(spec)
+    positions = x_positions(len(scales))
+
+    items = [
+        _rect(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT, fill=BACKGROUND_COLOR),
+        _rect(PLOT_LEFT, PLOT_TOP, PLOT_RIGHT - PLOT_LEFT, bottom - PLOT_TOP, fill=PLOT_BACKGROUND)
+    ]
+
+    # Grid lines and y tick labels every 10 T-score points
+    grid = []
+    for t_score in range(T_SCORE_AXIS[0], T_SCORE_AXIS[1] + 1, 10):
+        y = y_position(t_score, bottom)
+        grid.append(((PLOT_LEFT, y), (PLOT_RIGHT, y)))
+        items.append(_text(PLOT_LEFT - 8, y + 4, str(t_score), 13, anchor='end', fill=TICK_LABEL_COLOR))
+    for x in positions:
+        grid.append(((x, PLOT_TOP), (x, bottom)))
+    items.append({'type': 'segments', 'segments': grid, 'stroke': GRID_COLOR, 'stroke_width': 1})
+
+    # Clinical reference lines
+    for t_score in REFERENCE_LINES:
+        y = y_position(t_score, bottom)
+        items.append(_line(PLOT_LEFT, y, PLOT_RIGHT, y, REFERENCE_LINE_COLOR, stroke_width=2.5))
+
+    # Scale labels along the x-axis
+    rotation = spec.get('label_rotation', 0)
+    for x, label in zip(positions, labels):
+        items.append(_text(x, bottom + 20, label, 13, anchor='end' if rotation else 'middle',
+                           fill=TICK_LABEL_COLOR, rotation=rotation))
+
+    # Axis label and the caption of the T-score row
+    y_center = (PLOT_TOP + bottom) / 2
+    items.append(_text(25, y_center, 'T-Score', 16, anchor='middle', fill=TICK_LABEL_COLOR, rotation=90))
+    items.append(_text(PLOT_LEFT - 8, PLOT_TOP - 8, 'T-Score:', 13, anchor='end'))
+
+    # Scale name table below the graph
+    if 'full_names' in spec:
+        rows = [('Scale', 'Full Name')] + [(scale, spec['full_names'].get(scale, '')) for scale in scales]
+        middle = (PLOT_LEFT + PLOT_RIGHT) / 2
+        for index, (scale, full_name) in enumerate(rows):
+            y = TABLE_TOP + index * TABLE_ROW_HEIGHT
+            items.append(_rect(PLOT_LEFT, y, PLOT_RIGHT - PLOT_LEFT, TABLE_ROW_HEIGHT,
+                               stroke=TEXT_COLOR, stroke_width=0.5))
+            items.append(_text((PLOT_LEFT + middle) / 2, y + 14, scale, 11, anchor='middle'))
+            items.append(_text((middle + PLOT_RIGHT) / 2, y + 14, full_name, 11, anchor='middle'))
+        table_bottom = TABLE_TOP + len(rows) * TABLE_ROW_HEIGHT
+        items.append(_line(middle, TABLE_TOP, middle, table_bottom, TEXT_COLOR, stroke_width=0.5))
+
+    return items
+
+
+# Static items built in this process, keyed by family
+_STATIC_ITEMS = {}
+
+
+def family_static_items(family):
+    """
+    Get the static drawing items of a family, building them on first use.
+
+    The returned list is shared and must not be modified.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+
+    Returns:
+        list: Drawing items
+    """
+    items = _STATIC_ITEMS.get(family)
+    if items is None:
+        items = _STATIC_ITEMS[family] = _build_static_items(family)
+    return items
+
+
+def build_scene(family, t_scores, title):
+    """
+    Lay out the graph of one scale family for a list of T-scores.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        t_scores (list): T-scores in plotting order
+        title (str): Graph title
+
+    Returns:
+        dict: Scene with "family", "width", "height", "static" and "data" keys
+    """
+    bottom = plot_bottom(GRAPH_FAMILY_SPECS[family])
+    points = list(zip(x_positions(len(t_scores)), (y_position(score, bottom) for score in t_scores)))
+
+    data = [
+        _text((PLOT_LEFT + PLOT_RIGHT) / 2, 35, title, 19, anchor='middle', bold=True),
+        {'type': 'polyline', 'points': points, 'stroke': PROFILE_COLOR, 'stroke_width': 2}
+    ]
+    data.extend({'type': 'circle', 'cx': x, 'cy': y, 'r': 4, 'fill': PROFILE_COLOR} for x, y in points)
+    data.extend(_text(x, PLOT_TOP - 8, str(score), 13, anchor='middle') for (x, _), score in zip(points, t_scores))
+
+    return {
+        'family': family,
+        'width': CANVAS_WIDTH,
+        'height': CANVAS_HEIGHT,
+        'static': family_static_items(family),
+        'data': data
+    }
+
+
+def build_family_scene(family, family_scores, client_info):
+    """
+    Lay out the graph of one scale family for a profile.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        family_scores (dict): Scale code -> T-score
+        client_info (dict): Dictionary containing client information
+
+    Returns:
+        dict: Scene with "family", "width", "height", "static" and "data" keys
+    """
+    return build_scene(family, family_t_scores(family, family_scores), graph_title(family, client_info))
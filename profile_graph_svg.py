@@ -0,0 +1,113 @@
+"""
+SVG profile graph backend for MMPI-2 reports.
+
+Graphs are laid out as vector scenes by profile_graph_scene; this backend
+writes a scene directly as SVG markup from string templates, without
+matplotlib. The static part of each family graph (grid, ticks, labels,
+reference lines, scale name table) is serialized once per process; a profile
+only adds the title, the polyline, its points and the T-score labels.
+
+The output is a self-contained <svg> element that can be saved as a file or
+inlined in the HTML and PDF reports.
+"""
+
+from xml.sax.saxutils import escape
+
+from src.reporting.profile_graph_scene import build_family_scene
+
+FONT_FAMILY = 'DejaVu Sans, Helvetica, Arial, sans-serif'
+
+
+def _svg_item(item):
+    """
+    Serialize one drawing item of a scene.
+
+    Args:
+        item (dict): Drawing item
+
+    Returns:
+        str: SVG element
+    """
+    kind = item['type']
+    if kind == 'text':
+        attributes = f'x="{item["x"]}" y="{item["y"]}" font-size="{item["size"]}"'
+        if item['anchor'] != 'start':
+            attributes += f' text-anchor="{item["anchor"]}"'
+        if item['fill'] != '#000000':
+            attributes += f' fill="{item["fill"]}"'
+        if item['bold']:
+            attributes += ' font-weight="bold"'
+        if item['rotation']:
+            attributes += f' transform="rotate(-{item["rotation"]} {item["x"]} {item["y"]})"'
+        return f'<text {attributes}>{escape(item["text"])}</text>'
+    if kind == 'rect':
+        stroke = f' stroke="{item["stroke"]}" stroke-width="{item["stroke_width"]}"' if item['stroke'] else ''
+        return (f'<rect x="{item["x"]}" y="{item["y"]}" width="{item["width"]}" height="{item["height"]}" '
+                f'fill="{item["fill"] or "none"}"{stroke}/>')
+    if kind == 'segments':
+        path = ''.join(f'M{x1} {y1}L{x2} {y2}' for (x1, y1), (x2, y2) in item['segments'])
+        return f'<path d="{path}" stroke="{item["stroke"]}" stroke-width="{item["stroke_width"]}"/>'
+    if kind == 'line':
+        return (f'<line x1="{item["x1"]}" y1="{item["y1"]}" x2="{item["x2"]}" y2="{item["y2"]}" '
+                f'stroke="{item["stroke"]}" stroke-width="{item["stroke_width"]}"/>')
+    if kind == 'polyline':
+        points = ' '.join(f'{x},{y}' for x, y in item['points'])
+        return (f'<polyline points="{points}" fill="none" stroke="{item["stroke"]}" '
+                f'stroke-width="{item["stroke_width"]}"/>')
+    if kind == 'circle':
+        return f'<circle cx="{item["cx"]}" cy="{item["cy"]}" r="{item["r"]}" fill="{item["fill"]}"/>'
+    raise ValueError(f"Unknown drawing item: {kind}")
+
+
+# Serialized static markup built in this process, keyed by family
+_BACKGROUNDS = {}
+
+
+def render_scene_svg(scene):
+    """
+    Serialize a graph scene as SVG.
+
+    Args:
+        scene (dict): Scene built by build_family_scene
+
+    Returns:
+        str: A complete <svg> element
+    """
+    background = _BACKGROUNDS.get(scene['family'])
+    if background is None:
+        width, height = scene['width'], scene['height']
+        background = _BACKGROUNDS[scene['family']] = ''.join(
+            [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}" font-family="{FONT_FAMILY}">']
+            + [_svg_item(item) for item in scene['static']]
+        )
+    return ''.join([background] + [_svg_item(item) for item in scene['data']] + ['</svg>'])
+
+
+def render_family_svg(family, family_scores, client_info):
+    """
+    Render the SVG graph of one scale family.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        family_scores (dict): Scale code -> T-score
+        client_info (dict): Dictionary containing client information
+
+    Returns:
+        str: A complete <svg> element
+    """
+    return render_scene_svg(build_family_scene(family, family_scores, client_info))
+
+
+def render_family_svg_file(family, family_scores, client_info, output_path):
+    """
+    Render the SVG graph of one scale family to a file.
+
+    Args:
+        family (str): Key of GRAPH_FAMILY_SPECS
+        family_scores (dict): Scale code -> T-score
+        client_info (dict): Dictionary containing client information
+        output_path (str): Path of the SVG file to write
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(render_family_svg(family, family_scores, client_info))
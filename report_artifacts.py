@@ -0,0 +1,205 @@
+"""
+Report artifact manifest and precompressed variants.
+
+Once a report has been built its files never change, so everything needed to
+serve them cheaply is computed once at generation time: a content hash for a
+strong ETag, the file size, and gzip/brotli variants of the text formats. The
+results are recorded in a manifest inside the report directory that the web
+process reads instead of re-hashing or re-compressing on every view.
+"""
+
+import os
+import json
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Brotli variants are skipped when the package is not installed
+
+# Name of the manifest written into every report directory
+MANIFEST_FILENAME = 'artifacts.json'
+
+# File types worth compressing; PDFs and PNGs are already compressed
+COMPRESSIBLE_EXTENSIONS = ['.html', '.txt', '.json', '.svg', '.css', '.js']
+
+# Files smaller than this are not worth a compressed variant
+MIN_COMPRESS_SIZE = 1024
+
+# Content-Encoding -> file suffix of the precompressed variant, in preference order
+ENCODING_SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz'
+}
+
+
+def _hash_file(path):
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        path (str): File to hash
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_compressed(path, data, encoding):
+    """
+    Write a compressed variant of a file next to it.
+
+    Args:
+        path (str): Original file path
+        data (bytes): Original file contents
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        int: Size of the compressed variant in bytes
+    """
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=11)
+    else:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+
+    variant_path = path + ENCODING_SUFFIXES[encoding]
+    with open(variant_path, 'wb') as f:
+        f.write(compressed)
+    return len(compressed)
+
+
+def finalize_artifacts(report_dir, skip=None):
+    """
+    Hash, precompress and record every artifact in a report directory.
+
+    Args:
+        report_dir (str): Directory of a fully built report
+        skip (list, optional): File names to leave out of the manifest
+
+    Returns:
+        dict: The manifest, keyed by file name
+    """
+    skip = set(skip or []) | {MANIFEST_FILENAME}
+    variant_suffixes = tuple(ENCODING_SUFFIXES.values())
+    manifest = {}
+
+    for filename in sorted(os.listdir(report_dir)):
+        path = os.path.join(report_dir, filename)
+        if (filename in skip or filename.endswith(variant_suffixes) or filename.endswith('.tmp')
+                or not os.path.isfile(path)):
+            continue
+
+        manifest[filename] = _describe_artifact(path)
+
+    _write_manifest(report_dir, manifest)
+    return manifest
+
+
+def _describe_artifact(path):
+    """
+    Hash and, for text formats, precompress one artifact.
+
+    Args:
+        path (str): Artifact file path
+
+    Returns:
+        dict: Manifest entry with "size", "sha256" and "encodings"
+    """
+    artifact = {
+        'size': os.path.getsize(path),
+        'sha256': _hash_file(path),
+        'encodings': {}
+    }
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in COMPRESSIBLE_EXTENSIONS and artifact['size'] >= MIN_COMPRESS_SIZE:
+        with open(path, 'rb') as f:
+            data = f.read()
+        for encoding in ENCODING_SUFFIXES:
+            if encoding == 'br' and brotli is None:
+                continue
+            size = _write_compressed(path, data, encoding)
+            # Only keep variants that actually save bytes
+            if size < artifact['size']:
+                artifact['encodings'][encoding] = size
+            else:
+                os.remove(path + ENCODING_SUFFIXES[encoding])
+
+    return artifact
+
+
+def _write_manifest(report_dir, manifest):
+    """
+    Atomically replace the manifest of a report.
+
+    Args:
+        report_dir (str): Directory of the report
+        manifest (dict): The manifest, keyed by file name
+    """
+    manifest_path = os.path.join(report_dir, MANIFEST_FILENAME)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def add_artifact(report_dir, filename):
+    """
+    Record an artifact generated after the report was finalized, such as a
+    graph variant rendered on first request.
+
+    Concurrent additions to the same report may lose each other's manifest
+    entry; the file is then simply described again the next time it is added.
+
+    Args:
+        report_dir (str): Directory of a finalized report
+        filename (str): Name of the new file in the report directory
+
+    Returns:
+        dict: The artifact's manifest entry
+    """
+    artifact = _describe_artifact(os.path.join(report_dir, filename))
+    manifest = load_manifest(report_dir)
+    manifest[filename] = artifact
+    _write_manifest(report_dir, manifest)
+    return artifact
+
+
+def load_manifest(report_dir):
+    """
+    Load the artifact manifest of a report.
+
+    Args:
+        report_dir (str): Directory of the report
+
+    Returns:
+        dict: The manifest, or an empty dict for reports built without one
+    """
+    try:
+        with open(os.path.join(report_dir, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def negotiate_encoding(artifact, accept_encodings):
+    """
+    Pick the best precompressed variant the client accepts.
+
+    Args:
+        artifact (dict): Manifest entry for the requested file
+        accept_encodings: The request's parsed Accept-Encoding header
+
+    Returns:
+        str or None: "br", "gzip", or None to serve the original file
+    """
+    for encoding in ENCODING_SUFFIXES:
+        if encoding in artifact.get('encodings', {}) and accept_encodings[encoding] > 0:
+            return encoding
+    return None
@@ -0,0 +1,232 @@
+"""
+Content-addressed report cache for the MMPI-2 web application.
+
+Reports are keyed by a canonical hash of the score families and the client
+fields that appear in the report. Submitting a profile that has already been
+generated (sample data, re-clicks, re-opened cases) returns the existing report
+instead of rebuilding it.
+
+The cache index lives on disk next to the reports so it is shared by every
+gunicorn worker. Each entry is a small file named after the profile hash that
+holds the id of the report built for it; its modification time is refreshed on
+every hit and drives least-recently-used eviction. Eviction walks the whole
+index, so it runs off the request path, after each pass of the report
+retention sweeper.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+
+from src.web.report_index import report_path
+from src.web.report_jobs import read_job_status, JOB_QUEUED, JOB_RUNNING, JOB_FAILED
+
+# Client fields that change the content of a generated report
+REPORT_CLIENT_FIELDS = ['name', 'age', 'sex', 'date', 'referral_source', 'reason_for_referral']
+
+# Score families that feed a report
+REPORT_SCORE_FAMILIES = [
+    'validity_scales', 'clinical_scales', 'harris_lingoes_subscales', 'content_scales',
+    'rc_scales', 'psy5_scales', 'supplementary_scales'
+]
+
+# Sub-directory of the report folder that holds the cache index
+CACHE_INDEX_DIRNAME = '_cache'
+
+
+def profile_key(scores, client_info, graph_format='png'):
+    """
+    Compute the canonical hash of a score profile.
+
+    Families are serialized with sorted keys and no whitespace so that the same
+    profile always produces the same key regardless of dict ordering.
+
+    Args:
+        scores (dict): Dictionary containing all scale scores
+        client_info (dict): Dictionary containing client information
+        graph_format (str): Profile graph format the report is built with
+
+    Returns:
+        str: Hex SHA-256 digest identifying the profile
+    """
+    payload = {
+        'scores': {family: scores.get(family, {}) for family in REPORT_SCORE_FAMILIES},
+        'client_info': {field: client_info.get(field, '') for field in REPORT_CLIENT_FIELDS},
+        'graph_format': graph_format
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _directory_size(path):
+    """
+    Get the total size of the files directly inside a report directory.
+
+    Args:
+        path (str): Directory to measure
+
+    Returns:
+        int: Total size in bytes
+    """
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return total
+
+
+class ReportCache:
+    """
+    Maps canonical profile hashes to previously generated reports.
+    """
+
+    def __init__(self, report_folder, max_bytes=0, max_age=0, index=None):
+        """
+        Initialize the report cache.
+
+        Args:
+            report_folder (str): Root directory that holds report directories
+            max_bytes (int): Total report size to keep; 0 disables the size limit
+            max_age (int): Seconds since last use before a report is evicted; 0 disables
+            index (ReportIndex, optional): Report index to drop evicted reports from
+        """
+        self.report_folder = report_folder
+        self.index_dir = os.path.join(report_folder, CACHE_INDEX_DIRNAME)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.index = index
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        """
+        Get the path of the index entry for a profile hash.
+
+        Args:
+            key (str): Profile hash
+
+        Returns:
+            str: Path to the index entry
+        """
+        return os.path.join(self.index_dir, key)
+
+    def lookup(self, key):
+        """
+        Find the report previously generated for a profile.
+
+        Reports that are still being built count as hits, so repeated clicks
+        attach to the running job. Failed or deleted reports count as misses.
+
+        Args:
+            key (str): Profile hash
+
+        Returns:
+            str or None: The cached report id, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path) as f:
+                report_id = f.read().strip()
+        except OSError:
+            return None
+
+        report_dir = report_path(self.report_folder, report_id)
+        job_status = read_job_status(report_dir)
+        if not os.path.isdir(report_dir) or (job_status and job_status['state'] == JOB_FAILED):
+            self._remove_entry(entry_path)
+            return None
+
+        # Refresh the entry so eviction treats it as recently used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return report_id
+
+    def store(self, key, report_id):
+        """
+        Record the report generated for a profile.
+
+        Args:
+            key (str): Profile hash
+            report_id (str): Id of the report built for the profile
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(report_id)
+        os.replace(tmp_path, entry_path)
+
+    def _remove_entry(self, entry_path):
+        """
+        Remove an index entry, ignoring entries that are already gone.
+
+        Args:
+            entry_path (str): Path to the index entry
+        """
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+    def evict(self):
+        """
+        Apply the age and size limits to the cached reports.
+
+        Reports unused for longer than max_age are removed first, then the least
+        recently used reports are removed until the total size is within max_bytes.
+        Walks the whole index; called by the report retention sweeper.
+
+        Returns:
+            dict: Number of reports and bytes removed
+        """
+        removed = {'reports': 0, 'bytes': 0}
+        if not self.max_bytes and not self.max_age:
+            return removed
+
+        # Collect (last used, entry path, report id, report dir, size) for every cached report
+        entries = []
+        with os.scandir(self.index_dir) as index:
+            for entry in index:
+                if entry.name.endswith('.tmp') or not entry.is_file():
+                    continue
+                try:
+                    last_used = entry.stat().st_mtime
+                    with open(entry.path) as f:
+                        report_id = f.read().strip()
+                except OSError:
+                    continue
+                report_dir = report_path(self.report_folder, report_id)
+                entries.append((last_used, entry.path, report_id, report_dir, _directory_size(report_dir)))
+
+        entries.sort()
+        total_bytes = sum(entry[4] for entry in entries)
+        now = time.time()
+
+        for last_used, entry_path, report_id, report_dir, size in entries:
+            expired = self.max_age and now - last_used > self.max_age
+            over_quota = self.max_bytes and total_bytes > self.max_bytes
+            if not expired and not over_quota:
+                # Entries are oldest first, so nothing newer can be expired either
+                break
+
+            # Never pull a report out from under a job that is still building it
+            job_status = read_job_status(report_dir)
+            if job_status and job_status['state'] in (JOB_QUEUED, JOB_RUNNING):
+                continue
+
+            self._remove_entry(entry_path)
+            shutil.rmtree(report_dir, ignore_errors=True)
+            if self.index is not None:
+                self.index.remove(report_id)
+            total_bytes -= size
+            removed['reports'] += 1
+            removed['bytes'] += size
+
+        return removed
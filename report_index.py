@@ -0,0 +1,319 @@
+"""
+Sharded report layout and report metadata index.
+
+Report directories are fanned out by the first characters of their id
+(reports/ab/cd/abcd1234-...), so no directory holds more than a few dozen
+entries even with millions of reports. A SQLite index records the state of
+every report and the artifacts it contains, with their sizes and hashes, so the
+report viewer and file server answer from a single indexed lookup instead of
+probing the filesystem, and only serve files the report is known to contain.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from src.web.report_artifacts import MANIFEST_FILENAME, finalize_artifacts, load_manifest
+
+# Hex characters of the report id used for each level of fan-out directories
+SHARD_WIDTH = 2
+SHARD_LEVELS = 2
+
+# Default name of the index database inside the report folder
+INDEX_FILENAME = '_index.sqlite3'
+
+
+def report_path(report_folder, report_id):
+    """
+    Get the sharded directory of a report.
+
+    Args:
+        report_folder (str): Root directory that holds report directories
+        report_id (str): Report id (a UUID string)
+
+    Returns:
+        str: Path to the report directory
+    """
+    shards = [report_id[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH] for level in range(SHARD_LEVELS)]
+    return os.path.join(report_folder, *shards, report_id)
+
+
+def _is_shard(entry):
+    """
+    Check whether a directory entry is a fan-out directory.
+
+    Args:
+        entry (os.DirEntry): Entry to check
+
+    Returns:
+        bool: True for a directory named with SHARD_WIDTH hex characters
+    """
+    name = entry.name
+    return (len(name) == SHARD_WIDTH and all(c in '0123456789abcdef' for c in name)
+            and entry.is_dir(follow_symlinks=False))
+
+
+def _iter_shard(path, level):
+    """
+    Yield the report directories below a fan-out directory.
+
+    Args:
+        path (str): Directory to read
+        level (int): Number of fan-out levels still to descend
+
+    Yields:
+        os.DirEntry: Report directories
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if level and _is_shard(entry):
+                yield from _iter_shard(entry.path, level - 1)
+            elif not level and entry.is_dir(follow_symlinks=False):
+                yield entry
+
+
+def iter_report_dirs(report_folder):
+    """
+    Lazily yield every report directory in the sharded layout.
+
+    Only one directory per fan-out level is open at a time, so the caller can
+    consume the generator in small batches across many calls.
+
+    Args:
+        report_folder (str): Root directory that holds report directories
+
+    Yields:
+        os.DirEntry: Report directories
+    """
+    return _iter_shard(report_folder, SHARD_LEVELS)
+
+
+class ReportIndex:
+    """
+    SQLite index of reports and their artifacts, shared between worker processes.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the report index.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports "
+                "(report_id TEXT PRIMARY KEY, state TEXT NOT NULL, respondent TEXT, "
+                "submitted_at REAL, updated_at REAL NOT NULL, total_bytes INTEGER NOT NULL DEFAULT 0, "
+                "error TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts "
+                "(report_id TEXT NOT NULL, filename TEXT NOT NULL, size INTEGER NOT NULL, "
+                "sha256 TEXT NOT NULL, encodings TEXT NOT NULL, "
+                "PRIMARY KEY (report_id, filename)) WITHOUT ROWID"
+            )
+
+    def _connect(self):
+        """
+        Get the connection for the current thread and process.
+
+        Connections are not shared across fork, so a new one is opened whenever
+        the process id changes.
+
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record_job(self, report_id, state, submitted_at=None, respondent=None):
+        """
+        Record a report whose build has been queued.
+
+        Args:
+            report_id (str): Report id
+            state (str): Job state
+            submitted_at (float, optional): Submission time
+            respondent (str, optional): Respondent key of the report
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reports (report_id, state, respondent, submitted_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (report_id, state, respondent, submitted_at, time.time())
+            )
+
+    def record_report(self, report_id, status, manifest):
+        """
+        Record the final state of a report and the artifacts it contains.
+
+        Args:
+            report_id (str): Report id
+            status (dict): The job status record of the report
+            manifest (dict): The artifact manifest of the report
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reports "
+                "(report_id, state, respondent, submitted_at, updated_at, total_bytes, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (report_id, status['state'], status.get('respondent'), status.get('submitted_at'),
+                 status.get('updated_at', time.time()),
+                 sum(artifact['size'] + sum(artifact['encodings'].values()) for artifact in manifest.values()),
+                 status.get('error'))
+            )
+            conn.execute("DELETE FROM artifacts WHERE report_id = ?", (report_id,))
+            conn.executemany(
+                "INSERT INTO artifacts (report_id, filename, size, sha256, encodings) VALUES (?, ?, ?, ?, ?)",
+                [(report_id, filename, artifact['size'], artifact['sha256'], json.dumps(artifact['encodings']))
+                 for filename, artifact in manifest.items()]
+            )
+
+    def record_artifact(self, report_id, filename, artifact):
+        """
+        Add one artifact to a report that is already indexed. An artifact the
+        report already has is left as it is.
+
+        Args:
+            report_id (str): Report id
+            filename (str): Artifact file name
+            artifact (dict): The artifact's manifest entry
+        """
+        with self._connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO artifacts (report_id, filename, size, sha256, encodings) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (report_id, filename, artifact['size'], artifact['sha256'], json.dumps(artifact['encodings']))
+            ).rowcount
+            if not inserted:
+                return
+            conn.execute(
+                "UPDATE reports SET total_bytes = total_bytes + ? WHERE report_id = ?",
+                (artifact['size'] + sum(artifact['encodings'].values()), report_id)
+            )
+
+    def get_report(self, report_id):
+        """
+        Get a report and its artifacts in one query.
+
+        Args:
+            report_id (str): Report id
+
+        Returns:
+            dict or None: The report record with an "artifacts" dict keyed by file
+                name, or None if the report is not indexed
+        """
+        rows = self._connect().execute(
+            "SELECT r.state, r.respondent, r.submitted_at, r.updated_at, r.total_bytes, r.error, "
+            "a.filename, a.size, a.sha256, a.encodings "
+            "FROM reports r LEFT JOIN artifacts a ON a.report_id = r.report_id "
+            "WHERE r.report_id = ?",
+            (report_id,)
+        ).fetchall()
+        if not rows:
+            return None
+
+        state, respondent, submitted_at, updated_at, total_bytes, error = rows[0][:6]
+        report = {
+            'report_id': report_id,
+            'state': state,
+            'respondent': respondent,
+            'submitted_at': submitted_at,
+            'updated_at': updated_at,
+            'total_bytes': total_bytes,
+            'artifacts': {}
+        }
+        if error is not None:
+            report['error'] = error
+        for filename, size, sha256, encodings in (row[6:] for row in rows):
+            if filename is not None:
+                report['artifacts'][filename] = {'size': size, 'sha256': sha256, 'encodings': json.loads(encodings)}
+        return report
+
+    def get_artifact(self, report_id, filename):
+        """
+        Get one artifact of a report.
+
+        Args:
+            report_id (str): Report id
+            filename (str): Artifact file name
+
+        Returns:
+            dict or None: {"size", "sha256", "encodings"}, or None if the report
+                has no such artifact
+        """
+        row = self._connect().execute(
+            "SELECT size, sha256, encodings FROM artifacts WHERE report_id = ? AND filename = ?",
+            (report_id, filename)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'size': row[0], 'sha256': row[1], 'encodings': json.loads(row[2])}
+
+    def remove(self, report_id):
+        """
+        Remove a report and its artifacts from the index.
+
+        Args:
+            report_id (str): Report id
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM artifacts WHERE report_id = ?", (report_id,))
+            conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+
+
+def migrate_flat_layout(report_folder, index):
+    """
+    Move reports from the old flat layout (reports/<id>) into fan-out
+    directories and index them.
+
+    Reports built before artifact manifests existed get one now. Safe to run
+    from several processes at once: a report another process has already moved
+    is skipped.
+
+    Args:
+        report_folder (str): Root directory that holds report directories
+        index (ReportIndex): Index to record migrated reports in
+
+    Returns:
+        int: Number of reports migrated
+    """
+    from src.web.report_jobs import is_valid_job_id, read_job_status, JOB_STATUS_FILENAME, JOB_FINISHED
+
+    migrated = 0
+    with os.scandir(report_folder) as entries:
+        for entry in entries:
+            if not is_valid_job_id(entry.name) or not entry.is_dir(follow_symlinks=False):
+                continue
+
+            report_dir = report_path(report_folder, entry.name)
+            os.makedirs(os.path.dirname(report_dir), exist_ok=True)
+            try:
+                os.rename(entry.path, report_dir)
+            except OSError:
+                continue
+
+            status = read_job_status(report_dir) or {'state': JOB_FINISHED}
+            if os.path.exists(os.path.join(report_dir, MANIFEST_FILENAME)):
+                manifest = load_manifest(report_dir)
+            else:
+                manifest = finalize_artifacts(report_dir, skip=[JOB_STATUS_FILENAME])
+            index.record_report(entry.name, status, manifest)
+            migrated += 1
+    return migrated
@@ -0,0 +1,622 @@
+"""
+Background report job queue for the MMPI-2 web application.
+
+This module moves the expensive part of report generation (narrative assembly,
+matplotlib rendering and PDF output) off the request thread and into a pool of
+separate worker processes. The web route only submits a job and returns its id,
+so request latency stays flat while report throughput scales with the number of
+report workers rather than the number of gunicorn workers.
+
+Job state is written to a small JSON file inside each report directory. Any
+gunicorn worker can therefore answer a status poll for a job submitted by a
+different worker.
+"""
+
+import os
+import json
+import time
+import uuid
+import math
+import shutil
+import hashlib
+import threading
+import traceback
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from src.web.report_artifacts import finalize_artifacts, load_manifest
+from src.web.report_index import report_path
+
+# Name of the status file written into every report directory
+JOB_STATUS_FILENAME = 'job_status.json'
+
+# Build time assumed for wait estimates until a job has completed
+DEFAULT_BUILD_SECONDS = 10.0
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_FINISHED = 'finished'
+JOB_FAILED = 'failed'
+
+
+def is_valid_job_id(job_id):
+    """
+    Check that a job id is a well-formed UUID.
+
+    Job ids are used as directory names, so anything else is rejected before it
+    reaches the filesystem.
+
+    Args:
+        job_id (str): The job id to check
+
+    Returns:
+        bool: True if the job id is a canonical UUID string
+    """
+    try:
+        return str(uuid.UUID(job_id)) == job_id
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+def respondent_key(client_info):
+    """
+    Derive a stable, non-identifying key for the respondent of a report.
+
+    Args:
+        client_info (dict): Dictionary containing client information
+
+    Returns:
+        str: Short hex digest of the normalized name, sex and age
+    """
+    identity = '|'.join(str(client_info.get(field, '')).strip().lower() for field in ('name', 'sex', 'age'))
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]
+
+
+def write_job_status(report_dir, state, **fields):
+    """
+    Atomically write the status file for a report job.
+
+    Fields from the previous status (e.g. submitted_at, respondent) are kept
+    unless overwritten.
+
+    Args:
+        report_dir (str): Directory of the report the job is building
+        state (str): One of the JOB_* states
+        **fields: Additional fields to record (e.g. error, graph_paths)
+
+    Returns:
+        dict: The status record that was written
+    """
+    status = read_job_status(report_dir) or {}
+    status.update({'state': state, 'updated_at': time.time()})
+    status.update(fields)
+
+    status_path = os.path.join(report_dir, JOB_STATUS_FILENAME)
+    tmp_path = f"{status_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, status_path)
+
+    return status
+
+
+def read_job_status(report_dir):
+    """
+    Read the status file for a report job.
+
+    Args:
+        report_dir (str): Directory of the report
+
+    Returns:
+        dict or None: The status record, or None if no job was recorded
+    """
+    status_path = os.path.join(report_dir, JOB_STATUS_FILENAME)
+    try:
+        with open(status_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def flatten_scores(scores):
+    """
+    Merge the per-family score dictionaries into a single scale -> T-score map.
+
+    Args:
+        scores (dict): Dictionary of score families as built by score_entry
+
+    Returns:
+        dict: All scale scores keyed by scale code
+    """
+    scale_scores = {}
+    for family_scores in scores.values():
+        if isinstance(family_scores, dict):
+            scale_scores.update(family_scores)
+    return scale_scores
+
+
+def build_report(report_dir, scores, client_info, include_impressions=False, graph_format='png',
+                 graph_workers=0, graph_cache_dir=None, graph_cache_max_bytes=0):
+    """
+    Build a complete report. Runs inside a report worker process.
+
+    Args:
+        report_dir (str): Directory to write report artifacts into
+        scores (dict): Dictionary containing all scale scores
+        client_info (dict): Dictionary containing client information
+        include_impressions (bool): Also record the DSM-5-TR diagnostic
+            impressions in the job status
+        graph_format (str): Profile graph format, "png", "svg" or "client"
+        graph_workers (int): Render the family graphs concurrently in a
+            persistent pool of this many processes; 0 renders them in turn
+        graph_cache_dir (str, optional): Directory of the rendered graph
+            cache; graphs found there are not rendered again
+        graph_cache_max_bytes (int): Disk space of the graph cache; 0 disables
+            the size limit
+
+    Returns:
+        dict: The final status record for the job
+    """
+    started_at = time.time()
+    write_job_status(report_dir, JOB_RUNNING, started_at=started_at)
+
+    try:
+        # Imported here so only the worker processes load the report generators
+        from src.reporting.comprehensive_report_generator import ComprehensiveReportGenerator
+        from src.reporting.profile_graph_generator import ProfileGraphGenerator
+
+        # Generate report
+        report_generator = ComprehensiveReportGenerator(output_dir=report_dir)
+        report_generator.generate_report(scores, client_info)
+
+        # Generate profile graphs, reusing cached renders of unchanged families
+        graph_cache = None
+        if graph_cache_dir:
+            from src.reporting.profile_graph_cache import get_graph_cache
+            graph_cache = get_graph_cache(graph_cache_dir, max_bytes=graph_cache_max_bytes)
+        graph_generator = ProfileGraphGenerator(output_dir=report_dir, graph_format=graph_format,
+                                                graph_workers=graph_workers, graph_cache=graph_cache)
+        graph_paths = graph_generator.generate_all_graphs(scores, client_info)
+
+        # Hash and precompress the finished artifacts for the file server
+        finalize_artifacts(report_dir, skip=[JOB_STATUS_FILENAME])
+
+        extra = {}
+        if include_impressions:
+            from src.interpretation.dsm5tr_decision_trees import get_dsm5tr_diagnostic_impressions
+            extra['diagnostic_impressions'] = get_dsm5tr_diagnostic_impressions(
+                {'scale_scores': flatten_scores(scores)}
+            )
+    except Exception as e:
+        return write_job_status(
+            report_dir, JOB_FAILED,
+            started_at=started_at,
+            error=str(e),
+            traceback=traceback.format_exc()
+        )
+
+    # Only record file names; the web process resolves them against its own report folder
+    graph_files = {name: os.path.basename(path) for name, path in graph_paths.items() if path}
+
+    return write_job_status(
+        report_dir, JOB_FINISHED,
+        started_at=started_at,
+        finished_at=time.time(),
+        graph_paths=graph_files,
+        graph_format=graph_format,
+        graph_cache=graph_generator.cache_stats,
+        **extra
+    )
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a report job is refused because the queue is at capacity.
+    """
+
+    def __init__(self, retry_after):
+        """
+        Initialize the error.
+
+        Args:
+            retry_after (int): Suggested number of seconds before retrying
+        """
+        super().__init__(f"Report queue is full; retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class ReportJobQueue:
+    """
+    Submits report builds to a pool of worker processes.
+
+    Admission control is applied per process: at most max_workers jobs run and
+    at most max_queue_depth more wait; further submissions raise QueueFullError
+    so the caller can answer quickly instead of piling up builds.
+    """
+
+    def __init__(self, report_folder, max_workers=2, start_method='spawn', initializer=None,
+                 max_queue_depth=8, index=None, graph_workers=0, graph_cache_dir=None,
+                 graph_cache_max_bytes=0):
+        """
+        Initialize the report job queue.
+
+        The process pool is created lazily on first submit so that it is owned by
+        the gunicorn worker that uses it rather than by the master process.
+
+        Args:
+            report_folder (str): Root directory that holds report directories
+            max_workers (int): Number of report worker processes
+            start_method (str): multiprocessing start method for the workers
+            initializer (callable, optional): Run once in each worker process
+                when it starts, e.g. to warm up matplotlib
+            max_queue_depth (int): Jobs allowed to wait for a free worker
+            index (ReportIndex, optional): Index that records every report and
+                its artifacts
+            graph_workers (int): Graph render processes per report worker; with
+                0 each report worker renders its family graphs in turn
+            graph_cache_dir (str, optional): Directory of the rendered graph
+                cache shared by the report workers
+            graph_cache_max_bytes (int): Disk space of the graph cache
+        """
+        self.report_folder = report_folder
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self.initializer = initializer
+        self.max_queue_depth = max_queue_depth
+        self.index = index
+        self.graph_workers = graph_workers
+        self.graph_cache_dir = graph_cache_dir
+        self.graph_cache_max_bytes = graph_cache_max_bytes
+        self._executor = None
+        self._executor_pid = None
+
+        # Jobs submitted by this process that have not finished, oldest first
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'admitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'build_seconds_total': 0.0,
+            'graph_cache_hits': 0,
+            'graph_cache_misses': 0
+        }
+
+    def _get_executor(self):
+        """
+        Return the process pool, creating it if needed in the current process.
+
+        Returns:
+            ProcessPoolExecutor: The worker pool
+        """
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=self.initializer
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """
+        Drop a broken process pool so the next submit creates a new one.
+
+        Args:
+            executor (ProcessPoolExecutor): The pool that refused a submission;
+                ignored if another thread has already replaced it
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def _submit_build(self, *args, **kwargs):
+        """
+        Hand a build to the process pool, rebuilding the pool once if a worker
+        process died and left it broken.
+
+        Args:
+            *args: Positional arguments for build_report
+            **kwargs: Keyword arguments for build_report
+
+        Returns:
+            Future: The future for the build
+
+        Raises:
+            BrokenProcessPool: If the rebuilt pool is broken as well
+        """
+        executor = self._get_executor()
+        try:
+            return executor.submit(build_report, *args, **kwargs)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+        return self._get_executor().submit(build_report, *args, **kwargs)
+
+    def report_dir(self, job_id):
+        """
+        Get the report directory for a job.
+
+        Args:
+            job_id (str): The job id (also the report id)
+
+        Returns:
+            str: Path to the report directory
+        """
+        return report_path(self.report_folder, job_id)
+
+    def _start_job(self, scores, client_info, capacity=None, **build_options):
+        """
+        Create the report directory for a job and hand the build to the pool.
+
+        Args:
+            scores (dict): Dictionary containing all scale scores
+            client_info (dict): Dictionary containing client information
+            capacity (int, optional): Refuse the job if this many jobs are
+                already pending; None admits it unconditionally
+            **build_options: Extra keyword arguments for build_report
+
+        Returns:
+            tuple: (job id, future)
+
+        Raises:
+            QueueFullError: If capacity jobs are already pending
+            BrokenProcessPool: If the pool cannot take the build; the job is
+                removed again
+        """
+        job_id = str(uuid.uuid4())
+        submitted_at = time.time()
+
+        # Reserve the slot under the same lock as the capacity check, so
+        # concurrent requests cannot all pass the check before any is counted
+        with self._lock:
+            if capacity is not None and len(self._pending) >= capacity:
+                self._stats['rejected'] += 1
+                raise QueueFullError(self._estimate_wait(self.max_queue_depth + 1))
+            self._pending[job_id] = submitted_at
+
+        build_options.setdefault('graph_workers', self.graph_workers)
+        build_options.setdefault('graph_cache_dir', self.graph_cache_dir)
+        build_options.setdefault('graph_cache_max_bytes', self.graph_cache_max_bytes)
+        report_dir = self.report_dir(job_id)
+        respondent = respondent_key(client_info)
+        try:
+            # The status file is written before the build is handed over, since
+            # the worker overwrites it once the build starts
+            os.makedirs(report_dir, exist_ok=True)
+            write_job_status(report_dir, JOB_QUEUED, submitted_at=submitted_at, respondent=respondent)
+            future = self._submit_build(report_dir, scores, client_info, **build_options)
+        except Exception:
+            # Release the slot and leave no queued job behind that would never finish
+            with self._lock:
+                self._pending.pop(job_id, None)
+            shutil.rmtree(report_dir, ignore_errors=True)
+            raise
+
+        if self.index is not None:
+            self.index.record_job(job_id, JOB_QUEUED, submitted_at=submitted_at, respondent=respondent)
+        with self._lock:
+            self._stats['admitted'] += 1
+        future.add_done_callback(lambda f: self._job_done(job_id, f))
+        return job_id, future
+
+    def submit(self, scores, client_info, graph_format='png'):
+        """
+        Submit a report build and return immediately.
+
+        Args:
+            scores (dict): Dictionary containing all scale scores
+            client_info (dict): Dictionary containing client information
+            graph_format (str): Profile graph format, "png", "svg" or "client"
+
+        Returns:
+            str: The job id, which is also the id of the report being built
+
+        Raises:
+            QueueFullError: If max_workers jobs are running and max_queue_depth are waiting
+            BrokenProcessPool: If the report workers keep dying, even after the
+                pool is rebuilt
+        """
+        job_id, _ = self._start_job(scores, client_info, capacity=self.max_workers + self.max_queue_depth,
+                                    graph_format=graph_format)
+        return job_id
+
+    def _job_done(self, job_id, future):
+        """
+        Update the queue statistics when a job finishes, and mark the job as
+        failed if its worker process died before reporting back.
+
+        Args:
+            job_id (str): The finished job
+            future (Future): The completed future for the job
+        """
+        status = None
+        if future.cancelled():
+            status = write_job_status(self.report_dir(job_id), JOB_FAILED, error='Report job was cancelled')
+        elif future.exception() is not None:
+            status = write_job_status(self.report_dir(job_id), JOB_FAILED, error=str(future.exception()))
+        else:
+            status = future.result()
+
+        if self.index is not None:
+            self.index.record_report(job_id, status, load_manifest(self.report_dir(job_id)))
+
+        with self._lock:
+            submitted_at = self._pending.pop(job_id, None)
+            if status['state'] == JOB_FAILED:
+                self._stats['failed'] += 1
+                return
+            self._stats['completed'] += 1
+            if submitted_at is not None and 'started_at' in status:
+                wait_seconds = max(0.0, status['started_at'] - submitted_at)
+                self._stats['wait_seconds_total'] += wait_seconds
+                self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], wait_seconds)
+            if 'finished_at' in status:
+                self._stats['build_seconds_total'] += status['finished_at'] - status['started_at']
+            graph_cache = status.get('graph_cache') or {}
+            self._stats['graph_cache_hits'] += graph_cache.get('hits', 0)
+            self._stats['graph_cache_misses'] += graph_cache.get('misses', 0)
+
+    def _estimate_wait(self, position):
+        """
+        Estimate how long a job at a given queue position will wait.
+
+        Must be called with the lock held.
+
+        Args:
+            position (int): 1-based position among the waiting jobs
+
+        Returns:
+            int: Estimated wait in whole seconds (at least 1)
+        """
+        completed = self._stats['completed']
+        average_build = (self._stats['build_seconds_total'] / completed) if completed else DEFAULT_BUILD_SECONDS
+        return max(1, math.ceil(math.ceil(position / self.max_workers) * average_build))
+
+    def queue_position(self, job_id):
+        """
+        Get the position of a job submitted by this process.
+
+        Args:
+            job_id (str): The job id
+
+        Returns:
+            dict or None: {"position", "estimated_wait_seconds"} for a waiting job;
+                position 0 means the job has a worker. None if the job is not
+                pending in this process.
+        """
+        with self._lock:
+            if job_id not in self._pending:
+                return None
+            index = list(self._pending).index(job_id)
+            position = max(0, index - self.max_workers + 1)
+            return {
+                'position': position,
+                'estimated_wait_seconds': self._estimate_wait(position) if position else 0
+            }
+
+    def metrics(self):
+        """
+        Get queue depth, wait time and rejection counts for this process.
+
+        Returns:
+            dict: Queue metrics
+        """
+        with self._lock:
+            pending = len(self._pending)
+            completed = self._stats['completed']
+            return {
+                'pid': os.getpid(),
+                'max_workers': self.max_workers,
+                'max_queue_depth': self.max_queue_depth,
+                'running': min(pending, self.max_workers),
+                'queued': max(0, pending - self.max_workers),
+                'admitted_total': self._stats['admitted'],
+                'rejected_total': self._stats['rejected'],
+                'completed_total': completed,
+                'failed_total': self._stats['failed'],
+                'wait_seconds_avg': round(self._stats['wait_seconds_total'] / completed, 3) if completed else None,
+                'wait_seconds_max': round(self._stats['wait_seconds_max'], 3),
+                'build_seconds_avg': round(self._stats['build_seconds_total'] / completed, 3) if completed else None,
+                'graph_cache_hits_total': self._stats['graph_cache_hits'],
+                'graph_cache_misses_total': self._stats['graph_cache_misses']
+            }
+
+    def run_batch(self, profiles, max_in_flight=None, graph_format='png'):
+        """
+        Build reports for many profiles and yield each result as it finishes.
+
+        Only max_in_flight profiles are submitted at a time and profiles are pulled
+        from the iterable lazily, so memory stays bounded for arbitrarily long
+        batches. Results are yielded in completion order, not input order.
+
+        Args:
+            profiles (iterable): (index, scores, client_info) tuples
+            max_in_flight (int, optional): Maximum builds queued or running at
+                once; defaults to twice the number of workers
+            graph_format (str): Profile graph format, "png", "svg" or "client"
+
+        Yields:
+            tuple: (index, job_id, status record including diagnostic impressions)
+        """
+        max_in_flight = max_in_flight or self.max_workers * 2
+        profiles = iter(profiles)
+        pending = {}
+
+        while True:
+            # Top up the pool from the input
+            while len(pending) < max_in_flight:
+                try:
+                    index, scores, client_info = next(profiles)
+                except StopIteration:
+                    break
+                # Batch jobs bound their own window, so they are not refused,
+                # but they still count toward the queue depth seen by submit()
+                job_id, future = self._start_job(scores, client_info, include_impressions=True,
+                                                 graph_format=graph_format)
+                pending[future] = (index, job_id)
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, job_id = pending.pop(future)
+                if future.exception() is not None:
+                    status = {'state': JOB_FAILED, 'error': str(future.exception())}
+                else:
+                    status = future.result()
+                yield index, job_id, status
+
+    def status(self, job_id):
+        """
+        Get the status of a job.
+
+        Args:
+            job_id (str): The job id
+
+        Returns:
+            dict or None: The status record, or None if the job is unknown
+        """
+        if not is_valid_job_id(job_id):
+            return None
+        return read_job_status(self.report_dir(job_id))
+
+    def index_report(self, job_id):
+        """
+        Record the current status and artifacts of a report in the index.
+
+        Completion is normally indexed by the process that submitted the job;
+        this repairs the index for jobs whose submitting process went away.
+
+        Args:
+            job_id (str): The job id
+
+        Returns:
+            dict or None: The indexed report record, or None if the job is unknown
+        """
+        status = self.status(job_id)
+        if status is None:
+            return None
+        self.index.record_report(job_id, status, load_manifest(self.report_dir(job_id)))
+        return self.index.get_report(job_id)
+
+    def shutdown(self, wait=True):
+        """
+        Shut down the worker pool owned by this process.
+
+        Args:
+            wait (bool): Whether to wait for running jobs to finish
+        """
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=wait)
+        self._executor = None
+        self._executor_pid = None
@@ -0,0 +1,322 @@
+"""
+Report retention for the MMPI-2 web application.
+
+Every generation leaves a report directory in REPORT_FOLDER and, without a
+retention policy, the folder grows until directory lookups slow down. The
+ReportRetentionSweeper removes reports that are older than a maximum age,
+keeps only the most recent reports of each respondent, and trims the oldest
+reports when the folder exceeds a total size.
+
+Scanning is incremental: each step reads a bounded batch of directory entries
+from a cursor that survives between steps, so a sweep never walks the whole
+tree in one go. Age limits are applied as entries are scanned; the size and
+per-respondent limits are applied from the catalogue built once a full pass
+has completed. After each pass the sweeper also evicts from the report cache,
+keeping that full walk of the cache index off the request path. Only one
+process per report folder sweeps at a time.
+"""
+
+import os
+import time
+import fcntl
+import shutil
+import threading
+
+from src.web.report_index import report_path, iter_report_dirs
+from src.web.report_jobs import is_valid_job_id, read_job_status, JOB_QUEUED, JOB_RUNNING
+
+# Lock file that elects the sweeping process; not a valid report id, so never swept
+RETENTION_LOCK_FILENAME = '.retention.lock'
+
+
+def _measure_directory(path):
+    """
+    Count the files directly inside a report directory and their total size.
+
+    Args:
+        path (str): Directory to measure
+
+    Returns:
+        tuple: (number of files, total size in bytes)
+    """
+    files = 0
+    size = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    files += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return files, size
+
+
+class ReportRetentionSweeper:
+    """
+    Applies age, size and per-respondent history limits to REPORT_FOLDER.
+    """
+
+    def __init__(self, report_folder, max_age=0, max_bytes=0, max_reports_per_respondent=0,
+                 batch_size=500, batch_interval=1.0, pass_interval=300, index=None, report_cache=None):
+        """
+        Initialize the retention sweeper.
+
+        Args:
+            report_folder (str): Root directory that holds report directories
+            max_age (int): Seconds since submission before a report is removed; 0 disables
+            max_bytes (int): Total report size to keep; 0 disables the size limit
+            max_reports_per_respondent (int): Most recent reports kept per respondent; 0 disables
+            batch_size (int): Directory entries read per sweep step
+            batch_interval (float): Seconds to sleep between steps of a pass
+            pass_interval (int): Seconds to sleep after a full pass
+            index (ReportIndex, optional): Report index to drop removed reports from
+            report_cache (ReportCache, optional): Report cache to evict from after each pass
+        """
+        self.report_folder = report_folder
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.max_reports_per_respondent = max_reports_per_respondent
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.pass_interval = pass_interval
+        self.index = index
+        self.report_cache = report_cache
+
+        self._cursor = None
+        self._pass_started_at = None
+        # report id -> (submitted at, size in bytes, files, respondent key)
+        self._catalogue = {}
+        self._pass_freed = {'reports': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._stats = {
+            'passes': 0,
+            'scanned_total': 0,
+            'removed_reports_total': 0,
+            'freed_files_total': 0,
+            'freed_bytes_total': 0,
+            'last_pass_seconds': None,
+            'last_pass_reports': None,
+            'last_pass_bytes': None
+        }
+
+    def _remove_report(self, report_id, files, size, freed):
+        """
+        Delete a report directory and account for it.
+
+        Args:
+            report_id (str): Id of the report to delete
+            files (int): Number of files in the report
+            size (int): Size of the report in bytes
+            freed (dict): Per-step counters to update
+        """
+        shutil.rmtree(report_path(self.report_folder, report_id), ignore_errors=True)
+        if self.index is not None:
+            self.index.remove(report_id)
+        freed['reports'] += 1
+        freed['files'] += files
+        freed['bytes'] += size
+
+    def _scan_entry(self, entry, now, freed):
+        """
+        Examine one report directory, removing it if it has expired.
+
+        Args:
+            entry (os.DirEntry): Report directory
+            now (float): Time the step started
+            freed (dict): Per-step counters to update
+        """
+        if not is_valid_job_id(entry.name):
+            return
+
+        # Never pull a report out from under a job that is still building it
+        job_status = read_job_status(entry.path) or {}
+        if job_status.get('state') in (JOB_QUEUED, JOB_RUNNING):
+            return
+
+        try:
+            submitted_at = job_status.get('submitted_at') or entry.stat(follow_symlinks=False).st_mtime
+        except OSError:
+            return
+        files, size = _measure_directory(entry.path)
+
+        if self.max_age and now - submitted_at > self.max_age:
+            self._remove_report(entry.name, files, size, freed)
+            return
+
+        self._catalogue[entry.name] = (submitted_at, size, files, job_status.get('respondent'))
+
+    def _apply_catalogue_limits(self, freed):
+        """
+        Apply the per-respondent and size limits to the catalogue of a full pass.
+
+        Args:
+            freed (dict): Per-step counters to update
+        """
+        # Oldest first, so both limits remove the oldest reports
+        reports = sorted(self._catalogue.items(), key=lambda item: item[1][0])
+
+        if self.max_reports_per_respondent:
+            kept = {}
+            for report_id, (_, size, files, respondent) in reversed(reports):
+                if respondent is None:
+                    continue
+                kept[respondent] = kept.get(respondent, 0) + 1
+                if kept[respondent] > self.max_reports_per_respondent:
+                    self._remove_report(report_id, files, size, freed)
+                    del self._catalogue[report_id]
+            reports = [item for item in reports if item[0] in self._catalogue]
+
+        if self.max_bytes:
+            total_bytes = sum(item[1][1] for item in reports)
+            for report_id, (_, size, files, _) in reports:
+                if total_bytes <= self.max_bytes:
+                    break
+                self._remove_report(report_id, files, size, freed)
+                del self._catalogue[report_id]
+                total_bytes -= size
+
+    def sweep_step(self):
+        """
+        Scan the next batch of the report folder and apply the limits.
+
+        Returns:
+            dict: Reports, files and bytes freed by this step, and whether it
+            completed a pass
+        """
+        with self._lock:
+            now = time.time()
+            freed = {'reports': 0, 'files': 0, 'bytes': 0, 'pass_complete': False}
+
+            if self._cursor is None:
+                self._cursor = iter_report_dirs(self.report_folder)
+                self._pass_started_at = now
+                self._catalogue = {}
+                self._pass_freed = {'reports': 0, 'bytes': 0}
+
+            scanned = 0
+            for entry in self._cursor:
+                self._scan_entry(entry, now, freed)
+                scanned += 1
+                if scanned >= self.batch_size:
+                    break
+            else:
+                # The cursor is exhausted, so the catalogue covers the whole folder
+                self._cursor.close()
+                self._cursor = None
+                self._apply_catalogue_limits(freed)
+                if self.report_cache is not None:
+                    evicted = self.report_cache.evict()
+                    freed['reports'] += evicted['reports']
+                    freed['bytes'] += evicted['bytes']
+                freed['pass_complete'] = True
+
+            self._stats['scanned_total'] += scanned
+            self._stats['removed_reports_total'] += freed['reports']
+            self._stats['freed_files_total'] += freed['files']
+            self._stats['freed_bytes_total'] += freed['bytes']
+            self._pass_freed['reports'] += freed['reports']
+            self._pass_freed['bytes'] += freed['bytes']
+
+            if freed['pass_complete']:
+                self._stats['passes'] += 1
+                self._stats['last_pass_seconds'] = round(time.time() - self._pass_started_at, 3)
+                self._stats['last_pass_reports'] = self._pass_freed['reports']
+                self._stats['last_pass_bytes'] = self._pass_freed['bytes']
+
+            return freed
+
+    def sweep(self):
+        """
+        Run sweep steps until a full pass has completed.
+
+        Returns:
+            dict: Reports, files and bytes freed
+        """
+        total = {'reports': 0, 'files': 0, 'bytes': 0}
+        while True:
+            freed = self.sweep_step()
+            for key in total:
+                total[key] += freed[key]
+            if freed['pass_complete']:
+                return total
+
+    def _acquire_lock(self):
+        """
+        Try to become the sweeping process for this report folder.
+
+        Returns:
+            bool: Whether this process holds the lock
+        """
+        if self._lock_file is None:
+            self._lock_file = open(os.path.join(self.report_folder, RETENTION_LOCK_FILENAME), 'a')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _run(self):
+        """
+        Background loop: wait for the lock, then sweep in steps forever.
+        """
+        while not self._stop.is_set():
+            if not self._acquire_lock():
+                self._stop.wait(self.pass_interval)
+                continue
+            try:
+                freed = self.sweep_step()
+            except OSError:
+                # The folder may be briefly unavailable; start a fresh pass later
+                self._cursor = None
+                freed = {'pass_complete': True}
+            self._stop.wait(self.pass_interval if freed['pass_complete'] else self.batch_interval)
+
+    def start(self):
+        """
+        Start the background sweeper in this process if it is not running.
+
+        Safe to call on every request: the thread is started once per process,
+        including after a fork.
+        """
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            # State inherited across fork belongs to the parent
+            self._cursor = None
+            self._lock_file = None
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='report-retention', daemon=True)
+            self._thread.start()
+            self._thread_pid = os.getpid()
+
+    def stop(self):
+        """
+        Stop the background sweeper.
+        """
+        self._stop.set()
+
+    def metrics(self):
+        """
+        Get retention limits and counters for this process.
+
+        Returns:
+            dict: Limits, pass progress and freed reports, files and bytes
+        """
+        with self._lock:
+            metrics = {
+                'pid': os.getpid(),
+                'max_age': self.max_age,
+                'max_bytes': self.max_bytes,
+                'max_reports_per_respondent': self.max_reports_per_respondent,
+                'pass_in_progress': self._cursor is not None,
+                'catalogued_reports': len(self._catalogue)
+            }
+            metrics.update(self._stats)
+            return metrics
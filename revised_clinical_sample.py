@@ -10,16 +10,13 @@ import os
 import sys
 import json
 from datetime import datetime
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_pdf import PdfPages
-import matplotlib.gridspec as gridspec
 
 # Add the current directory to the path to make imports work
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # Import necessary modules for interpretations
 from src.interpretation.scale_interpretations import get_scale_interpretation
+from src.reporting.graph_engine import GraphEngine, chart_spec
 
 # Create a standalone clinical sample without database dependencies
 output_dir = os.path.join(os.path.dirname(__file__), "revised_clinical_output")
@@ -186,55 +183,8 @@ def generate_traditional_profile_graph(profile, output_dir):
     # Create a PDF to hold the traditional profile graph
     pdf_path = os.path.join(output_dir, "traditional_profile_graph.pdf")
     
-    with PdfPages(pdf_path) as pdf:
-        # Set up the figure
-        plt.figure(figsize=(11, 8.5))  # US Letter size
-        
-        # Define the scales and their T-scores
-        validity_scales = ["L", "F", "K"]
-        validity_scores = [profile["scale_scores"].get(scale, 0) for scale in validity_scales]
-        
-        clinical_scales = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-        clinical_scores = [profile["scale_scores"].get(scale, 0) for scale in clinical_scales]
-        
-        # Combine all scales for the x-axis
-        all_scales = validity_scales + clinical_scales
-        all_scores = validity_scores + clinical_scores
-        
-        # Create the plot
-        plt.plot(range(len(all_scales)), all_scores, 'o-', color='blue', markersize=8)
-        
-        # Add a horizontal line at T=65 (clinical significance)
-        plt.axhline(y=65, color='r', linestyle='--', alpha=0.7)
-        
-        # Set the y-axis limits and ticks
-        plt.ylim(30, 120)
-        plt.yticks(range(30, 121, 10))
-        
-        # Set the x-axis ticks and labels
-        plt.xticks(range(len(all_scales)), all_scales)
-        
-        # Add grid lines
-        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
-        
-        # Add labels and title
-        plt.xlabel('MMPI-2 Scales', fontsize=12)
-        plt.ylabel('T-Score', fontsize=12)
-        plt.title('MMPI-2 Traditional Profile', fontsize=16)
-        
-        # Add T-score values above each point
-        for i, score in enumerate(all_scores):
-            plt.text(i, score + 3, str(score), ha='center', fontsize=10)
-        
-        # Add a legend
-        plt.legend(['Profile', 'Clinical Significance (T=65)'], loc='upper right')
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save the figure to the PDF
-        pdf.savefig()
-        plt.close()
+    spec = chart_spec('traditional', 'line_profile')
+    GraphEngine().render_pages([(spec, profile["scale_scores"])], pdf_path)
     
     return pdf_path
 
@@ -244,169 +194,24 @@ def generate_scale_family_graphs(profile, output_dir):
     # Create a PDF to hold all graphs
     pdf_path = os.path.join(output_dir, "scale_family_graphs.pdf")
     
-    with PdfPages(pdf_path) as pdf:
-        # Validity Scales Graph
-        validity_scales = ["?", "VRIN", "TRIN", "F", "FB", "FP", "L", "K"]
-        validity_scores = [profile["scale_scores"].get(scale, 0) for scale in validity_scales]
-        
-        plt.figure(figsize=(12, 6))
-        plt.bar(validity_scales, validity_scores, color='skyblue')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Validity Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(validity_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Clinical Scales Graph
-        clinical_scales = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-        clinical_names = ["Hs", "D", "Hy", "Pd", "Mf", "Pa", "Pt", "Sc", "Ma", "Si"]
-        clinical_scores = [profile["scale_scores"].get(scale, 0) for scale in clinical_scales]
-        
-        plt.figure(figsize=(12, 6))
-        bars = plt.bar(clinical_names, clinical_scores, color='lightgreen')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Clinical Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        # Highlight the highest scales for two-point code
-        sorted_indices = np.argsort(clinical_scores)
-        highest_indices = sorted_indices[-2:]
-        for i in highest_indices:
-            bars[i].set_color('darkgreen')
-            
-        for i, score in enumerate(clinical_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Depression
-        d_subscales = ["D1", "D2", "D3", "D4", "D5"]
-        d_scores = [profile["scale_scores"].get(scale, 0) for scale in d_subscales]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(d_subscales, d_scores, color='salmon')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Depression (Scale 2) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(d_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Harris-Lingoes Subscales Graph - Schizophrenia
-        sc_subscales = ["Sc1", "Sc2", "Sc3", "Sc4", "Sc5", "Sc6"]
-        sc_scores = [profile["scale_scores"].get(scale, 0) for scale in sc_subscales]
-        
-        plt.figure(figsize=(12, 6))
-        plt.bar(sc_subscales, sc_scores, color='mediumpurple')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Schizophrenia (Scale 8) Harris-Lingoes Subscales', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(sc_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # RC Scales Graph
-        rc_scales = ["RCd", "RC1", "RC2", "RC3", "RC4", "RC6", "RC7", "RC8", "RC9"]
-        rc_scores = [profile["scale_scores"].get(scale, 0) for scale in rc_scales]
-        
-        plt.figure(figsize=(12, 6))
-        plt.bar(rc_scales, rc_scores, color='coral')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Restructured Clinical Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(rc_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Content Scales Graph
-        content_scales = ["ANX", "FRS", "OBS", "DEP", "HEA", "BIZ", "ANG", "CYN", "ASP", "TPA", "LSE", "SOD", "FAM", "WRK", "TRT"]
-        content_scores = [profile["scale_scores"].get(scale, 0) for scale in content_scales]
-        
-        plt.figure(figsize=(15, 6))
-        plt.bar(content_scales, content_scores, color='plum')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Content Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.legend()
-        
-        for i, score in enumerate(content_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=10)
-            
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-        
-        # PSY-5 Scales Graph
-        psy5_scales = ["AGGR", "PSYC", "DISC", "NEGE", "INTR"]
-        psy5_scores = [profile["scale_scores"].get(scale, 0) for scale in psy5_scales]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(psy5_scales, psy5_scores, color='lightblue')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('PSY-5 Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.legend()
-        
-        for i, score in enumerate(psy5_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        pdf.savefig()
-        plt.close()
-        
-        # Supplementary Scales Graph (selected key scales)
-        supp_scales = ["A", "R", "Es", "MAC-R", "AAS", "APS", "MDS", "Ho", "O-H", "PK", "PS"]
-        supp_scores = [profile["scale_scores"].get(scale, 0) for scale in supp_scales]
-        
-        plt.figure(figsize=(14, 6))
-        plt.bar(supp_scales, supp_scores, color='tan')
-        plt.axhline(y=65, color='r', linestyle='-', alpha=0.7, label='Clinical Significance Threshold')
-        plt.title('Selected Supplementary Scales T-Scores', fontsize=16)
-        plt.ylabel('T-Score', fontsize=14)
-        plt.ylim(0, 120)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.legend()
-        
-        for i, score in enumerate(supp_scores):
-            plt.text(i, score + 2, str(score), ha='center', fontsize=12)
-            
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
+    specs = [
+        chart_spec('validity_scales', 'threshold_bars', title='Validity Scales T-Scores',
+                   scales=["?", "VRIN", "TRIN", "F", "FB", "FP", "L", "K"]),
+        chart_spec('clinical_scales', 'threshold_bars', title='Clinical Scales T-Scores', color='lightgreen',
+                   highlight_top=2, highlight_color='darkgreen'),
+        chart_spec('harris_lingoes_d', 'threshold_bars', color='salmon', fig_size=(10, 6)),
+        chart_spec('harris_lingoes_sc', 'threshold_bars', color='mediumpurple'),
+        chart_spec('rc_scales', 'threshold_bars', title='Restructured Clinical Scales T-Scores', color='coral'),
+        chart_spec('content_scales', 'threshold_bars', title='Content Scales T-Scores', color='plum',
+                   fig_size=(15, 6), label_rotation=45, value_labels={'offset': 2, 'fontsize': 10},
+                   tight_layout=True),
+        chart_spec('psy5_scales', 'threshold_bars', title='PSY-5 Scales T-Scores', color='lightblue',
+                   fig_size=(10, 6)),
+        chart_spec('supplementary_scales', 'threshold_bars', title='Selected Supplementary Scales T-Scores',
+                   scales=["A", "R", "Es", "MAC-R", "AAS", "APS", "MDS", "Ho", "O-H", "PK", "PS"],
+                   color='tan', fig_size=(14, 6), label_rotation=45, tight_layout=True)
+    ]
+    GraphEngine().render_pages([(spec, profile["scale_scores"]) for spec in specs], pdf_path)
         
     return pdf_path
 
@@ -236,6 +236,25 @@ PSY5_SCALES_DISPLAY_NAMES = {
     "INTR": "Introversion/Low Positive Emotionality"
 }
 
+# Score entry maps (scale code -> display name). Validity scale codes follow the
+# spelling used by the interpretation modules (Fb, Fp, FBS).
+VALIDITY_SCALES_MAP = {
+    "?": "Cannot Say",
+    "VRIN": "Variable Response Inconsistency",
+    "TRIN": "True Response Inconsistency",
+    "F": "Infrequency",
+    "Fb": "Back F",
+    "Fp": "Infrequency-Psychopathology",
+    "FBS": "Symptom Validity",
+    "L": "Lie",
+    "K": "Correction",
+    "S": "Superlative Self-Presentation"
+}
+RC_SCALES_MAP = dict(RESTRUCTURED_CLINICAL_SCALES_DISPLAY_NAMES)
+CONTENT_SCALES_MAP = dict(CONTENT_SCALES_DISPLAY_NAMES)
+PSY5_SCALES_MAP = dict(PSY5_SCALES_DISPLAY_NAMES)
+SUPPLEMENTARY_SCALES_MAP = dict(SUPPLEMENTARY_SCALES_DISPLAY_NAMES)
+
 # Two-Point Code Types
 TWO_POINT_CODE_TYPES = [
     "1-2", "1-3", "1-4", "1-5", "1-6", "1-7", "1-8", "1-9", "1-0",
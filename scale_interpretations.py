@@ -1,15 +1,166 @@
 # This file will contain the detailed interpretation logic for MMPI-2 scales.
 # Interpretations are based on common clinical understanding, MMPI-2 literature,
 # and requirements from the "MMPI-2 Reverse Engineer Prompt" document.
-# Import all scale interpretation dictionaries
-from src.interpretation.clinical_scales import CLINICAL_SCALES_INTERPRETATIONS
-from src.interpretation.rc_scales import RC_SCALES_INTERPRETATIONS
-from src.interpretation.content_scales import CONTENT_SCALES_INTERPRETATIONS
-from src.interpretation.content_component_scales import CONTENT_COMPONENT_SCALES_INTERPRETATIONS
-from src.interpretation.psy5_scales import PSY5_SCALES_INTERPRETATIONS
-from src.interpretation.harris_lingoes_subscales import HARRIS_LINGOES_SUBSCALES_INTERPRETATIONS
-from src.interpretation.supplementary_scales import SUPPLEMENTARY_SCALES_INTERPRETATIONS
-from src.interpretation.validity_scales import VALIDITY_SCALES_INTERPRETATIONS
+#
+# Every scale code maps to its family through an index compiled at import. The
+# interpretation dictionary of a family is loaded (see interpretation_corpus)
+# and compiled the first time one of its scales is looked up: every scale with
+# T-score ranges gets a dense table of narrative ids for the integer T-scores
+# 0-120 (see interpretation_tables) and a sorted breakpoint array for any other
+# T-score. A lookup is a dict access and an array index, or a bisect, instead
+# of a chain of membership tests and a scan of the ranges.
+from bisect import bisect_left
+
+from src.interpretation.interpretation_corpus import load_corpus
+from src.interpretation.interpretation_tables import (
+    NARRATIVES, TABLE_MIN_T_SCORE, TABLE_MAX_T_SCORE, compile_bands, scale_bands
+)
+
+# Scale codes of each interpretation family, in the order families are matched
+SCALE_FAMILY_CODES = {
+    "VALIDITY": ["?", "L", "F", "K", "Fb", "Fp", "FBS", "VRIN", "TRIN"],
+    "CLINICAL": ["Hs", "D", "Hy", "Pd", "Mf", "Pa", "Pt", "Sc", "Ma", "Si",
+                 "1", "2", "3", "4", "5", "6", "7", "8", "9", "0"],
+    "RC": ["RCd", "RC1", "RC2", "RC3", "RC4", "RC6", "RC7", "RC8", "RC9"],
+    "CONTENT": ["ANX", "FRS", "OBS", "DEP", "HEA", "BIZ", "ANG", "CYN", "ASP", "TPA", "LSE", "SOD", "FAM", "WRK",
+                "TRT"],
+    "CONTENT_COMPONENT": ["ANX1", "ANX2", "FRS1", "FRS2", "OBS1", "OBS2", "DEP1", "DEP2", "DEP3", "DEP4", "HEA1",
+                          "HEA2", "HEA3", "BIZ1", "BIZ2", "ANG1", "ANG2", "CYN1", "CYN2", "ASP1", "ASP2", "TPA1",
+                          "TPA2", "LSE1", "LSE2", "SOD1", "SOD2", "FAM1", "FAM2", "WRK1", "WRK2", "TRT1", "TRT2"],
+    "PSY5": ["AGGR", "PSYC", "DISC", "NEGE", "INTR"],
+    "HARRIS_LINGOES": ["D1", "D2", "D3", "D4", "D5", "Hy1", "Hy2", "Hy3", "Hy4", "Hy5", "Pd1", "Pd2", "Pd3", "Pd4",
+                       "Pd5", "Pa1", "Pa2", "Pa3", "Sc1", "Sc2", "Sc3", "Sc4", "Sc5", "Sc6", "Ma1", "Ma2", "Ma3",
+                       "Ma4"],
+    "SUPPLEMENTARY": ["A", "R", "Es", "Do", "Re", "Mt", "GM", "GF", "PK", "PS", "MDS", "APS", "AAS", "MAC-R", "O-H"]
+}
+
+# Interpretation corpus of each family
+INTERPRETATION_FAMILIES = {
+    "VALIDITY": "VALIDITY_SCALE_INTERPRETATIONS",
+    "CLINICAL": "CLINICAL_SCALES_INTERPRETATIONS",
+    "RC": "RC_SCALES_INTERPRETATIONS",
+    "CONTENT": "CONTENT_SCALE_INTERPRETATIONS",
+    "CONTENT_COMPONENT": "CONTENT_COMPONENT_SCALE_INTERPRETATIONS",
+    "PSY5": "PSY5_SCALES_FEMALE",
+    "HARRIS_LINGOES": "HARRIS_LINGOES_SUBSCALE_INTERPRETATIONS",
+    "SUPPLEMENTARY": "SUPPLEMENTARY_SCALES_FEMALE"
+}
+
+# Family used when neither the scale type nor the scale code identifies one
+DEFAULT_FAMILY = "VALIDITY"
+
+# Clinical scale numbers and the scale codes they stand for
+CLINICAL_SCALE_NUMBERS = {
+    "1": "Hs", "2": "D", "3": "Hy", "4": "Pd", "5": "Mf",
+    "6": "Pa", "7": "Pt", "8": "Sc", "9": "Ma", "0": "Si"
+}
+
+
+def _compile_family_index():
+    """
+    Map every scale code to the position of the first family that lists it.
+
+    Returns:
+        tuple: (family -> position, scale code -> position)
+    """
+    family_positions = {family: position for position, family in enumerate(SCALE_FAMILY_CODES)}
+    scale_positions = {}
+    for family, codes in SCALE_FAMILY_CODES.items():
+        for code in codes:
+            scale_positions.setdefault(code, family_positions[family])
+    return family_positions, scale_positions
+
+
+def _compile_ranges(ranges):
+    """
+    Compile the T-score ranges of a scale into a sorted breakpoint array.
+
+    Every range bound becomes a breakpoint. The interpretation is resolved once
+    for each breakpoint and for each open interval between two neighbouring
+    breakpoints, taking the first range in list order that covers it, so
+    overlapping ranges and gaps give the same answer as scanning the list.
+
+    Args:
+        ranges (list): {"range": [min, max], "interpretation": ...} dicts
+
+    Returns:
+        tuple: (breakpoints, interpretation at each breakpoint, interpretation
+            between breakpoint i and i + 1); None marks no interpretation
+    """
+    def first_match(t_score):
+        for range_dict in ranges:
+            min_val, max_val = range_dict["range"]
+            if min_val <= t_score <= max_val:
+                return range_dict["interpretation"]
+        return None
+
+    breakpoints = sorted({bound for range_dict in ranges for bound in range_dict["range"]})
+    at_points = [first_match(point) for point in breakpoints]
+    between = [first_match((low + high) / 2) for low, high in zip(breakpoints, breakpoints[1:])]
+    return breakpoints, at_points, between
+
+
+def family_interpretations(family):
+    """
+    Get the interpretation dictionary of a family, loading it on first use.
+
+    Args:
+        family (str): Key of INTERPRETATION_FAMILIES
+
+    Returns:
+        dict: The family's interpretation dictionary
+    """
+    return load_corpus(INTERPRETATION_FAMILIES[family])
+
+
+def _compile_family(family):
+    """
+    Compile the interpretation dictionary of one family into its index.
+
+    Args:
+        family (str): Key of INTERPRETATION_FAMILIES
+
+    Returns:
+        dict: scale code -> (dense table, breakpoints, interpretation at each
+            breakpoint, interpretation between breakpoints), or the scale
+            dictionary itself for scales without ranges
+    """
+    index = {}
+    for scale, scale_dict in family_interpretations(family).items():
+        if isinstance(scale_dict, dict) and "ranges" in scale_dict:
+            table = compile_bands(scale_bands(scale_dict))[0]
+            index[scale] = (table,) + _compile_ranges(scale_dict["ranges"])
+        else:
+            index[scale] = scale_dict
+    INTERPRETATION_INDEX[family] = index
+    return index
+
+
+FAMILY_POSITIONS, SCALE_FAMILY_POSITIONS = _compile_family_index()
+FAMILY_ORDER = list(SCALE_FAMILY_CODES)
+
+# Compiled index of each family looked up so far
+INTERPRETATION_INDEX = {}
+
+
+def get_scale_family(scale_name, scale_type=None):
+    """
+    Determine the interpretation family of a scale.
+
+    The first family, in SCALE_FAMILY_CODES order, that either is the given
+    scale type or lists the scale code is used.
+
+    Args:
+        scale_name (str): The name of the scale (e.g., "Hs", "2", "RC1")
+        scale_type (str, optional): The type of scale (e.g., "VALIDITY", "CLINICAL")
+
+    Returns:
+        str: Key of INTERPRETATION_FAMILIES
+    """
+    position = min(FAMILY_POSITIONS.get(scale_type, len(FAMILY_ORDER)),
+                   SCALE_FAMILY_POSITIONS.get(scale_name, len(FAMILY_ORDER)))
+    return FAMILY_ORDER[position] if position < len(FAMILY_ORDER) else DEFAULT_FAMILY
+
 
 # Function to get the appropriate interpretation for a scale based on its T-score
 def get_scale_interpretation(scale_name, t_score, scale_type=None, raw_score=None, gender=None):
@@ -34,59 +185,36 @@ def get_scale_interpretation(scale_name, t_score, scale_type=None, raw_score=Non
         # If t_score cannot be converted to float, return a message indicating invalid score
         return f"T-score for {scale_name} is not a numeric value; interpretation cannot be provided."
     
-    # Determine which dictionary to use based on scale_name or scale_type
-    if scale_type == "VALIDITY" or scale_name in ["?", "L", "F", "K", "Fb", "Fp", "FBS", "VRIN", "TRIN"]:
-        interpretation_dict = VALIDITY_SCALES_INTERPRETATIONS
-    elif scale_type == "CLINICAL" or scale_name in ["Hs", "D", "Hy", "Pd", "Mf", "Pa", "Pt", "Sc", "Ma", "Si"] or scale_name in ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]:
-        interpretation_dict = CLINICAL_SCALES_INTERPRETATIONS
-        # Map numeric scale names to text names
-        if scale_name == "1": scale_name = "Hs"
-        elif scale_name == "2": scale_name = "D"
-        elif scale_name == "3": scale_name = "Hy"
-        elif scale_name == "4": scale_name = "Pd"
-        elif scale_name == "5": scale_name = "Mf"
-        elif scale_name == "6": scale_name = "Pa"
-        elif scale_name == "7": scale_name = "Pt"
-        elif scale_name == "8": scale_name = "Sc"
-        elif scale_name == "9": scale_name = "Ma"
-        elif scale_name == "0": scale_name = "Si"
-        interpretation_dict = CLINICAL_SCALES_INTERPRETATIONS
-    elif scale_type == "RC" or scale_name in ["RCd", "RC1", "RC2", "RC3", "RC4", "RC6", "RC7", "RC8", "RC9"]:
-        interpretation_dict = RC_SCALES_INTERPRETATIONS
-    elif scale_type == "CONTENT" or scale_name in ["ANX", "FRS", "OBS", "DEP", "HEA", "BIZ", "ANG", "CYN", "ASP", "TPA", "LSE", "SOD", "FAM", "WRK", "TRT"]:
-        interpretation_dict = CONTENT_SCALES_INTERPRETATIONS
-    elif scale_type == "CONTENT_COMPONENT" or scale_name in ["ANX1", "ANX2", "FRS1", "FRS2", "OBS1", "OBS2", "DEP1", "DEP2", "DEP3", "DEP4", "HEA1", "HEA2", "HEA3", "BIZ1", "BIZ2", "ANG1", "ANG2", "CYN1", "CYN2", "ASP1", "ASP2", "TPA1", "TPA2", "LSE1", "LSE2", "SOD1", "SOD2", "FAM1", "FAM2", "WRK1", "WRK2", "TRT1", "TRT2"]:
-        interpretation_dict = CONTENT_COMPONENT_SCALES_INTERPRETATIONS
-    elif scale_type == "PSY5" or scale_name in ["AGGR", "PSYC", "DISC", "NEGE", "INTR"]:
-        interpretation_dict = PSY5_SCALES_INTERPRETATIONS
-    elif scale_type == "HARRIS_LINGOES" or scale_name in ["D1", "D2", "D3", "D4", "D5", "Hy1", "Hy2", "Hy3", "Hy4", "Hy5", "Pd1", "Pd2", "Pd3", "Pd4", "Pd5", "Pa1", "Pa2", "Pa3", "Sc1", "Sc2", "Sc3", "Sc4", "Sc5", "Sc6", "Ma1", "Ma2", "Ma3", "Ma4"]:
-        interpretation_dict = HARRIS_LINGOES_SUBSCALES_INTERPRETATIONS
-    elif scale_type == "SUPPLEMENTARY" or scale_name in ["A", "R", "Es", "Do", "Re", "Mt", "GM", "GF", "PK", "PS", "MDS", "APS", "AAS", "MAC-R", "O-H", "Do"]:
-        interpretation_dict = SUPPLEMENTARY_SCALES_INTERPRETATIONS
-    else:
-        # Default to VALIDITY if we can't determine the scale type
-        interpretation_dict = VALIDITY_SCALES_INTERPRETATIONS
+    # Determine the family, mapping clinical scale numbers to their codes
+    family = get_scale_family(scale_name, scale_type)
+    if family == "CLINICAL":
+        scale_name = CLINICAL_SCALE_NUMBERS.get(scale_name, scale_name)
     
-    # Try to get the scale from the appropriate dictionary
-    if scale_name in interpretation_dict:
-        scale_dict = interpretation_dict[scale_name]
-        
-        # Check if the scale has a "ranges" key
-        if "ranges" in scale_dict:
-            # Find the appropriate range for the T-score
-            for range_dict in scale_dict["ranges"]:
-                min_val, max_val = range_dict["range"]
-                if min_val <= t_score <= max_val:
-                    return range_dict["interpretation"]
-            
-            # If no range is found, return a default message
-            return f"No interpretation found for T-score {t_score} in scale {scale_name}"
-        elif "not_numeric" in scale_dict and not isinstance(t_score, (int, float)):
-            # Return the not_numeric message if t_score is not numeric
-            return scale_dict["not_numeric"]
-        else:
-            # If the scale doesn't have a "ranges" key, return the entire scale dictionary
-            return scale_dict
-    else:
+    family_index = INTERPRETATION_INDEX.get(family)
+    if family_index is None:
+        family_index = _compile_family(family)
+    entry = family_index.get(scale_name)
+    if entry is None:
         # If the scale is not found in the dictionary, return a default message
         return f"Interpretation not found for scale: {scale_name} in type {scale_type if scale_type else 'UNKNOWN'}"
+    if not isinstance(entry, tuple):
+        # If the scale doesn't have a "ranges" key, return the entire scale dictionary
+        return entry
+    
+    # Integer T-scores index the dense table. For any other T-score, find the
+    # breakpoint at or above it; an exact match uses the breakpoint's
+    # interpretation, anything else the interval below it
+    table, breakpoints, at_points, between = entry
+    position = bisect_left(breakpoints, t_score)
+    if TABLE_MIN_T_SCORE <= t_score <= TABLE_MAX_T_SCORE and t_score == int(t_score):
+        interpretation = NARRATIVES[table[int(t_score)]]
+    elif position < len(breakpoints) and breakpoints[position] == t_score:
+        interpretation = at_points[position]
+    elif 0 < position < len(breakpoints):
+        interpretation = between[position - 1]
+    else:
+        interpretation = None
+    if interpretation is None:
+        # If no range is found, return a default message
+        return f"No interpretation found for T-score {t_score} in scale {scale_name}"
+    return interpretation
@@ -0,0 +1,239 @@
+"""
+Scale registry and score parsing for the MMPI-2 platform.
+
+Every scale the platform accepts is compiled once at import into a registry
+that records its family, valid T-score range and default. A single parser walks
+the submitted fields once, looks each one up in the registry and produces a
+validated ScoreProfile together with every invalid field, instead of silently
+substituting a default. The same parser serves the score entry form, the JSON
+API and CSV imports (any mapping of scale code -> value).
+"""
+
+from array import array
+
+from src.constants.scale_constants import (
+    VALIDITY_SCALES_MAP, CLINICAL_SCALES_MAP, HARRIS_LINGOES_SUBSCALES_MAP,
+    CONTENT_SCALES_MAP, RC_SCALES_MAP, PSY5_SCALES_MAP, SUPPLEMENTARY_SCALES_MAP
+)
+
+# Score families in the order the rest of the platform stores them
+SCORE_FAMILIES = [
+    ('validity_scales', VALIDITY_SCALES_MAP),
+    ('clinical_scales', CLINICAL_SCALES_MAP),
+    ('harris_lingoes_subscales', HARRIS_LINGOES_SUBSCALES_MAP),
+    ('content_scales', CONTENT_SCALES_MAP),
+    ('rc_scales', RC_SCALES_MAP),
+    ('psy5_scales', PSY5_SCALES_MAP),
+    ('supplementary_scales', SUPPLEMENTARY_SCALES_MAP)
+]
+
+# Valid T-score range (inclusive) and default for ordinary scales
+T_SCORE_MIN = 30
+T_SCORE_MAX = 120
+T_SCORE_DEFAULT = 50
+
+# Scales whose values are not T-scores: (min, max, default)
+SCALE_RANGE_OVERRIDES = {
+    '?': (0, 567, 0)  # Cannot Say is a raw count of omitted items
+}
+
+# Validity scales that are also plotted on the traditional clinical profile
+TRADITIONAL_PROFILE_VALIDITY_SCALES = ['L', 'F', 'K']
+
+# Marker for a scale with no value in a ScoreProfile
+_MISSING = -1
+
+
+def _compile_registry():
+    """
+    Build the scale registry from the score family maps.
+
+    Returns:
+        dict: Scale code -> {"index", "family", "min", "max", "default"}
+    """
+    registry = {}
+    for family, scale_map in SCORE_FAMILIES:
+        for scale in scale_map:
+            if scale in registry:
+                raise ValueError(f"Scale {scale} is defined in both {registry[scale]['family']} and {family}")
+            min_score, max_score, default = SCALE_RANGE_OVERRIDES.get(
+                scale, (T_SCORE_MIN, T_SCORE_MAX, T_SCORE_DEFAULT))
+            registry[scale] = {
+                'index': len(registry),
+                'family': family,
+                'min': min_score,
+                'max': max_score,
+                'default': default
+            }
+    return registry
+
+
+SCALE_REGISTRY = _compile_registry()
+
+# Scale codes in registry order, for turning indexes back into codes
+_SCALE_CODES = list(SCALE_REGISTRY)
+
+
+class ScoreProfile:
+    """
+    A validated set of scale scores stored as one compact integer array.
+    """
+
+    __slots__ = ('_values',)
+
+    def __init__(self):
+        """
+        Initialize an empty profile.
+        """
+        self._values = array('h', [_MISSING]) * len(SCALE_REGISTRY)
+
+    def set(self, scale, value):
+        """
+        Set the score of a scale. The value must already be validated.
+
+        Args:
+            scale (str): Scale code
+            value (int): Score
+        """
+        self._values[SCALE_REGISTRY[scale]['index']] = value
+
+    def get(self, scale, default=None):
+        """
+        Get the score of a scale.
+
+        Args:
+            scale (str): Scale code
+            default: Value returned when the scale has no score
+
+        Returns:
+            int: The score, or default if missing
+        """
+        spec = SCALE_REGISTRY.get(scale)
+        if spec is None:
+            return default
+        value = self._values[spec['index']]
+        return default if value == _MISSING else value
+
+    def __contains__(self, scale):
+        return self.get(scale) is not None
+
+    def __len__(self):
+        return sum(1 for value in self._values if value != _MISSING)
+
+    def items(self):
+        """
+        Iterate over the scales that have scores.
+
+        Yields:
+            tuple: (scale code, score) in registry order
+        """
+        for index, value in enumerate(self._values):
+            if value != _MISSING:
+                yield _SCALE_CODES[index], value
+
+    def to_families(self):
+        """
+        Convert to the per-family dictionaries used by the report generators.
+
+        L, F and K are also copied into clinical_scales because the traditional
+        profile graph plots them alongside the clinical scales.
+
+        Returns:
+            dict: Family name -> {scale code: score}
+        """
+        families = {family: {} for family, _ in SCORE_FAMILIES}
+        for scale, value in self.items():
+            families[SCALE_REGISTRY[scale]['family']][scale] = value
+        for scale in TRADITIONAL_PROFILE_VALIDITY_SCALES:
+            if scale in families['validity_scales']:
+                families['clinical_scales'][scale] = families['validity_scales'][scale]
+        return families
+
+
+def _parse_value(scale, raw_value):
+    """
+    Convert and range-check a single submitted value.
+
+    Args:
+        scale (str): Scale code, which must be in the registry
+        raw_value: Submitted value (string from a form/CSV, number from JSON)
+
+    Returns:
+        tuple: (score or None, error message or None)
+    """
+    spec = SCALE_REGISTRY[scale]
+    if isinstance(raw_value, bool):
+        return None, f"{scale}: expected a whole number"
+    try:
+        if isinstance(raw_value, float):
+            if not raw_value.is_integer():
+                return None, f"{scale}: expected a whole number, got {raw_value}"
+            value = int(raw_value)
+        else:
+            value = int(str(raw_value).strip())
+    except (TypeError, ValueError):
+        return None, f"{scale}: {raw_value!r} is not a whole number"
+
+    if not spec['min'] <= value <= spec['max']:
+        return None, f"{scale}: {value} is outside the valid range {spec['min']}-{spec['max']}"
+    return value, None
+
+
+def parse_scale_fields(fields):
+    """
+    Parse a flat mapping of scale code -> value in a single pass.
+
+    Fields that are not scale codes (e.g. CSRF tokens, client fields in a CSV
+    row) are ignored, as are blank values.
+
+    Args:
+        fields: Mapping such as request.form or a csv.DictReader row
+
+    Returns:
+        tuple: (ScoreProfile, dict of scale code -> error message)
+    """
+    profile = ScoreProfile()
+    errors = {}
+    for scale, raw_value in fields.items():
+        if scale not in SCALE_REGISTRY or raw_value is None or str(raw_value).strip() == '':
+            continue
+        value, error = _parse_value(scale, raw_value)
+        if error:
+            errors[scale] = error
+        else:
+            profile.set(scale, value)
+    return profile, errors
+
+
+def parse_score_families(scores):
+    """
+    Parse scores in the per-family shape built by score_entry.
+
+    Args:
+        scores (dict): Family name -> {scale code: value}
+
+    Returns:
+        tuple: (ScoreProfile, dict of field -> error message)
+    """
+    profile = ScoreProfile()
+    errors = {}
+    for family, family_scores in scores.items():
+        if not isinstance(family_scores, dict):
+            errors[family] = f"{family}: expected an object of scale scores"
+            continue
+        for scale, raw_value in family_scores.items():
+            spec = SCALE_REGISTRY.get(scale)
+            if spec is None:
+                errors[f"{family}.{scale}"] = f"{scale}: unknown scale"
+                continue
+            # Clinical profiles conventionally repeat L, F and K
+            if spec['family'] != family and not (
+                    family == 'clinical_scales' and scale in TRADITIONAL_PROFILE_VALIDITY_SCALES):
+                errors[f"{family}.{scale}"] = f"{scale}: belongs to {spec['family']}, not {family}"
+                continue
+            value, error = _parse_value(scale, raw_value)
+            if error:
+                errors[f"{family}.{scale}"] = error
+            else:
+                profile.set(scale, value)
+    return profile, errors
@@ -0,0 +1,393 @@
+"""
+Server-side session storage for the MMPI-2 web application.
+
+Flask's default session serializes everything into a signed cookie, which means
+the full score profile (over 100 scale values) plus client information travels
+with every request, including static and report file fetches. This module keeps
+session data on the server and puts only a signed, opaque session id in the
+cookie.
+
+Three backends are provided:
+    - MemorySessionStore: in-process LRU, for single-process deployments
+    - SQLiteSessionStore: a shared SQLite file, for multiple gunicorn workers
+    - RedisSessionStore: any client with Redis get/setex/delete semantics;
+      LocalRedis is an in-process stand-in for development
+"""
+
+import os
+import time
+import secrets
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from itsdangerous import Signer, BadSignature
+from werkzeug.datastructures import CallbackDict
+
+# Default session lifetime in seconds
+DEFAULT_SESSION_TTL = 8 * 3600
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """
+    Session dictionary whose contents live in a session store.
+    """
+
+    def __init__(self, initial=None, sid=None, new=False):
+        """
+        Initialize the session.
+
+        Args:
+            initial (dict, optional): Stored session data
+            sid (str, optional): Session id
+            new (bool): Whether this session was just created
+        """
+        def on_update(self):
+            self.modified = True
+
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class MemorySessionStore:
+    """
+    In-process LRU session store with per-entry expiry.
+    """
+
+    def __init__(self, max_entries=10000):
+        """
+        Initialize the memory session store.
+
+        Args:
+            max_entries (int): Maximum number of sessions kept before the least
+                recently used ones are dropped
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        """
+        Get stored session data.
+
+        Args:
+            sid (str): Session id
+
+        Returns:
+            bytes or None: The stored data, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return data
+
+    def set(self, sid, data, ttl):
+        """
+        Store session data.
+
+        Args:
+            sid (str): Session id
+            data (bytes): Serialized session data
+            ttl (int): Lifetime in seconds
+        """
+        with self._lock:
+            self._entries[sid] = (data, time.time() + ttl)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid):
+        """
+        Delete stored session data.
+
+        Args:
+            sid (str): Session id
+        """
+        with self._lock:
+            self._entries.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """
+    Session store backed by a SQLite file shared between worker processes.
+    """
+
+    def __init__(self, path, purge_interval=300):
+        """
+        Initialize the SQLite session store.
+
+        Args:
+            path (str): Path to the SQLite database file
+            purge_interval (int): Minimum seconds between expired-row purges
+        """
+        self.path = path
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purged = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(sid TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """
+        Get the connection for the current thread and process.
+
+        Connections are not shared across fork, so a new one is opened whenever
+        the process id changes.
+
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, sid):
+        """
+        Get stored session data.
+
+        Args:
+            sid (str): Session id
+
+        Returns:
+            bytes or None: The stored data, or None if missing or expired
+        """
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?",
+            (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, data, ttl):
+        """
+        Store session data.
+
+        Args:
+            sid (str): Session id
+            data (bytes): Serialized session data
+            ttl (int): Lifetime in seconds
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)",
+                (sid, data, now + ttl)
+            )
+            if now - self._last_purged >= self.purge_interval:
+                conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+                self._last_purged = now
+
+    def delete(self, sid):
+        """
+        Delete stored session data.
+
+        Args:
+            sid (str): Session id
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class LocalRedis:
+    """
+    In-process stand-in for the subset of the Redis client API used by
+    RedisSessionStore (get, setex, delete).
+    """
+
+    def __init__(self):
+        """
+        Initialize the stand-in with an empty keyspace.
+        """
+        self._store = MemorySessionStore(max_entries=float('inf'))
+
+    def get(self, key):
+        """Get the value of a key, or None if missing or expired."""
+        return self._store.get(key)
+
+    def setex(self, key, ttl, value):
+        """Set the value of a key with an expiry in seconds."""
+        self._store.set(key, value, ttl)
+
+    def delete(self, key):
+        """Delete a key."""
+        self._store.delete(key)
+
+
+class RedisSessionStore:
+    """
+    Session store backed by a Redis-compatible client.
+    """
+
+    def __init__(self, client, key_prefix='mmpi:session:'):
+        """
+        Initialize the Redis session store.
+
+        Args:
+            client: Object providing Redis get(key), setex(key, ttl, value) and delete(key)
+            key_prefix (str): Prefix added to every session key
+        """
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def get(self, sid):
+        """
+        Get stored session data.
+
+        Args:
+            sid (str): Session id
+
+        Returns:
+            bytes or None: The stored data, or None if missing or expired
+        """
+        return self.client.get(self.key_prefix + sid)
+
+    def set(self, sid, data, ttl):
+        """
+        Store session data; expiry is handled by Redis.
+
+        Args:
+            sid (str): Session id
+            data (bytes): Serialized session data
+            ttl (int): Lifetime in seconds
+        """
+        self.client.setex(self.key_prefix + sid, int(ttl), data)
+
+    def delete(self, sid):
+        """
+        Delete stored session data.
+
+        Args:
+            sid (str): Session id
+        """
+        self.client.delete(self.key_prefix + sid)
+
+
+def create_session_store(backend, sqlite_path=None, redis_url=None, max_entries=10000):
+    """
+    Create a session store by backend name.
+
+    Args:
+        backend (str): "memory", "sqlite" or "redis"
+        sqlite_path (str, optional): Database file for the sqlite backend
+        redis_url (str, optional): Server URL for the redis backend; the
+            in-process LocalRedis stand-in is used when omitted
+        max_entries (int): Maximum sessions kept by the memory backend
+
+    Returns:
+        object: A session store
+    """
+    if backend == 'memory':
+        return MemorySessionStore(max_entries=max_entries)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(sqlite_path or 'sessions.sqlite3')
+    if backend == 'redis':
+        if not redis_url:
+            return RedisSessionStore(LocalRedis())
+        import redis  # Optional dependency, only needed for a real Redis server
+        return RedisSessionStore(redis.Redis.from_url(redis_url))
+    raise ValueError(f"Unknown session backend: {backend}")
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Flask session interface that stores session data in a session store and
+    only sends a signed session id to the browser.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, ttl=DEFAULT_SESSION_TTL):
+        """
+        Initialize the session interface.
+
+        Args:
+            store: Session store providing get, set and delete
+            ttl (int): Session lifetime in seconds, refreshed on every write
+        """
+        self.store = store
+        self.ttl = ttl
+
+    def _signer(self, app):
+        """Get the signer used to protect the session id cookie."""
+        return Signer(app.secret_key, salt='mmpi-session')
+
+    def open_session(self, app, request):
+        """
+        Load the session referenced by the request cookie.
+
+        Args:
+            app (Flask): The application
+            request (Request): The current request
+
+        Returns:
+            ServerSideSession: The loaded session, or a new empty one
+        """
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('utf-8')
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.get(sid)
+                if data is not None:
+                    return ServerSideSession(self.serializer.loads(data), sid=sid)
+
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        """
+        Persist a modified session and set the session id cookie.
+
+        Args:
+            app (Flask): The application
+            session (ServerSideSession): The session to save
+            response (Response): The outgoing response
+        """
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        name = self.get_cookie_name(app)
+
+        # Cleared sessions are removed from the store and the cookie is dropped
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not session.modified:
+            return
+
+        self.store.set(session.sid, self.serializer.dumps(dict(session)), self.ttl)
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode('utf-8'),
+            max_age=self.ttl,
+            httponly=self.get_cookie_httponly(app),
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+            domain=domain,
+            path=path
+        )
@@ -0,0 +1,42 @@
+import importlib, importlib.abc, importlib.util, sys
+
+
+class _AliasLoader(importlib.abc.Loader):
+    """Load <package>.<name> as the top-level module <name>."""
+
+    def create_module(self, spec):
+        self.module = importlib.import_module(spec.name.rpartition('.')[2])
+        self.module_spec = self.module.__spec__
+        return self.module
+
+    def exec_module(self, module):
+        # The import system points __spec__ at the alias; keep the module's own
+        module.__spec__ = self.module_spec
+
+
+class _AliasFinder(importlib.abc.MetaPathFinder):
+    """Find the aliased modules of one package."""
+
+    def __init__(self, package, modules):
+        self.package = package
+        self.modules = set(modules)
+
+    def find_spec(self, fullname, path, target=None):
+        package, _, name = fullname.rpartition('.')
+        if package != self.package or name not in self.modules:
+            return None
+        return importlib.util.spec_from_loader(fullname, _AliasLoader())
+
+
+def alias_lazily(package, modules):
+    """
+    Alias top-level modules as submodules of a package on first import.
+
+    Importing the package then loads none of them; importing one loads only
+    it and what it imports itself.
+
+    Args:
+        package (str): Package name, e.g. "src.reporting"
+        modules (list): Names of the top-level modules to alias
+    """
+    sys.meta_path.insert(0, _AliasFinder(package, modules))
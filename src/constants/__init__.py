@@ -1,5 +1,5 @@
 import importlib, sys
 
-_modules = ['scale_constants']
+_modules = ['scale_constants', 'score_registry', 'graph_constants']
 for _m in _modules:
     sys.modules[f"{__name__}.{_m}"] = importlib.import_module(_m)
@@ -1,4 +1,4 @@
-import importlib, sys
+from src import alias_lazily
 
 _modules = [
     'clinical_scales',
@@ -9,9 +9,15 @@ _modules = [
     'harris_lingoes_subscales',
     'supplementary_scales',
     'validity_scales',
+    'component_scales',
+    'narrative_templates',
+    'interpretation_corpus',
+    'interpretation_tables',
     'scale_interpretations',
     'narrative_dsm5tr_integration',
-    'component_scales'
+    'dsm5tr_decision_trees'
 ]
-for _m in _modules:
-    sys.modules[f"{__name__}.{_m}"] = importlib.import_module(_m)
+
+# The modules are aliased on first import rather than here, so importing the
+# package does not load every interpretation corpus
+alias_lazily(__name__, _modules)
@@ -1,7 +1,13 @@
-import importlib, sys
+from src import alias_lazily
 
 _modules = [
+    'profile_graph_cache',
+    'graph_engine',
     'comprehensive_report_generator',
+    'profile_graph_renderer',
+    'profile_graph_scene',
+    'profile_graph_svg',
+    'profile_graph_pdf',
     'profile_graph_generator',
     'report_generator',
     'embedded_graphs_report_generator',
@@ -13,8 +19,7 @@ _modules = [
     'dsm5tr_sample_generator',
     'create_clinical_sample'
 ]
-for _m in _modules:
-    try:
-        sys.modules[f"{__name__}.{_m}"] = importlib.import_module(_m)
-    except ModuleNotFoundError:
-        pass
+
+# The modules are aliased on first import rather than here, so importing one
+# report module does not import every generator (and WeasyPrint) with it
+alias_lazily(__name__, _modules)
@@ -0,0 +1,16 @@
+from src import alias_lazily
+
+_modules = [
+    'report_artifacts',
+    'report_index',
+    'report_jobs',
+    'report_cache',
+    'report_retention',
+    'session_store',
+    'warmup'
+]
+
+# The modules are aliased on first import rather than here, so importing one
+# of them as a top-level module (as the report pool does when it unpickles
+# report_jobs.build_report) does not import the others half-way through
+alias_lazily(__name__, _modules)
@@ -0,0 +1,153 @@
+/*
+ * Client-side MMPI-2 profile graphs for the report viewer.
+ *
+ * Draws every family graph as inline SVG from the compact graph profile
+ * (profile_graphs.json) that reports built with the "client" graph format
+ * contain, so the server does not rasterize graphs for the viewer. The layout
+ * mirrors src/reporting/profile_graph_scene.py: a 1000x800 canvas, T=30-120 on
+ * the y-axis, the clinical reference lines and, for families with full scale
+ * names, a name table below the plot.
+ *
+ * Usage: <div data-profile-url="/reports/<id>/profile_graphs.json"></div>
+ */
+(function () {
+    'use strict';
+
+    var SVG_NS = 'http://www.w3.org/2000/svg';
+    var WIDTH = 1000;
+    var HEIGHT = 800;
+    var PLOT_LEFT = 80;
+    var PLOT_RIGHT = 980;
+    var PLOT_TOP = 80;
+    var PLOT_BOTTOM = 740;
+    var PLOT_BOTTOM_ROTATED_LABELS = 720;
+    var PLOT_BOTTOM_WITH_TABLE = 520;
+    var TABLE_TOP = 580;
+    var TABLE_ROW_HEIGHT = 20;
+    var COLORS = {
+        plot: '#e5e5e5',
+        grid: '#ffffff',
+        tick: '#555555',
+        text: '#000000',
+        reference: '#ff0000',
+        profile: '#0000ff'
+    };
+
+    function element(name, attributes, text) {
+        var node = document.createElementNS(SVG_NS, name);
+        Object.keys(attributes).forEach(function (key) {
+            node.setAttribute(key, attributes[key]);
+        });
+        if (text !== undefined) {
+            node.textContent = text;
+        }
+        return node;
+    }
+
+    function label(svg, x, y, text, size, anchor, fill, rotation) {
+        var attributes = {x: x, y: y, 'font-size': size, 'text-anchor': anchor || 'start', fill: fill || COLORS.text};
+        if (rotation) {
+            attributes.transform = 'rotate(-' + rotation + ' ' + x + ' ' + y + ')';
+        }
+        svg.appendChild(element('text', attributes, text));
+    }
+
+    function line(svg, x1, y1, x2, y2, stroke, width) {
+        svg.appendChild(element('line', {x1: x1, y1: y1, x2: x2, y2: y2, stroke: stroke, 'stroke-width': width}));
+    }
+
+    function drawFamily(profile, family) {
+        var low = profile.axis[0];
+        var high = profile.axis[1];
+        var bottom = family.full_names ? PLOT_BOTTOM_WITH_TABLE
+            : (family.label_rotation ? PLOT_BOTTOM_ROTATED_LABELS : PLOT_BOTTOM);
+        var step = (PLOT_RIGHT - PLOT_LEFT) / family.scales.length;
+        var xs = family.scales.map(function (scale, index) { return PLOT_LEFT + (index + 0.5) * step; });
+        var y = function (score) {
+            score = Math.min(Math.max(score, low), high);
+            return bottom - (score - low) * (bottom - PLOT_TOP) / (high - low);
+        };
+        var svg = element('svg', {
+            viewBox: '0 0 ' + WIDTH + ' ' + HEIGHT,
+            width: '100%',
+            'font-family': 'DejaVu Sans, Helvetica, Arial, sans-serif',
+            role: 'img',
+            'aria-label': family.title
+        });
+
+        // Plot area, grid and y tick labels every 10 T-score points
+        svg.appendChild(element('rect', {x: 0, y: 0, width: WIDTH, height: HEIGHT, fill: '#ffffff'}));
+        svg.appendChild(element('rect', {x: PLOT_LEFT, y: PLOT_TOP, width: PLOT_RIGHT - PLOT_LEFT,
+                                         height: bottom - PLOT_TOP, fill: COLORS.plot}));
+        for (var score = low; score <= high; score += 10) {
+            line(svg, PLOT_LEFT, y(score), PLOT_RIGHT, y(score), COLORS.grid, 1);
+            label(svg, PLOT_LEFT - 8, y(score) + 4, String(score), 13, 'end', COLORS.tick);
+        }
+        xs.forEach(function (x) { line(svg, x, PLOT_TOP, x, bottom, COLORS.grid, 1); });
+
+        // Clinical reference lines
+        profile.reference_lines.forEach(function (score) {
+            line(svg, PLOT_LEFT, y(score), PLOT_RIGHT, y(score), COLORS.reference, 2.5);
+        });
+
+        // Scale labels, axis label and the caption of the T-score row
+        var labels = family.labels || family.scales;
+        xs.forEach(function (x, index) {
+            label(svg, x, bottom + 20, labels[index], 13, family.label_rotation ? 'end' : 'middle',
+                  COLORS.tick, family.label_rotation);
+        });
+        label(svg, 25, (PLOT_TOP + bottom) / 2, 'T-Score', 16, 'middle', COLORS.tick, 90);
+        label(svg, PLOT_LEFT - 8, PLOT_TOP - 8, 'T-Score:', 13, 'end');
+
+        // Title, profile line, points and T-score labels
+        var title = element('text', {x: (PLOT_LEFT + PLOT_RIGHT) / 2, y: 35, 'font-size': 19,
+                                     'text-anchor': 'middle', 'font-weight': 'bold'}, family.title);
+        svg.appendChild(title);
+        var points = xs.map(function (x, index) { return x + ',' + y(family.t_scores[index]); });
+        svg.appendChild(element('polyline', {points: points.join(' '), fill: 'none',
+                                             stroke: COLORS.profile, 'stroke-width': 2}));
+        xs.forEach(function (x, index) {
+            var score = family.t_scores[index];
+            svg.appendChild(element('circle', {cx: x, cy: y(score), r: 4, fill: COLORS.profile}));
+            label(svg, x, PLOT_TOP - 8, String(score), 13, 'middle');
+        });
+
+        // Scale name table below the graph
+        if (family.full_names) {
+            var middle = (PLOT_LEFT + PLOT_RIGHT) / 2;
+            var rows = [['Scale', 'Full Name']].concat(family.scales.map(function (scale, index) {
+                return [scale, family.full_names[index]];
+            }));
+            rows.forEach(function (row, index) {
+                var top = TABLE_TOP + index * TABLE_ROW_HEIGHT;
+                svg.appendChild(element('rect', {x: PLOT_LEFT, y: top, width: PLOT_RIGHT - PLOT_LEFT,
+                                                 height: TABLE_ROW_HEIGHT, fill: 'none',
+                                                 stroke: COLORS.text, 'stroke-width': 0.5}));
+                label(svg, (PLOT_LEFT + middle) / 2, top + 14, row[0], 11, 'middle');
+                label(svg, (middle + PLOT_RIGHT) / 2, top + 14, row[1], 11, 'middle');
+            });
+            line(svg, middle, TABLE_TOP, middle, TABLE_TOP + rows.length * TABLE_ROW_HEIGHT, COLORS.text, 0.5);
+        }
+        return svg;
+    }
+
+    function renderProfileCharts(container) {
+        fetch(container.getAttribute('data-profile-url'))
+            .then(function (response) { return response.json(); })
+            .then(function (profile) {
+                container.textContent = '';
+                profile.families.forEach(function (family) {
+                    var section = document.createElement('section');
+                    section.className = 'profile-chart';
+                    section.id = 'chart-' + family.family;
+                    section.appendChild(drawFamily(profile, family));
+                    container.appendChild(section);
+                });
+            })
+            .catch(function () {
+                container.textContent = 'Profile graphs could not be loaded.';
+            });
+    }
+
+    Array.prototype.forEach.call(document.querySelectorAll('[data-profile-url]'), renderProfileCharts);
+})();
@@ -0,0 +1,33 @@
+"""
+Profile PNGs are cached as a scores layer shared by every client.
+"""
+
+from benchmark_profile_graphs import sample_t_scores
+from src.constants.graph_constants import GRAPH_FAMILY_SPECS
+from src.reporting.graph_engine import GraphEngine, profile_chart_spec, render_chart_bytes
+from src.reporting.profile_graph_cache import GraphCache
+
+
+def test_clients_with_the_same_scores_share_the_cached_layer(tmp_path):
+    engine = GraphEngine(graph_cache=GraphCache(str(tmp_path)))
+    scores = dict(zip(GRAPH_FAMILY_SPECS['traditional']['scales'], sample_t_scores('traditional', 1)))
+    first = profile_chart_spec('traditional', {'name': 'Jane Doe', 'sex': 'female'})
+    second = profile_chart_spec('traditional', {'name': 'John Roe', 'sex': 'male'})
+
+    rendered = [engine.render_charts_bytes([(spec, scores, 'png')])[0] for spec in (first, second)]
+
+    assert engine.stats == {'hits': 1, 'misses': 1}
+    assert rendered[0] == render_chart_bytes(first, scores, 'png')
+    assert rendered[1] == render_chart_bytes(second, scores, 'png')
+    assert rendered[0] != rendered[1]
+
+
+def test_vector_graphs_are_cached_with_their_title(tmp_path):
+    engine = GraphEngine(graph_cache=GraphCache(str(tmp_path)))
+    scores = dict(zip(GRAPH_FAMILY_SPECS['traditional']['scales'], sample_t_scores('traditional', 1)))
+    charts = [(profile_chart_spec('traditional', {'name': name}), scores, 'svg') for name in ('Jane Doe', 'John Roe')]
+
+    rendered = engine.render_charts_bytes(charts)
+
+    assert engine.stats == {'hits': 0, 'misses': 2}
+    assert b'John Roe' in rendered[1]
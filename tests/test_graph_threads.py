@@ -0,0 +1,39 @@
+"""
+Graphs rendered from several threads must match graphs rendered in turn.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+
+from benchmark_profile_graphs import concurrency_charts
+from src.reporting.graph_engine import render_chart_bytes
+
+THREADS = 8
+
+
+def test_threaded_renders_match_serial_renders():
+    settings = dict(matplotlib.rcParams)
+    charts = concurrency_charts(3)
+    expected = [render_chart_bytes(*chart) for chart in charts]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        rendered = list(pool.map(lambda chart: render_chart_bytes(*chart), charts))
+
+    mismatched = [index for index, (a, b) in enumerate(zip(expected, rendered)) if a != b]
+    assert not mismatched, f"{len(mismatched)} of {len(charts)} charts differ when rendered from threads"
+    assert dict(matplotlib.rcParams) == settings
+
+
+def test_threaded_vector_renders_match_serial_renders(monkeypatch):
+    # Fixed dates and ids make SVG output reproducible
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '0')
+    monkeypatch.setitem(matplotlib.rcParams, 'svg.hashsalt', 'report')
+    charts = [(spec, scores, 'svg') for spec, scores, _ in concurrency_charts(2)
+              if spec['backend'] == 'matplotlib']
+    expected = [render_chart_bytes(*chart) for chart in charts]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        rendered = list(pool.map(lambda chart: render_chart_bytes(*chart), charts))
+
+    assert rendered == expected
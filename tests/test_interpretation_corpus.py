@@ -0,0 +1,72 @@
+"""
+The packed corpus is rebuilt by warm-up when missing or stale, judged by the
+content of the interpretation modules rather than their modification times.
+"""
+
+import os
+import hashlib
+
+import pytest
+
+from src.interpretation import interpretation_corpus as corpus
+
+
+def _module_path(corpus_name):
+    if corpus_name in corpus.CORPUS_PAIRS:
+        corpus_name = corpus.CORPUS_PAIRS[corpus_name]['Female'][0]
+    return os.path.join(corpus.PROJECT_ROOT, corpus.CORPUS_SOURCES[corpus_name] + '.py')
+
+
+@pytest.fixture
+def pack_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'interpretation_corpus.pack')
+    with corpus._LOCK:
+        corpus._close_pack()
+    monkeypatch.setattr(corpus, 'CORPUS_PATH', path)
+    yield path
+    with corpus._LOCK:
+        corpus._close_pack()
+
+
+def test_refresh_builds_a_missing_pack_once(pack_path):
+    assert corpus.refresh_corpus()
+    assert os.path.exists(pack_path)
+    assert not corpus.refresh_corpus()
+
+
+def test_pack_entries_carry_the_module_source_hash(pack_path):
+    corpus.refresh_corpus()
+    index = corpus._open_pack()
+    assert index
+    for corpus_name, entry in index.items():
+        with open(_module_path(corpus_name), 'rb') as f:
+            assert entry['source_hash'] == hashlib.sha256(f.read()).hexdigest()
+
+
+def test_refresh_rebuilds_a_pack_with_a_changed_module(pack_path, monkeypatch):
+    corpus.refresh_corpus()
+    corpus_name = corpus.packed_corpora()[0]
+    module_name = os.path.basename(_module_path(corpus_name))[:-3]
+    monkeypatch.setitem(corpus._SOURCE_HASHES, module_name, 'edited')
+    assert corpus.refresh_corpus()
+
+
+def test_refresh_rebuilds_a_pack_missing_a_corpus(pack_path, monkeypatch):
+    corpus.refresh_corpus()
+    monkeypatch.setitem(corpus.CORPUS_SOURCES, 'added_corpus', 'added_corpus_module')
+    assert corpus.refresh_corpus()
+
+
+def test_failed_corpus_is_retried_once_its_module_changes(pack_path, monkeypatch):
+    # The module of this corpus does not exist, so packing it fails
+    monkeypatch.setitem(corpus.CORPUS_SOURCES, 'broken_corpus', 'broken_corpus_module')
+    result = corpus.build_corpus()
+    assert 'broken_corpus' in result['failed']
+
+    index = corpus._open_pack()
+    assert 'error' in index['broken_corpus']
+    assert 'broken_corpus' not in corpus.packed_corpora()
+    assert not corpus.refresh_corpus()
+
+    monkeypatch.setitem(corpus._SOURCE_HASHES, 'broken_corpus_module', 'added')
+    assert corpus.refresh_corpus()
@@ -0,0 +1,39 @@
+"""
+Batch interpretation stacks a family's tables once and reuses them.
+"""
+
+from array import array
+
+import numpy as np
+import pytest
+
+from src.interpretation import interpretation_tables as tables
+
+FAMILY = 'TEST_FAMILY'
+
+
+@pytest.fixture
+def family(monkeypatch):
+    low, high = tables._narrative_id('test low'), tables._narrative_id('test high')
+    female_high = tables._narrative_id('test female high')
+    shared = array('I', [low] * 65 + [high] * 56)
+    female = array('I', [low] * 65 + [female_high] * 56)
+    monkeypatch.setitem(tables.NARRATIVE_TABLES, (FAMILY, tables.ANY_GENDER, 'A'), shared)
+    monkeypatch.setitem(tables.NARRATIVE_TABLES, (FAMILY, 'Female', 'A'), female)
+    monkeypatch.setattr(tables, 'COMPILED_FAMILIES', tables.COMPILED_FAMILIES | {FAMILY})
+    monkeypatch.setattr(tables, 'STACKED_TABLES', {})
+    return FAMILY
+
+
+def test_stacked_tables_are_built_once_per_gender(family):
+    matrix = [[70, 70], [40, 40]]
+    _, narratives = tables.interpret_profiles(matrix, ['A', 'B'], family, ['female', 'male'])
+    stacked = dict(tables.STACKED_TABLES)
+
+    _, again = tables.interpret_profiles(matrix, ['B', 'A'], family, ['female', 'male'])
+
+    assert narratives.tolist() == [['test female high', None], ['test low', None]]
+    assert again.tolist() == [[None, 'test female high'], [None, 'test low']]
+    assert set(stacked) == {(family, 'Female'), (family, 'Male')}
+    assert all(tables.STACKED_TABLES[key] is stacked[key] for key in stacked)
+    assert not np.asarray(stacked[(family, 'Female')][1]).flags.writeable
@@ -0,0 +1,39 @@
+"""
+Report cache eviction runs in the retention sweeper, not in store().
+"""
+
+import os
+import time
+import uuid
+
+from src.web.report_cache import ReportCache
+from src.web.report_index import report_path
+from src.web.report_retention import ReportRetentionSweeper
+
+
+def _cached_report(cache, report_folder, key):
+    report_id = str(uuid.uuid4())
+    report_dir = report_path(report_folder, report_id)
+    os.makedirs(report_dir)
+    with open(os.path.join(report_dir, 'report.html'), 'w') as f:
+        f.write('report')
+    cache.store(key, report_id)
+    return report_id
+
+
+def test_store_leaves_eviction_to_the_sweeper(tmp_path):
+    report_folder = str(tmp_path)
+    cache = ReportCache(report_folder, max_age=60)
+    stale_id = _cached_report(cache, report_folder, 'stale')
+    long_ago = time.time() - 3600
+    os.utime(os.path.join(cache.index_dir, 'stale'), (long_ago, long_ago))
+
+    # Storing another report does not walk the index
+    _cached_report(cache, report_folder, 'fresh')
+    assert cache.lookup('stale') == stale_id
+
+    os.utime(os.path.join(cache.index_dir, 'stale'), (long_ago, long_ago))
+    freed = ReportRetentionSweeper(report_folder, report_cache=cache).sweep()
+    assert freed['reports'] == 1
+    assert cache.lookup('stale') is None
+    assert cache.lookup('fresh') is not None
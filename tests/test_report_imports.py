@@ -0,0 +1,69 @@
+"""
+Import and report-building checks for the lazily aliased src packages.
+"""
+
+import os
+import sys
+import importlib
+import subprocess
+
+import pytest
+
+# Sample report profile and client, shared with the graph benchmark
+from benchmark_profile_graphs import SAMPLE_CLIENT, sample_scores
+
+
+def test_graph_modules_import_without_other_generators():
+    for module_name in ['src.reporting.graph_engine', 'src.reporting.profile_graph_renderer',
+                        'src.reporting.profile_graph_generator']:
+        importlib.import_module(module_name)
+    assert 'src.reporting.report_generator' not in sys.modules
+    assert 'weasyprint' not in sys.modules
+
+
+def test_reporting_alias_is_the_top_level_module():
+    import graph_engine
+    from src.reporting import graph_engine as aliased
+    assert aliased is graph_engine
+    assert graph_engine.__spec__.name == 'graph_engine'
+
+
+@pytest.mark.parametrize('module_name', ['report_jobs', 'report_cache', 'report_retention', 'warmup'])
+def test_web_module_imports_as_top_level_module(module_name):
+    # Report pool workers unpickle report_jobs.build_report by importing
+    # report_jobs in a fresh interpreter, before any src package is loaded
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', f'import {module_name}'], cwd=project_root,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_graph_stage_of_a_report(tmp_path):
+    from src.reporting.profile_graph_generator import ProfileGraphGenerator
+
+    graph_paths = ProfileGraphGenerator(output_dir=str(tmp_path)).generate_all_graphs(sample_scores(0),
+                                                                                        SAMPLE_CLIENT)
+    assert graph_paths
+    assert all((tmp_path / path).exists() for path in graph_paths.values() if path)
+
+
+def test_warm_up_builds_graph_templates():
+    from src.web.warmup import _prime_graph_templates
+    assert _prime_graph_templates() > 0
+
+
+def _has_report_generator():
+    try:
+        return hasattr(importlib.import_module('src.reporting.comprehensive_report_generator'),
+                       'ComprehensiveReportGenerator')
+    except ImportError:
+        return False
+
+
+@pytest.mark.xfail(not _has_report_generator(), strict=True,
+                   reason="comprehensive_report_generator does not define ComprehensiveReportGenerator yet")
+def test_build_report_finishes(tmp_path):
+    from src.web.report_jobs import JOB_FINISHED, build_report
+
+    status = build_report(str(tmp_path), sample_scores(0), SAMPLE_CLIENT, include_impressions=True)
+    assert status['state'] == JOB_FINISHED, status.get('error')
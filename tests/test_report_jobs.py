@@ -0,0 +1,86 @@
+"""
+Admission and recovery checks for the report job queue.
+"""
+
+import os
+import time
+import signal
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from benchmark_profile_graphs import SAMPLE_CLIENT, sample_scores
+from src.web.report_jobs import ReportJobQueue, QueueFullError, read_job_status, JOB_QUEUED
+
+THREADS = 16
+
+
+def _break_pool(executor):
+    # Kill the worker and wait until the pool refuses new work
+    os.kill(executor.submit(os.getpid).result(), signal.SIGKILL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            executor.submit(int).result()
+        except BrokenProcessPool:
+            return
+        time.sleep(0.1)
+    pytest.fail("process pool did not break")
+
+
+def test_submit_rebuilds_a_broken_pool(tmp_path):
+    queue = ReportJobQueue(str(tmp_path), max_workers=1)
+    broken = queue._get_executor()
+    _break_pool(broken)
+
+    job_id = queue.submit(sample_scores(0), SAMPLE_CLIENT)
+    try:
+        assert queue._executor is not broken
+        assert queue.queue_position(job_id) is not None
+        assert read_job_status(queue.report_dir(job_id)) is not None
+    finally:
+        queue._executor.shutdown(wait=True)
+
+
+def test_failed_submit_leaves_no_queued_job(tmp_path, monkeypatch):
+    queue = ReportJobQueue(str(tmp_path), max_workers=1, max_queue_depth=0)
+
+    def refuse(*args, **kwargs):
+        raise BrokenProcessPool("workers died")
+
+    monkeypatch.setattr(queue, '_submit_build', refuse)
+    with pytest.raises(BrokenProcessPool):
+        queue.submit(sample_scores(0), SAMPLE_CLIENT)
+
+    metrics = queue.metrics()
+    assert metrics['running'] == 0 and metrics['admitted_total'] == 0
+    assert not any(state == JOB_QUEUED for state in _job_states(tmp_path))
+
+
+def test_concurrent_submits_respect_the_queue_cap(tmp_path, monkeypatch):
+    queue = ReportJobQueue(str(tmp_path), max_workers=1, max_queue_depth=1)
+    # Builds that never finish keep every admitted job pending
+    monkeypatch.setattr(queue, '_submit_build', lambda *args, **kwargs: Future())
+    barrier = threading.Barrier(THREADS)
+
+    def submit(_):
+        barrier.wait()
+        try:
+            return queue.submit(sample_scores(0), SAMPLE_CLIENT)
+        except QueueFullError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        admitted = [job_id for job_id in pool.map(submit, range(THREADS)) if job_id]
+
+    metrics = queue.metrics()
+    assert len(admitted) == 2
+    assert metrics['admitted_total'] == 2 and metrics['rejected_total'] == THREADS - 2
+
+
+def _job_states(report_folder):
+    for root, _, files in os.walk(report_folder):
+        if 'job_status.json' in files:
+            yield read_job_status(root)['state']
@@ -0,0 +1,17 @@
+"""
+Cannot Say is a raw item count, not a T-score.
+"""
+
+from src.constants.score_registry import SCALE_REGISTRY, parse_scale_fields
+
+
+def test_cannot_say_uses_its_raw_count_range():
+    spec = SCALE_REGISTRY['?']
+    assert (spec['min'], spec['max'], spec['default']) == (0, 567, 0)
+
+    profile, errors = parse_scale_fields({'?': '0', 'F': '65'})
+    assert not errors
+    assert profile.get('?') == 0
+
+    _, errors = parse_scale_fields({'?': '568'})
+    assert '?' in errors
@@ -10,8 +10,6 @@ and DSM-5-TR diagnostic impressions.
 import os
 import sys
 import json
-import matplotlib.pyplot as plt
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 
@@ -29,6 +27,7 @@ from src.interpretation.supplementary_scales import get_supplementary_scale_inte
 from src.interpretation.psy5_scales import get_psy5_scale_interpretation
 from src.interpretation.component_scales import get_component_scale_interpretation
 from src.interpretation.dsm5tr_decision_trees import get_dsm5tr_diagnostic_impressions
+from src.reporting.graph_engine import GraphEngine, chart_spec
 
 # Create output directory
 OUTPUT_DIR = Path("final_comprehensive_output")
@@ -218,202 +217,26 @@ def generate_scale_family_graphs(profile_data, output_dir):
         "supplementary": ["A", "R", "Es", "Do", "Re", "Mt", "PK", "PS", "MDS", "AAS", "APS", "MAC-R", "O-H", "FBS"]
     }
     
-    # Generate traditional profile graph (Validity + Clinical)
-    plt.figure(figsize=(12, 8))
-    
-    # Combine validity and clinical scales
-    traditional_scales = scale_families["validity"] + scale_families["clinical"]
-    traditional_scores = [scale_scores.get(scale, 0) for scale in traditional_scales]
-    
-    # Create x-axis labels
-    x = np.arange(len(traditional_scales))
-    
-    # Plot bars
-    bars = plt.bar(x, traditional_scores, width=0.6)
-    
-    # Color code by clinical significance
-    for i, bar in enumerate(bars):
-        if traditional_scores[i] >= 65:
-            bar.set_color('red')
-        elif traditional_scores[i] >= 55:
-            bar.set_color('orange')
-        else:
-            bar.set_color('blue')
-    
-    # Add horizontal lines at T-scores 50, 65, and 80
-    plt.axhline(y=50, color='black', linestyle='-', alpha=0.3)
-    plt.axhline(y=65, color='red', linestyle='--', alpha=0.5)
-    plt.axhline(y=80, color='red', linestyle='-', alpha=0.5)
-    
-    # Set axis labels and title
-    plt.xlabel('Scales')
-    plt.ylabel('T-Score')
-    plt.title('MMPI-2 Traditional Profile (Validity and Clinical Scales)')
-    
-    # Set y-axis limits
-    plt.ylim(30, 100)
-    
-    # Set x-axis ticks and labels
-    plt.xticks(x, traditional_scales, rotation=45)
-    
-    # Add T-score values above bars
-    for i, v in enumerate(traditional_scores):
-        plt.text(i, v + 2, str(v), ha='center')
-    
-    # Adjust layout and save
-    plt.tight_layout()
-    traditional_graph_path = output_dir / "traditional_profile_graph.png"
-    plt.savefig(traditional_graph_path)
-    plt.close()
-    graph_files.append(traditional_graph_path)
-    
-    # Generate individual graphs for each scale family
+    # Traditional profile (validity + clinical) and one graph per family, colour coded by clinical significance
+    charts = [(
+        chart_spec(style='banded_bars', scales=scale_families["validity"] + scale_families["clinical"],
+                   title='MMPI-2 Traditional Profile (Validity and Clinical Scales)', fig_size=(12, 8)),
+        scale_scores,
+        output_dir / "traditional_profile_graph.png"
+    )]
     for family_name, scales in scale_families.items():
-        plt.figure(figsize=(12, 6))
-        
-        scores = [scale_scores.get(scale, 0) for scale in scales]
-        x = np.arange(len(scales))
-        
-        # Plot bars
-        bars = plt.bar(x, scores, width=0.6)
-        
-        # Color code by clinical significance
-        for i, bar in enumerate(bars):
-            if scores[i] >= 65:
-                bar.set_color('red')
-            elif scores[i] >= 55:
-                bar.set_color('orange')
-            else:
-                bar.set_color('blue')
-        
-        # Add horizontal lines at T-scores 50, 65, and 80
-        plt.axhline(y=50, color='black', linestyle='-', alpha=0.3)
-        plt.axhline(y=65, color='red', linestyle='--', alpha=0.5)
-        plt.axhline(y=80, color='red', linestyle='-', alpha=0.5)
-        
-        # Set axis labels and title
-        plt.xlabel('Scales')
-        plt.ylabel('T-Score')
-        plt.title(f'MMPI-2 {family_name.title()} Scales')
-        
-        # Set y-axis limits
-        plt.ylim(30, 100)
-        
-        # Set x-axis ticks and labels
-        plt.xticks(x, scales, rotation=45)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(scores):
-            plt.text(i, v + 2, str(v), ha='center')
-        
-        # Adjust layout and save
-        plt.tight_layout()
-        family_graph_path = output_dir / f"{family_name}_scales_graph.png"
-        plt.savefig(family_graph_path)
-        plt.close()
-        graph_files.append(family_graph_path)
+        charts.append((
+            chart_spec(style='banded_bars', scales=scales, title=f'MMPI-2 {family_name.title()} Scales'),
+            scale_scores,
+            output_dir / f"{family_name}_scales_graph.png"
+        ))
+    
+    graph_engine = GraphEngine()
+    graph_files.extend(graph_engine.render_charts(charts))
     
     # Combine all graphs into a single PDF
     combined_graph_path = output_dir / "scale_family_graphs.pdf"
-    
-    # Create a combined PDF with all graphs using matplotlib's PdfPages
-    import matplotlib.backends.backend_pdf
-    pdf = matplotlib.backends.backend_pdf.PdfPages(combined_graph_path)
-    
-    # Add each graph to the PDF directly
-    # Traditional profile graph
-    fig = plt.figure(figsize=(12, 8))
-    plt.figure(figsize=(12, 8))
-    
-    # Combine validity and clinical scales again for the PDF
-    traditional_scales = scale_families["validity"] + scale_families["clinical"]
-    traditional_scores = [scale_scores.get(scale, 0) for scale in traditional_scales]
-    
-    # Create x-axis labels
-    x = np.arange(len(traditional_scales))
-    
-    # Plot bars
-    bars = plt.bar(x, traditional_scores, width=0.6)
-    
-    # Color code by clinical significance
-    for i, bar in enumerate(bars):
-        if traditional_scores[i] >= 65:
-            bar.set_color('red')
-        elif traditional_scores[i] >= 55:
-            bar.set_color('orange')
-        else:
-            bar.set_color('blue')
-    
-    # Add horizontal lines at T-scores 50, 65, and 80
-    plt.axhline(y=50, color='black', linestyle='-', alpha=0.3)
-    plt.axhline(y=65, color='red', linestyle='--', alpha=0.5)
-    plt.axhline(y=80, color='red', linestyle='-', alpha=0.5)
-    
-    # Set axis labels and title
-    plt.xlabel('Scales')
-    plt.ylabel('T-Score')
-    plt.title('MMPI-2 Traditional Profile (Validity and Clinical Scales)')
-    
-    # Set y-axis limits
-    plt.ylim(30, 100)
-    
-    # Set x-axis ticks and labels
-    plt.xticks(x, traditional_scales, rotation=45)
-    
-    # Add T-score values above bars
-    for i, v in enumerate(traditional_scores):
-        plt.text(i, v + 2, str(v), ha='center')
-    
-    # Adjust layout and save to PDF
-    plt.tight_layout()
-    pdf.savefig()
-    plt.close()
-    
-    # Add individual scale family graphs to the PDF
-    for family_name, scales in scale_families.items():
-        plt.figure(figsize=(12, 6))
-        
-        scores = [scale_scores.get(scale, 0) for scale in scales]
-        x = np.arange(len(scales))
-        
-        # Plot bars
-        bars = plt.bar(x, scores, width=0.6)
-        
-        # Color code by clinical significance
-        for i, bar in enumerate(bars):
-            if scores[i] >= 65:
-                bar.set_color('red')
-            elif scores[i] >= 55:
-                bar.set_color('orange')
-            else:
-                bar.set_color('blue')
-        
-        # Add horizontal lines at T-scores 50, 65, and 80
-        plt.axhline(y=50, color='black', linestyle='-', alpha=0.3)
-        plt.axhline(y=65, color='red', linestyle='--', alpha=0.5)
-        plt.axhline(y=80, color='red', linestyle='-', alpha=0.5)
-        
-        # Set axis labels and title
-        plt.xlabel('Scales')
-        plt.ylabel('T-Score')
-        plt.title(f'MMPI-2 {family_name.title()} Scales')
-        
-        # Set y-axis limits
-        plt.ylim(30, 100)
-        
-        # Set x-axis ticks and labels
-        plt.xticks(x, scales, rotation=45)
-        
-        # Add T-score values above bars
-        for i, v in enumerate(scores):
-            plt.text(i, v + 2, str(v), ha='center')
-        
-        # Adjust layout and save to PDF
-        plt.tight_layout()
-        pdf.savefig()
-        plt.close()
-    
-    pdf.close()
+    graph_engine.render_pages([(spec, scores) for spec, scores, _ in charts], combined_graph_path)
     graph_files.append(combined_graph_path)
     
     return graph_files
@@ -0,0 +1,175 @@
+"""
+Process warm-up for the MMPI-2 web application.
+
+A cold process pays for importing the interpretation modules, matplotlib and
+WeasyPrint, building the matplotlib font cache and applying the plot style on
+its first report. Running warm_up() in the gunicorn master with preload_app
+moves that cost to boot: forked workers inherit the loaded modules and share
+their pages copy-on-write. Report worker processes run the same warm-up as
+their pool initializer.
+
+The timings of every phase are kept in WARMUP_REPORT, which backs the readiness
+endpoint and the startup-time log line.
+"""
+
+import io
+import os
+import gc
+import time
+import importlib
+
+# Modules holding the interpretation code and DSM-5-TR narrative text; the
+# interpretation corpora themselves are loaded per family on first use
+INTERPRETATION_MODULES = [
+    'src.interpretation.scale_interpretations',
+    'src.interpretation.interpretation_tables',
+    'src.interpretation.dsm5tr_decision_trees',
+    'src.interpretation.narrative_dsm5tr_integration'
+]
+
+# Result of the last warm-up in this process
+WARMUP_REPORT = {
+    'ready': False,
+    'pid': None,
+    'phases': {},
+    'errors': {},
+    'total_seconds': None
+}
+
+
+def _load_interpretation_tables():
+    """
+    Import the interpretation modules and open the packed interpretation
+    corpus, so workers forked afterwards share its index (and, memory-mapped,
+    its pages) without loading any corpus yet. The packed corpus is built
+    first if it is missing or out of date, e.g. on a fresh checkout.
+
+    Returns:
+        int: Number of corpora in the packed corpus file
+    """
+    for module_name in INTERPRETATION_MODULES:
+        importlib.import_module(module_name)
+    from src.interpretation.interpretation_corpus import packed_corpora, refresh_corpus
+    WARMUP_REPORT['interpretation_corpus_built'] = refresh_corpus()
+    return len(packed_corpora())
+
+
+def _prime_matplotlib():
+    """
+    Build the font cache and render a throwaway graph in the report style to
+    PNG and PDF so the first real graph does not pay for it.
+
+    Only a private Figure is used; the report style is applied per figure by
+    the graph engine, so nothing global is left changed.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from src.reporting.graph_engine import report_style, settle_report_style
+
+    font_manager.findfont(font_manager.FontProperties(family=['sans-serif']))
+
+    with report_style():
+        fig = Figure(figsize=(10, 8), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(range(13), [50] * 13, 'b-o', linewidth=1.5, markersize=6)
+        ax.axhline(y=65, color='r', linestyle='-', linewidth=2)
+        ax.set_title('Warm-up', fontsize=14, fontweight='bold')
+        ax.text(0, 122, '50', ha='center', va='bottom', fontsize=10)
+        settle_report_style(fig)
+    for fmt in ('png', 'pdf'):
+        fig.savefig(io.BytesIO(), format=fmt, bbox_inches='tight')
+
+
+def _prime_graph_templates():
+    """
+    Build the static background of every scale family graph, so report
+    workers only draw the data layer of each graph.
+
+    Returns:
+        int: Number of graph templates built
+    """
+    from src.reporting.profile_graph_renderer import warm_graph_templates
+    return warm_graph_templates()
+
+
+def _prime_weasyprint():
+    """
+    Render a throwaway PDF so WeasyPrint loads its fonts and stylesheets.
+    """
+    from weasyprint import HTML
+    HTML(string='<html><body><h1>Warm-up</h1><p>MMPI-2</p></body></html>').write_pdf()
+
+
+# Warm-up phases in the order they run
+WARMUP_PHASES = [
+    ('interpretation_tables', _load_interpretation_tables),
+    ('matplotlib', _prime_matplotlib),
+    ('graph_templates', _prime_graph_templates),
+    ('weasyprint', _prime_weasyprint)
+]
+
+
+def warm_up(freeze=False):
+    """
+    Run every warm-up phase in the current process.
+
+    A phase that fails (for example WeasyPrint without its system libraries) is
+    recorded in the report but does not stop the others or block readiness.
+
+    Args:
+        freeze (bool): Move all objects to the permanent GC generation afterwards,
+            so the garbage collector does not touch (and un-share) the warmed
+            pages in forked workers
+
+    Returns:
+        dict: The warm-up report
+    """
+    started_at = time.perf_counter()
+    phases = {}
+    errors = {}
+
+    for name, phase in WARMUP_PHASES:
+        phase_started_at = time.perf_counter()
+        try:
+            result = phase()
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            result = None
+        phases[name] = round(time.perf_counter() - phase_started_at, 3)
+        if name == 'interpretation_tables' and result is not None:
+            WARMUP_REPORT['interpretation_corpora'] = result
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    WARMUP_REPORT.update({
+        'ready': True,
+        'pid': os.getpid(),
+        'phases': phases,
+        'errors': errors,
+        'total_seconds': round(time.perf_counter() - started_at, 3)
+    })
+    return WARMUP_REPORT
+
+
+def format_startup_report(report=None):
+    """
+    Format a warm-up report as a single log line.
+
+    Args:
+        report (dict, optional): Warm-up report; defaults to this process's report
+
+    Returns:
+        str: Human-readable summary of the phase timings
+    """
+    report = report or WARMUP_REPORT
+    phases = ', '.join(f"{name}={seconds:.3f}s" for name, seconds in report['phases'].items())
+    line = f"Warm-up finished in {report['total_seconds']:.3f}s ({phases})"
+    if report['errors']:
+        line += '; skipped: ' + ', '.join(f"{name} ({error})" for name, error in report['errors'].items())
+    return line
@@ -6,21 +6,37 @@ allowing users to input client information, enter assessment scores, and generat
 comprehensive psychological reports with personalized narratives and professional graphics.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, send_from_directory, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, send_from_directory, jsonify, session, Response, stream_with_context, abort
 import os
 import json
 import uuid
+import atexit
+import mimetypes
+import threading
+from concurrent.futures.process import BrokenProcessPool
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import numpy as np
 from datetime import datetime
 
-from src.reporting.comprehensive_report_generator import ComprehensiveReportGenerator
-from src.reporting.profile_graph_generator import ProfileGraphGenerator
+from src.web.report_jobs import ReportJobQueue, QueueFullError, is_valid_job_id, JOB_QUEUED, JOB_RUNNING, JOB_FAILED
+from src.web.report_index import ReportIndex, migrate_flat_layout, report_path, INDEX_FILENAME
+from src.web.report_cache import ReportCache, profile_key
+from src.web.report_retention import ReportRetentionSweeper
+from src.constants.graph_constants import (
+    GRAPH_FAMILIES, GRAPH_FAMILY_SPECS, GRAPH_FORMATS, GRAPH_PROFILE_FILENAME, GRAPH_QUALITY_TIERS,
+    graph_filename, combined_graphs_filename
+)
+from src.web.report_artifacts import load_manifest, negotiate_encoding, add_artifact, ENCODING_SUFFIXES
+from src.web.session_store import ServerSideSessionInterface, create_session_store
+from src.web.warmup import warm_up, format_startup_report, WARMUP_REPORT
 from src.constants.scale_constants import (
     VALIDITY_SCALES_MAP, CLINICAL_SCALES_MAP, HARRIS_LINGOES_SUBSCALES_MAP,
     CONTENT_SCALES_MAP, RC_SCALES_MAP, PSY5_SCALES_MAP, SUPPLEMENTARY_SCALES_MAP
 )
+from src.constants.score_registry import (
+    SCALE_REGISTRY, SCALE_RANGE_OVERRIDES, parse_scale_fields, parse_score_families
+)
 
 # Create Flask app
 # HTML templates now live in the standard ./templates directory
@@ -28,11 +44,77 @@ app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev_secret_key')
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['REPORT_FOLDER'] = 'reports'
+app.config['REPORT_WORKERS'] = int(os.environ.get('REPORT_WORKERS', 2))
+app.config['REPORT_QUEUE_DEPTH'] = int(os.environ.get('REPORT_QUEUE_DEPTH', 8))
+app.config['REPORT_CACHE_MAX_BYTES'] = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+app.config['REPORT_CACHE_MAX_AGE'] = int(os.environ.get('REPORT_CACHE_MAX_AGE', 7 * 24 * 3600))
+app.config['REPORT_INDEX_PATH'] = os.environ.get('REPORT_INDEX_PATH',
+                                                os.path.join(app.config['REPORT_FOLDER'], INDEX_FILENAME))
+app.config['REPORT_RETENTION_MAX_AGE'] = int(os.environ.get('REPORT_RETENTION_MAX_AGE', 90 * 24 * 3600))
+app.config['REPORT_RETENTION_MAX_BYTES'] = int(os.environ.get('REPORT_RETENTION_MAX_BYTES', 20 * 1024 ** 3))
+app.config['REPORT_RETENTION_PER_RESPONDENT'] = int(os.environ.get('REPORT_RETENTION_PER_RESPONDENT', 10))
+app.config['REPORT_RETENTION_BATCH_SIZE'] = int(os.environ.get('REPORT_RETENTION_BATCH_SIZE', 500))
+app.config['REPORT_GRAPH_FORMAT'] = os.environ.get('REPORT_GRAPH_FORMAT', 'png')
+# Processes each report worker uses to render PNG family graphs concurrently (0 = in turn)
+app.config['REPORT_GRAPH_WORKERS'] = int(os.environ.get('REPORT_GRAPH_WORKERS', 0))
+# Rendered graphs shared by the report workers; an empty REPORT_GRAPH_CACHE_DIR disables the cache
+app.config['REPORT_GRAPH_CACHE_DIR'] = os.environ.get('REPORT_GRAPH_CACHE_DIR',
+                                                     os.path.join(app.config['REPORT_FOLDER'], '_graph_cache'))
+app.config['REPORT_GRAPH_CACHE_MAX_BYTES'] = int(os.environ.get('REPORT_GRAPH_CACHE_MAX_BYTES', 256 * 1024 ** 2))
+app.config['REPORT_FILE_MAX_AGE'] = int(os.environ.get('REPORT_FILE_MAX_AGE', 3600))
+# Let a fronting nginx/Apache send report files via X-Sendfile instead of the app
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+app.config['SESSION_BACKEND'] = os.environ.get('SESSION_BACKEND', 'sqlite')
+app.config['SESSION_SQLITE_PATH'] = os.environ.get('SESSION_SQLITE_PATH', os.path.join('instance', 'sessions.sqlite3'))
+app.config['SESSION_REDIS_URL'] = os.environ.get('SESSION_REDIS_URL')
+app.config['SESSION_TTL'] = int(os.environ.get('SESSION_TTL', 8 * 3600))
+
+# Keep session data (scores, client info) on the server; the cookie only carries an id
+app.session_interface = ServerSideSessionInterface(
+    create_session_store(app.config['SESSION_BACKEND'],
+                         sqlite_path=app.config['SESSION_SQLITE_PATH'],
+                         redis_url=app.config['SESSION_REDIS_URL']),
+    ttl=app.config['SESSION_TTL']
+)
 
 # Ensure upload and report directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['REPORT_FOLDER'], exist_ok=True)
 
+# Reports live in fan-out directories and are looked up through the index;
+# reports from the old flat layout are moved over on startup
+report_index = ReportIndex(app.config['REPORT_INDEX_PATH'])
+migrate_flat_layout(app.config['REPORT_FOLDER'], report_index)
+
+# Report builds run in a separate pool of worker processes
+report_jobs = ReportJobQueue(app.config['REPORT_FOLDER'], max_workers=app.config['REPORT_WORKERS'],
+                             initializer=warm_up, max_queue_depth=app.config['REPORT_QUEUE_DEPTH'],
+                             index=report_index, graph_workers=app.config['REPORT_GRAPH_WORKERS'],
+                             graph_cache_dir=app.config['REPORT_GRAPH_CACHE_DIR'] or None,
+                             graph_cache_max_bytes=app.config['REPORT_GRAPH_CACHE_MAX_BYTES'])
+atexit.register(report_jobs.shutdown, wait=False)
+
+# Identical profiles reuse the report already generated for them
+report_cache = ReportCache(app.config['REPORT_FOLDER'],
+                           max_bytes=app.config['REPORT_CACHE_MAX_BYTES'],
+                           max_age=app.config['REPORT_CACHE_MAX_AGE'],
+                           index=report_index)
+
+# Old reports are swept from the report folder, and evicted from the report
+# cache, in the background
+report_retention = ReportRetentionSweeper(app.config['REPORT_FOLDER'],
+                                          max_age=app.config['REPORT_RETENTION_MAX_AGE'],
+                                          max_bytes=app.config['REPORT_RETENTION_MAX_BYTES'],
+                                          max_reports_per_respondent=app.config['REPORT_RETENTION_PER_RESPONDENT'],
+                                          batch_size=app.config['REPORT_RETENTION_BATCH_SIZE'],
+                                          index=report_index, report_cache=report_cache)
+atexit.register(report_retention.stop)
+
+@app.before_request
+def start_report_retention():
+    """Start the retention sweeper in each serving process (a no-op once running)."""
+    report_retention.start()
+
 # RC Scale full names mapping
 RC_SCALES_FULL_NAMES = {
     'RCd': 'Demoralization',
@@ -51,6 +133,12 @@ def index():
     """Render the home page."""
     return render_template('index.html')
 
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness probe; only succeeds once this process has been warmed up."""
+    status_code = 200 if WARMUP_REPORT['ready'] else 503
+    return jsonify(WARMUP_REPORT), status_code
+
 @app.route('/client_info', methods=['GET', 'POST'])
 def client_info():
     """Handle client information input."""
@@ -68,84 +156,12 @@ def client_info():
     
     return render_template('client_info.html')
 
-@app.route('/score_entry', methods=['GET', 'POST'])
-def score_entry():
-    """Handle MMPI-2 score entry."""
-    if request.method == 'POST':
-        # Process and store scores in session
-        validity_scales = {}
-        for scale in VALIDITY_SCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    validity_scales[scale] = int(request.form[scale])
-                except ValueError:
-                    validity_scales[scale] = 50  # Default value
-        
-        clinical_scales = {}
-        for scale in CLINICAL_SCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    clinical_scales[scale] = int(request.form[scale])
-                except ValueError:
-                    clinical_scales[scale] = 50  # Default value
-        
-        harris_lingoes_subscales = {}
-        for scale in HARRIS_LINGOES_SUBSCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    harris_lingoes_subscales[scale] = int(request.form[scale])
-                except ValueError:
-                    harris_lingoes_subscales[scale] = 50  # Default value
-        
-        content_scales = {}
-        for scale in CONTENT_SCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    content_scales[scale] = int(request.form[scale])
-                except ValueError:
-                    content_scales[scale] = 50  # Default value
-        
-        rc_scales = {}
-        for scale in RC_SCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    rc_scales[scale] = int(request.form[scale])
-                except ValueError:
-                    rc_scales[scale] = 50  # Default value
-        
-        psy5_scales = {}
-        for scale in PSY5_SCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    psy5_scales[scale] = int(request.form[scale])
-                except ValueError:
-                    psy5_scales[scale] = 50  # Default value
-        
-        supplementary_scales = {}
-        for scale in SUPPLEMENTARY_SCALES_MAP.keys():
-            if scale in request.form:
-                try:
-                    supplementary_scales[scale] = int(request.form[scale])
-                except ValueError:
-                    supplementary_scales[scale] = 50  # Default value
-        
-        # Store all scores in session
-        session['scores'] = {
-            'validity_scales': validity_scales,
-            'clinical_scales': clinical_scales,
-            'harris_lingoes_subscales': harris_lingoes_subscales,
-            'content_scales': content_scales,
-            'rc_scales': rc_scales,
-            'psy5_scales': psy5_scales,
-            'supplementary_scales': supplementary_scales
-        }
-        
-        # Generate report
-        return redirect(url_for('generate_report'))
-    
-    # Prepare scale maps for the template
-    scale_maps = {
+def _score_entry_maps():
+    """Prepare scale maps for the score entry template."""
+    return {
         'validity_scales_map': VALIDITY_SCALES_MAP,
+        'scale_registry': SCALE_REGISTRY,
+        'scale_range_overrides': SCALE_RANGE_OVERRIDES,
         'clinical_scales_map': CLINICAL_SCALES_MAP,
         'harris_lingoes_subscales_map': HARRIS_LINGOES_SUBSCALES_MAP,
         'content_scales_map': CONTENT_SCALES_MAP,
@@ -154,8 +170,24 @@ def score_entry():
         'psy5_scales_map': PSY5_SCALES_MAP,
         'supplementary_scales_map': SUPPLEMENTARY_SCALES_MAP
     }
+
+@app.route('/score_entry', methods=['GET', 'POST'])
+def score_entry():
+    """Handle MMPI-2 score entry."""
+    if request.method == 'POST':
+        # Parse and validate every scale field in one pass
+        profile, errors = parse_scale_fields(request.form)
+        if errors:
+            return render_template('score_entry.html', errors=errors,
+                                   submitted=request.form, **_score_entry_maps()), 400
+        
+        # Store all scores in session
+        session['scores'] = profile.to_families()
+        
+        # Generate report
+        return redirect(url_for('generate_report'))
     
-    return render_template('score_entry.html', **scale_maps)
+    return render_template('score_entry.html', **_score_entry_maps())
 
 @app.route('/generate_report', methods=['GET'])
 def generate_report():
@@ -164,18 +196,26 @@ def generate_report():
     if 'client_info' not in session or 'scores' not in session:
         return redirect(url_for('index'))
     
-    # Create unique report directory
-    report_id = str(uuid.uuid4())
-    report_dir = os.path.join(app.config['REPORT_FOLDER'], report_id)
-    os.makedirs(report_dir, exist_ok=True)
-    
-    # Generate report
-    report_generator = ComprehensiveReportGenerator(output_dir=report_dir)
-    report_data = report_generator.generate_report(session['scores'], session['client_info'])
-    
-    # Generate profile graphs
-    graph_generator = ProfileGraphGenerator(output_dir=report_dir)
-    graph_paths = graph_generator.generate_all_graphs(session['scores'], session['client_info'])
+    # Reuse the report for an identical profile, otherwise queue a build;
+    # the job id doubles as the report id
+    graph_format = _requested_graph_format() or app.config['REPORT_GRAPH_FORMAT']
+    cache_key = profile_key(session['scores'], session['client_info'], graph_format)
+    report_id = report_cache.lookup(cache_key)
+    if report_id is None:
+        try:
+            report_id = report_jobs.submit(session['scores'], session['client_info'], graph_format=graph_format)
+        except QueueFullError as e:
+            # Shed load quickly; the page retries on its own after Retry-After
+            response = app.make_response((render_template('view_report.html',
+                                                          job_state='busy',
+                                                          retry_after=e.retry_after), 503))
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response
+        except BrokenProcessPool:
+            # The report workers died even after the pool was rebuilt
+            return render_template('view_report.html', job_state='failed',
+                                   job_error='the report workers are unavailable, please try again later'), 503
+        report_cache.store(cache_key, report_id)
     
     # Store report ID in session
     session['report_id'] = report_id
@@ -185,33 +225,248 @@ def generate_report():
 @app.route('/view_report/<report_id>', methods=['GET'])
 def view_report(report_id):
     """View generated report."""
-    report_dir = os.path.join(app.config['REPORT_FOLDER'], report_id)
-    
     # Check if report exists
-    if not os.path.exists(report_dir):
+    report = report_index.get_report(report_id) if is_valid_job_id(report_id) else None
+    if report is None:
         return redirect(url_for('index'))
     
-    # Get paths to report files
-    html_path = os.path.join(report_dir, 'comprehensive_report.html')
-    pdf_path = os.path.join(report_dir, 'comprehensive_report.pdf')
-    traditional_graph_path = os.path.join(report_dir, 'traditional_profile_graph.png')
+    # Builds in progress are tracked in the job status file; pick up a
+    # completion the index has not seen yet
+    if report['state'] in (JOB_QUEUED, JOB_RUNNING):
+        job_status = report_jobs.status(report_id)
+        if job_status is None:
+            return redirect(url_for('index'))
+        if job_status['state'] not in (JOB_QUEUED, JOB_RUNNING):
+            report = report_jobs.index_report(report_id)
     
-    # Check if files exist
-    html_exists = os.path.exists(html_path)
-    pdf_exists = os.path.exists(pdf_path)
-    graph_exists = os.path.exists(traditional_graph_path)
+    # Show a progress page while the report job is still being built
+    if report['state'] in (JOB_QUEUED, JOB_RUNNING, JOB_FAILED):
+        return render_template('view_report.html',
+                              report_id=report_id,
+                              job_state=report['state'],
+                              job_error=report.get('error'))
+    
+    # Check which report files exist
+    artifacts = report['artifacts']
+    has_graph_profile = GRAPH_PROFILE_FILENAME in artifacts
+    graphs = []
+    for family in GRAPH_FAMILIES:
+        graph = {'family': family, 'name': GRAPH_FAMILY_SPECS[family]['display_name']}
+        svg_filename = graph_filename(family, 'svg')
+        preview_filename = graph_filename(family, 'png', 'preview')
+        if svg_filename in artifacts:
+            graph['url'] = url_for('report_file', report_id=report_id, filename=svg_filename)
+            graph['preview_url'] = graph['url']
+        elif has_graph_profile or graph_filename(family, 'png') in artifacts:
+            # Full and print resolution PNGs are rendered when first opened
+            graph['url'] = url_for('report_graph', report_id=report_id, family=family, quality='full')
+            if has_graph_profile:
+                graph['print_url'] = url_for('report_graph', report_id=report_id, family=family, quality='print')
+            if preview_filename in artifacts:
+                graph['preview_url'] = url_for('report_file', report_id=report_id, filename=preview_filename)
+            elif graph_filename(family, 'png') in artifacts:
+                graph['preview_url'] = graph['url']
+        else:
+            continue
+        graphs.append(graph)
+    combined_graphs = next((combined_graphs_filename(graph_format) for graph_format in GRAPH_FORMATS
+                            if combined_graphs_filename(graph_format) in artifacts), None)
+    preview_graph = next((graph for graph in graphs if graph['family'] == 'traditional' and 'preview_url' in graph),
+                         None)
+    # Reports built with the "client" graph format have no server-rendered
+    # previews and are drawn by the browser from the graph profile
+    graph_profile = GRAPH_PROFILE_FILENAME if has_graph_profile and preview_graph is None else None
     
     return render_template('view_report.html', 
                           report_id=report_id,
-                          html_exists=html_exists,
-                          pdf_exists=pdf_exists,
-                          graph_exists=graph_exists)
+                          html_exists='comprehensive_report.html' in artifacts,
+                          pdf_exists='comprehensive_report.pdf' in artifacts,
+                          graph_exists=preview_graph is not None,
+                          graphs=graphs,
+                          combined_graphs=combined_graphs,
+                          preview_graph=preview_graph,
+                          graph_profile=graph_profile)
+
+def _requested_graph_format():
+    """
+    Get the profile graph format requested with ?graph_format=png|svg|client.
+    
+    Returns:
+        str or None: The requested format, or None if missing or unknown
+    """
+    graph_format = request.args.get('graph_format')
+    return graph_format if graph_format in GRAPH_FORMATS else None
+
+@app.route('/report_status/<job_id>', methods=['GET'])
+def report_status(job_id):
+    """Report the progress of a report generation job."""
+    job_status = report_jobs.status(job_id)
+    if job_status is None:
+        return jsonify({'job_id': job_id, 'state': 'unknown'}), 404
+    
+    response = {
+        'job_id': job_id,
+        'state': job_status['state'],
+        'report_url': url_for('view_report', report_id=job_id)
+    }
+    if 'error' in job_status:
+        response['error'] = job_status['error']
+    
+    # Queue position is only known to the process that submitted the job
+    if job_status['state'] in (JOB_QUEUED, JOB_RUNNING):
+        queue_position = report_jobs.queue_position(job_id)
+        if queue_position is not None:
+            response.update(queue_position)
+    return jsonify(response)
+
+@app.route('/metrics/report_queue', methods=['GET'])
+def report_queue_metrics():
+    """Expose report queue depth, wait times and rejection counts for this worker."""
+    return jsonify(report_jobs.metrics())
+
+@app.route('/metrics/report_retention', methods=['GET'])
+def report_retention_metrics():
+    """Expose retention limits and the reports, files and bytes freed by this worker."""
+    return jsonify(report_retention.metrics())
+
+def _iter_batch_profiles():
+    """
+    Read the profiles of a batch request one at a time.
+
+    Accepts either a JSON object with a "profiles" list or an NDJSON body with
+    one profile per line. NDJSON bodies are parsed lazily from the request stream.
+
+    Yields:
+        tuple: (index, profile or None, error message or None)
+    """
+    if request.mimetype == 'application/x-ndjson':
+        index = 0
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line), None
+            except ValueError as e:
+                yield index, None, f"Invalid JSON: {e}"
+            index += 1
+    else:
+        payload = request.get_json(silent=True) or {}
+        for index, profile in enumerate(payload.get('profiles', [])):
+            yield index, profile, None
+
+@app.route('/api/v1/reports:batch', methods=['POST'])
+def batch_reports():
+    """Generate reports for many profiles, streaming one NDJSON line per finished profile."""
+    if request.mimetype != 'application/x-ndjson':
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or not isinstance(payload.get('profiles'), list):
+            return jsonify({'error': 'Expected a JSON object with a "profiles" list'}), 400
+    
+    graph_format = app.config['REPORT_GRAPH_FORMAT']
+    if 'graph_format' in request.args:
+        graph_format = _requested_graph_format()
+        if graph_format is None:
+            return jsonify({'error': f'graph_format must be one of {", ".join(GRAPH_FORMATS)}'}), 400
+    
+    # Profiles that fail validation are reported without being submitted
+    rejected = []
+    
+    def valid_profiles():
+        for index, profile, error in _iter_batch_profiles():
+            if error is None and not (isinstance(profile, dict) and isinstance(profile.get('scores'), dict)):
+                error = 'Profile must be an object with a "scores" object'
+            if error is not None:
+                rejected.append({'index': index, 'state': 'rejected', 'error': error})
+                continue
+            
+            score_profile, field_errors = parse_score_families(profile['scores'])
+            if field_errors:
+                rejected.append({'index': index, 'state': 'rejected',
+                                 'error': 'Invalid scale scores', 'field_errors': field_errors})
+                continue
+            yield index, score_profile.to_families(), profile.get('client_info') or {}
+    
+    def generate():
+        for index, report_id, job_status in report_jobs.run_batch(valid_profiles(), graph_format=graph_format):
+            while rejected:
+                yield json.dumps(rejected.pop(0)) + '\n'
+            
+            result = {'index': index, 'report_id': report_id, 'state': job_status['state']}
+            if 'error' in job_status:
+                result['error'] = job_status['error']
+            else:
+                result['artifacts'] = {
+                    filename: url_for('report_file', report_id=report_id, filename=filename)
+                    for filename in load_manifest(report_jobs.report_dir(report_id))
+                }
+                result['diagnostic_impressions'] = job_status.get('diagnostic_impressions')
+            yield json.dumps(result) + '\n'
+        
+        while rejected:
+            yield json.dumps(rejected.pop(0)) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/reports/<report_id>/<filename>', methods=['GET'])
 def report_file(report_id, filename):
     """Serve report files."""
-    report_dir = os.path.join(app.config['REPORT_FOLDER'], report_id)
-    return send_from_directory(report_dir, filename)
+    # Only files the index knows the report contains are served
+    artifact = report_index.get_artifact(report_id, filename)
+    if artifact is None:
+        abort(404)
+    report_dir = report_path(app.config['REPORT_FOLDER'], report_id)
+    
+    # Byte ranges always refer to the original file, so only offer compressed
+    # variants for whole-file requests
+    encoding = None
+    if 'Range' not in request.headers:
+        encoding = negotiate_encoding(artifact, request.accept_encodings)
+    
+    served_filename = filename + ENCODING_SUFFIXES[encoding] if encoding else filename
+    etag = f"{artifact['sha256']}-{encoding}" if encoding else artifact['sha256']
+    
+    # send_file handles If-None-Match (304) and Range (206) and hands the file to
+    # the server's wsgi.file_wrapper, which uses sendfile() under gunicorn
+    response = send_from_directory(report_dir, served_filename,
+                                   mimetype=mimetypes.guess_type(filename)[0],
+                                   etag=etag,
+                                   conditional=True,
+                                   max_age=app.config['REPORT_FILE_MAX_AGE'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # Reports contain clinical data, so only the browser may cache them
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+# Graph variants are rendered one at a time per process; the lock also keeps
+# two requests for the same variant from rendering it twice
+_graph_variant_lock = threading.Lock()
+
+@app.route('/reports/<report_id>/graphs/<family>/<quality>', methods=['GET'])
+def report_graph(report_id, family, quality):
+    """Serve a PNG family graph in a quality tier, rendering it on first request."""
+    if not is_valid_job_id(report_id) or family not in GRAPH_FAMILY_SPECS or quality not in GRAPH_QUALITY_TIERS:
+        abort(404)
+    filename = graph_filename(family, 'png', quality)
+    if report_index.get_artifact(report_id, filename) is None:
+        # Variants are drawn from the report's graph profile
+        if report_index.get_artifact(report_id, GRAPH_PROFILE_FILENAME) is None:
+            abort(404)
+        report_dir = report_path(app.config['REPORT_FOLDER'], report_id)
+        with _graph_variant_lock:
+            if report_index.get_artifact(report_id, filename) is None:
+                # Imported here so the web process only loads the graph stack when a variant is requested
+                from src.reporting.profile_graph_generator import ProfileGraphGenerator
+                graph_cache = None
+                if app.config['REPORT_GRAPH_CACHE_DIR']:
+                    from src.reporting.profile_graph_cache import get_graph_cache
+                    graph_cache = get_graph_cache(app.config['REPORT_GRAPH_CACHE_DIR'],
+                                                  max_bytes=app.config['REPORT_GRAPH_CACHE_MAX_BYTES'])
+                ProfileGraphGenerator(report_dir, graph_cache=graph_cache).render_graph_variant(family, quality)
+                report_index.record_artifact(report_id, filename, add_artifact(report_dir, filename))
+    return report_file(report_id, filename)
 
 # Serve the original MMPI questionnaire page
 @app.route('/mmpi_test', methods=['GET'])
@@ -316,4 +571,5 @@ def clear_session():
     return redirect(url_for('index'))
 
 if __name__ == '__main__':
+    print(format_startup_report(warm_up()))
     app.run(debug=True, host='0.0.0.0', port=5000)